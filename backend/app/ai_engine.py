@@ -1,7 +1,8 @@
 import os
 import json
 import re
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from app.models import (
@@ -13,6 +14,28 @@ from app.models import (
     PriorityLevel,
     TaskStatus,
 )
+from app.preprocess import clean_email_body, PreprocessStats, DEFAULT_MAX_BODY_BYTES
+from app.conversations import ConversationTracker, has_request, strip_subject_prefixes
+from app.connectors import parse_timestamp
+from app.compact import CompactTaskTable
+from app.deadlines import DeadlineExtractor
+from app.people import PeopleIndex, addressed, mentions, resolve_people
+from app.ranking import UrgencyIndex, most_urgent, score_task, urgency_key
+from app.inference import connect_models, load_pipelines
+from app.metrics import CLASSIFICATIONS, STAGE_SECONDS, SWALLOWED_EXCEPTIONS
+from app.chat_cache import (
+    ChatIntent,
+    parse_intent,
+    KIND_COUNT,
+    KIND_LIST,
+    KIND_NEXT,
+    KIND_PRIORITY,
+    KIND_SUMMARY,
+    WINDOW_OVERDUE,
+    WINDOW_TODAY,
+    WINDOW_TOMORROW,
+    WINDOW_WEEK,
+)
 
 load_dotenv()
 
@@ -28,42 +51,35 @@ class AIEngine:
         print("[OK] No API keys required")
         print("[OK] No premium subscriptions needed")
         print("[OK] All processing happens locally on your machine")
+
+        # Email bodies are normalized (quotes, signatures, HTML stripped) before extraction
+        self.max_email_body_bytes = int(os.getenv("EMAIL_MAX_BODY_BYTES", DEFAULT_MAX_BODY_BYTES))
+        self.preprocess_stats = PreprocessStats()
+        self.deadlines = DeadlineExtractor()
         
-        # Try importing transformers with fallback
-        try:
-            from transformers import pipeline
-            self.use_transformers = True
-            print("[OK] Transformers library available")
-            
-            # Text generation pipeline
-            try:
-                self.generator = pipeline(
-                    "text-generation",
-                    model="distilgpt2",
-                    device=-1  # CPU
-                )
-                print("[OK] Text generation model loaded")
-            except:
-                self.generator = None
-                print("Note: Text generation model couldn't load")
-            
-            # Zero-shot classification
-            try:
-                self.classifier = pipeline(
-                    "zero-shot-classification",
-                    model="facebook/bart-large-mnli",
-                    device=-1
-                )
-                print("[OK] Classification model loaded")
-            except:
-                self.classifier = None
-                print("Note: Classification model couldn't load (will use keyword matching)")
-                
-        except ImportError:
-            print("Transformers not fully available - using rule-based extraction")
+        # Models are loaded in-process, or used through the shared inference
+        # sidecar when several workers run (INFERENCE_MODE=sidecar)
+        self.inference_mode = os.getenv("INFERENCE_MODE", "local").lower()
+        if self.inference_mode == "sidecar":
+            self.generator, self.classifier = connect_models()
+            self.use_transformers = self.generator is not None or self.classifier is not None
+            if self.use_transformers:
+                print("[OK] Using models from the inference sidecar")
+        elif self.inference_mode == "rules":
+            print("Model loading disabled (INFERENCE_MODE=rules) - using rule-based extraction")
             self.use_transformers = False
             self.generator = None
             self.classifier = None
+        else:
+            # Try importing transformers with fallback
+            try:
+                self.generator, self.classifier = load_pipelines()
+                self.use_transformers = True
+            except ImportError:
+                print("Transformers not fully available - using rule-based extraction")
+                self.use_transformers = False
+                self.generator = None
+                self.classifier = None
         
         print("AI Engine ready!")
     
@@ -76,7 +92,7 @@ class AIEngine:
                 json_str = json_match.group()
                 return json.loads(json_str)
         except:
-            pass
+            SWALLOWED_EXCEPTIONS.inc("ai_engine.extract_json")
         
         return {"tasks": []}
 
@@ -84,16 +100,20 @@ class AIEngine:
         """Classify text priority - first try model, then use keywords"""
         if self.classifier:
             try:
+                started = time.perf_counter()
                 result = self.classifier(
                     text[:512],
                     ["critical", "high", "medium", "low"],
                     multi_class=False
                 )
+                STAGE_SECONDS.observe(time.perf_counter() - started, "classifier_call")
+                CLASSIFICATIONS.inc("model")
                 return result["labels"][0]
             except:
-                pass
+                SWALLOWED_EXCEPTIONS.inc("ai_engine.classify_priority")
         
         # Keyword-based priority detection (always works!)
+        CLASSIFICATIONS.inc("keyword")
         text_lower = text.lower()
         
         critical_keywords = ["critical", "urgent", "asap", "emergency", "immediately", "!!!", "🔴", "top priority"]
@@ -109,9 +129,25 @@ class AIEngine:
         
         return "medium"
     
-    def _extract_tasks_rule_based(self, text: str, source_info: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Extract tasks using rule-based approach (always works, even without models)"""
+    def _extract_tasks_rule_based(self, text: str, source_info: Dict[str, str], fallback: bool = True) -> List[Dict[str, Any]]:
+        """Extract tasks using rule-based approach (always works, even without models)
+
+        Due dates are resolved against source_info["reference_date"] (the
+        message's received_date/timestamp): a line's own deadline wins, else
+        the text's first "by/due/before ..." deadline (or first date mentioned)
+        applies.
+
+        With fallback=False, text without task-like lines yields no tasks instead
+        of a generic "Review ..." task (used for follow-up messages in a thread).
+
+        assigned_to is whoever the line asks to do it ("@Mike can you ...",
+        "Sarah, could you ..."), else the one person the whole text asks, if any.
+        """
+        started = time.perf_counter()
         tasks = []
+        reference = parse_timestamp(source_info.get("reference_date", ""))
+        text_due_date = None
+        text_due_date_cued = False
         
         # Simple rule: look for common patterns
         lines = text.split('\n')
@@ -120,6 +156,10 @@ class AIEngine:
             line = line.strip()
             if not line or len(line) < 5:
                 continue
+
+            line_due_date, cued = self.deadlines.find(line, reference)
+            if line_due_date and not text_due_date_cued and (cued or text_due_date is None):
+                text_due_date, text_due_date_cued = line_due_date, cued
             
             # Skip common non-task lines
             if any(skip in line.lower() for skip in ['from:', 'to:', 'subject:', 'sent:', 'date:', 'channel:', 'message:']):
@@ -131,32 +171,73 @@ class AIEngine:
                     "title": line.replace('•', '').replace('◦', '').replace('-', '').replace('*', '').strip()[:80],
                     "description": line[:200],
                     "priority": "medium",
-                    "due_date": None,
-                    "assigned_to": None
+                    "due_date": line_due_date,
+                    "assigned_to": next(iter(addressed(line)), None)
                 }
                 
                 # Check priority keywords in this line
                 task["priority"] = self._classify_priority(line)
                 
                 tasks.append(task)
+
+        text_addressed = addressed(text)
+        text_assignee = text_addressed[0] if len(text_addressed) == 1 else None
+        for task in tasks:
+            if task["due_date"] is None:
+                task["due_date"] = text_due_date
+            if task["assigned_to"] is None:
+                task["assigned_to"] = text_assignee
+        STAGE_SECONDS.observe(time.perf_counter() - started, "rule_extraction")
         
-        return tasks if tasks else [
+        if tasks or not fallback:
+            return tasks
+
+        return [
             {
                 "title": "Review " + source_info.get("source_type", "item"),
                 "description": text[:100],
                 "priority": "medium",
-                "due_date": None,
-                "assigned_to": None
+                "due_date": text_due_date,
+                "assigned_to": text_assignee
             }
         ]
 
-    def extract_tasks_from_email(self, email: OutlookEmail) -> List[ExtractedTask]:
-        """Extract actionable tasks from email content (works with or without HF models)"""
+    def extract_tasks_from_email(
+        self,
+        email: OutlookEmail,
+        conversations: Optional[ConversationTracker] = None,
+        stats: Optional[PreprocessStats] = None,
+    ) -> List[ExtractedTask]:
+        """Extract actionable tasks from email content (works with or without HF models)
+
+        With a ConversationTracker, only lines the email adds to its thread are
+        extracted, and tasks are linked to the thread in metadata.
+        """
         try:
             # Use rule-based extraction
-            source_info = {"source_type": "email"}
-            email_content = f"{email.subject}\n{email.body}"
-            tasks_data = self._extract_tasks_rule_based(email_content, source_info)
+            source_info = {"source_type": "email", "reference_date": email.received_date}
+            body, report = clean_email_body(email.body, self.max_email_body_bytes)
+            (stats if stats is not None else self.preprocess_stats).add(email.body, report)
+
+            metadata = {
+                "email_subject": email.subject,
+                "sender": email.sender_name,
+            }
+            fallback = True
+            if conversations is None:
+                email_content = f"{email.subject}\n{body}"
+            else:
+                thread = conversations.assign_email(email)
+                lines = thread.delta([strip_subject_prefixes(email.subject)] + body.split("\n"))
+                email_content = "\n".join(lines)
+                # A follow-up only gets the generic task when its new lines ask for something
+                fallback = thread.size == 1 or has_request(lines)
+                metadata.update(thread.metadata())
+                if not email_content.strip():
+                    return []
+
+            tasks_data = self._extract_tasks_rule_based(email_content, source_info, fallback)
+            mentioned = mentions(email_content)
             
             extracted_tasks = []
             for task_data in tasks_data:
@@ -169,25 +250,47 @@ class AIEngine:
                     due_date=task_data.get("due_date"),
                     assigned_to=task_data.get("assigned_to"),
                     metadata={
-                        "email_subject": email.subject,
-                        "sender": email.sender_name,
+                        **metadata,
+                        "people": resolve_people(task_data.get("assigned_to"), email.sender_name, mentioned),
                     },
                 )
-                extracted_tasks.append(task)
+                extracted_tasks.append(score_task(task))
             
             return extracted_tasks
 
         except Exception as e:
+            SWALLOWED_EXCEPTIONS.inc("ai_engine.extract_email")
             print(f"Error extracting tasks from email: {e}")
             return []
 
-    def extract_tasks_from_teams(self, message: TeamsMessage) -> List[ExtractedTask]:
-        """Extract actionable tasks from Teams/Slack messages (works with or without HF models)"""
+    def extract_tasks_from_teams(self, message: TeamsMessage, conversations: Optional[ConversationTracker] = None) -> List[ExtractedTask]:
+        """Extract actionable tasks from Teams/Slack messages (works with or without HF models)
+
+        With a ConversationTracker, replies and a sender's messages in the same
+        channel burst are threaded and only their new lines are extracted.
+        """
         try:
             # Use rule-based extraction
-            source_info = {"source_type": "teams"}
-            teams_content = f"{message.channel}\n{message.sender_name}\n{message.message}"
-            tasks_data = self._extract_tasks_rule_based(teams_content, source_info)
+            source_info = {"source_type": "teams", "reference_date": message.timestamp}
+
+            metadata = {
+                "channel": message.channel,
+                "sender": message.sender_name,
+                "mentions": message.mentions,
+            }
+            fallback = True
+            message_text = message.message
+            if conversations is not None:
+                thread = conversations.assign_teams(message)
+                lines = thread.delta(message.message.split("\n"))
+                message_text = "\n".join(lines)
+                fallback = thread.size == 1 or has_request(lines)
+                metadata.update(thread.metadata())
+                if not message_text.strip():
+                    return []
+
+            teams_content = f"{message.channel}\n{message.sender_name}\n{message_text}"
+            tasks_data = self._extract_tasks_rule_based(teams_content, source_info, fallback)
             
             extracted_tasks = []
             for task_data in tasks_data:
@@ -200,16 +303,16 @@ class AIEngine:
                     due_date=task_data.get("due_date"),
                     assigned_to=task_data.get("assigned_to"),
                     metadata={
-                        "channel": message.channel,
-                        "sender": message.sender_name,
-                        "mentions": message.mentions,
+                        **metadata,
+                        "people": resolve_people(task_data.get("assigned_to"), message.sender_name, message.mentions),
                     },
                 )
-                extracted_tasks.append(task)
+                extracted_tasks.append(score_task(task))
             
             return extracted_tasks
 
         except Exception as e:
+            SWALLOWED_EXCEPTIONS.inc("ai_engine.extract_teams")
             print(f"Error extracting tasks from Teams message: {e}")
             return []
 
@@ -227,7 +330,7 @@ class AIEngine:
             "completed": TaskStatus.COMPLETED,
         }
 
-        return ExtractedTask(
+        task = ExtractedTask(
             title=loop_task.title,
             description=loop_task.description,
             source_type=SourceType.LOOP,
@@ -238,8 +341,36 @@ class AIEngine:
             ),
             assigned_to=loop_task.assigned_to,
             status=status_mapping.get(loop_task.status, TaskStatus.PENDING),
-            metadata={"tags": loop_task.tags},
+            metadata={"tags": loop_task.tags, "people": resolve_people(loop_task.assigned_to)},
         )
+        return score_task(task)
+
+    def extract_tasks_from_item(
+        self,
+        item,
+        conversations: Optional[ConversationTracker] = None,
+        stats: Optional[PreprocessStats] = None,
+    ) -> List[ExtractedTask]:
+        """Dispatch a connector item to the extractor for its source type
+
+        stats, when given, collects email preprocessing totals instead of
+        self.preprocess_stats (one per tenant).
+        """
+        if isinstance(item, OutlookEmail):
+            return self.extract_tasks_from_email(item, conversations, stats)
+        if isinstance(item, TeamsMessage):
+            return self.extract_tasks_from_teams(item, conversations)
+        if isinstance(item, LoopTask):
+            return [self.convert_loop_task(item)]
+        raise TypeError(f"Unsupported source item: {type(item).__name__}")
+
+    def reprioritize_task(self, task: ExtractedTask) -> ExtractedTask:
+        """Re-classify one task's priority and refresh its urgency score"""
+        combined_text = f"{task.title} {task.description}"
+        priority = self._classify_priority(combined_text)
+        task.priority = PriorityLevel(priority)
+        task.metadata["priority_reasoning"] = f"Re-prioritized by HF classifier to {priority}"
+        return score_task(task)
 
     def prioritize_tasks(self, tasks: List[ExtractedTask]) -> List[ExtractedTask]:
         """Re-prioritize and rank tasks using Hugging Face models"""
@@ -247,72 +378,68 @@ class AIEngine:
             return []
 
         try:
-            # Use classifier to re-evaluate priorities
-            for task in tasks:
-                combined_text = f"{task.title} {task.description}"
-                priority = self._classify_priority(combined_text)
-                task.priority = PriorityLevel(priority)
-                task.metadata["priority_reasoning"] = f"Re-prioritized by HF classifier to {priority}"
-
-            # Sort tasks by priority order with safe due date comparison
-            priority_order = {
-                PriorityLevel.CRITICAL: 0,
-                PriorityLevel.HIGH: 1,
-                PriorityLevel.MEDIUM: 2,
-                PriorityLevel.LOW: 3,
-            }
-            
-            def sort_key(t):
-                # Primary sort by priority
-                priority_val = priority_order.get(t.priority, 4)
-                # Secondary sort by due date (handle None and timezone issues)
-                try:
-                    if t.due_date:
-                        # Strip timezone for comparison
-                        due_date_val = t.due_date.replace(tzinfo=None) if t.due_date.tzinfo else t.due_date
-                        return (priority_val, due_date_val)
-                except:
-                    pass
-                return (priority_val, datetime.max)
-            
-            tasks.sort(key=sort_key)
+            # Use classifier to re-evaluate priorities; completed tasks keep theirs
+            with STAGE_SECONDS.time("classifier_batch"):
+                for task in tasks:
+                    if task.status != TaskStatus.COMPLETED:
+                        self.reprioritize_task(task)
+
+            # Priority first, then earliest due date - both folded into urgency_score
+            with STAGE_SECONDS.time("sort"):
+                tasks.sort(key=urgency_key)
             return tasks
 
         except Exception as e:
+            SWALLOWED_EXCEPTIONS.inc("ai_engine.prioritize")
             print(f"Error prioritizing tasks: {e}")
             return tasks
 
-    def chat_interface(self, message: str, tasks_context: List[ExtractedTask]) -> str:
-        """Handle chat interactions about tasks with intelligent analysis"""
+    def chat_interface(self, message: str, tasks_context: List[ExtractedTask], index: Optional[UrgencyIndex] = None) -> str:
+        """Handle chat interactions about tasks with intelligent analysis
+
+        index, when given, must hold exactly tasks_context; unfiltered queries
+        then read the most urgent tasks off it instead of ranking the list.
+        """
+        return self.chat_answer(parse_intent(message), tasks_context, index)[0]
+
+    def chat_answer(
+        self,
+        intent: ChatIntent,
+        tasks_context: List[ExtractedTask],
+        index: Optional[UrgencyIndex] = None,
+        now: Optional[datetime] = None,
+        people: Optional[PeopleIndex] = None,
+    ) -> Tuple[str, Optional[datetime]]:
+        """(response, time it stops being valid or None) for a parsed chat intent
+
+        people, when given, must index exactly tasks_context; questions about
+        a person then read that person's tasks off it instead of a scan.
+        """
+        now = now or datetime.now()
+        expires_at = None
         try:
-            msg_lower = message.lower()
-            
             # Smart task filtering based on query
             filtered_tasks = tasks_context
-            
-            # Helper function for safe datetime comparison
-            def safe_compare_dates(task_date, compare_date):
-                """Safely compare dates handling both naive and aware datetimes"""
-                try:
-                    if task_date.tzinfo:
-                        task_date = task_date.replace(tzinfo=None)
-                    return task_date, compare_date
-                except:
-                    return task_date, compare_date
+
+            # Filter by person first: their tasks are few
+            if intent.person is not None:
+                table = tasks_context if isinstance(tasks_context, CompactTaskTable) else CompactTaskTable.from_tasks(tasks_context)
+                if people is None:
+                    people = PeopleIndex(table)
+                filtered_tasks = [table.get(task_id) for task_id in people.tasks_for(intent.person, intent.role)]
             
             # Filter by time period
-            if "today" in msg_lower:
-                today = datetime.now().date()
+            if intent.window == WINDOW_TODAY:
+                today = now.date()
                 filtered_tasks = [t for t in filtered_tasks if t.due_date and t.due_date.date() == today]
-            elif "tomorrow" in msg_lower:
-                tomorrow = (datetime.now() + timedelta(days=1)).date()
+            elif intent.window == WINDOW_TOMORROW:
+                tomorrow = (now + timedelta(days=1)).date()
                 filtered_tasks = [t for t in filtered_tasks if t.due_date and t.due_date.date() == tomorrow]
-            elif "week" in msg_lower:
-                today = datetime.now().date()
+            elif intent.window == WINDOW_WEEK:
+                today = now.date()
                 week_later = today + timedelta(days=7)
                 filtered_tasks = [t for t in filtered_tasks if t.due_date and today <= t.due_date.date() <= week_later]
-            elif "overdue" in msg_lower:
-                now = datetime.now()
+            elif intent.window == WINDOW_OVERDUE:
                 safe_tasks = []
                 for t in filtered_tasks:
                     if t.due_date:
@@ -320,59 +447,44 @@ class AIEngine:
                             task_dt = t.due_date.replace(tzinfo=None) if t.due_date.tzinfo else t.due_date
                             if task_dt < now:
                                 safe_tasks.append(t)
+                            elif expires_at is None or task_dt < expires_at:
+                                expires_at = task_dt  # the next task to become overdue
                         except:
-                            pass
+                            SWALLOWED_EXCEPTIONS.inc("ai_engine.chat_overdue")
                 filtered_tasks = safe_tasks
+            if intent.window in (WINDOW_TODAY, WINDOW_TOMORROW, WINDOW_WEEK):
+                expires_at = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
             
             # Filter by source
-            if "email" in msg_lower and "@" not in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.source_type == SourceType.EMAIL]
-            elif "teams" in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.source_type == SourceType.TEAMS]
-            elif "loop" in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.source_type == SourceType.LOOP]
+            if intent.source is not None:
+                filtered_tasks = [t for t in filtered_tasks if t.source_type == intent.source]
             
             # Filter by status
-            if "pending" in msg_lower or "incomplete" in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.status == TaskStatus.PENDING]
-            elif "completed" in msg_lower or "done" in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.status == TaskStatus.COMPLETED]
+            if intent.status is not None:
+                filtered_tasks = [t for t in filtered_tasks if t.status == intent.status]
             
             # Filter by priority
-            if "critical" in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.priority == PriorityLevel.CRITICAL]
-            elif "high" in msg_lower and "priority" in msg_lower:
-                filtered_tasks = [t for t in filtered_tasks if t.priority == PriorityLevel.HIGH]
-            
-            # Sort by priority and due date with safe datetime comparison
-            priority_order = {
-                PriorityLevel.CRITICAL: 0,
-                PriorityLevel.HIGH: 1,
-                PriorityLevel.MEDIUM: 2,
-                PriorityLevel.LOW: 3,
-            }
-            
-            def safe_sort_key(t):
-                priority_val = priority_order.get(t.priority, 4)
-                try:
-                    if t.due_date:
-                        # Strip timezone for safe comparison
-                        due_date_val = t.due_date.replace(tzinfo=None) if t.due_date.tzinfo else t.due_date
-                        return (priority_val, due_date_val)
-                except:
-                    pass
-                return (priority_val, datetime.max)
-            
-            sorted_tasks = sorted(filtered_tasks, key=safe_sort_key)
+            if intent.priority is not None:
+                filtered_tasks = [t for t in filtered_tasks if t.priority == intent.priority]
+
+            use_index = index is not None and filtered_tasks is tasks_context
+
+            def top_tasks(k: int, priority: Optional[PriorityLevel] = None) -> List[ExtractedTask]:
+                """The k most urgent matching tasks, without sorting the whole list"""
+                if use_index:
+                    ranked = iter(index) if priority is None else (t for t in index if t.priority == priority)
+                    return [task for _, task in zip(range(k), ranked)]
+                candidates = filtered_tasks if priority is None else [t for t in filtered_tasks if t.priority == priority]
+                return most_urgent(candidates, k)
             
             # Sophisticated response generation
-            if not sorted_tasks:
-                return "No tasks match your query. Would you like to see all tasks or ask something else?"
+            if not filtered_tasks:
+                return "No tasks match your query. Would you like to see all tasks or ask something else?", expires_at
             
-            if "how many" in msg_lower or "count" in msg_lower or "total" in msg_lower:
-                total = len(sorted_tasks)
-                critical_count = sum(1 for t in sorted_tasks if t.priority == PriorityLevel.CRITICAL)
-                high_count = sum(1 for t in sorted_tasks if t.priority == PriorityLevel.HIGH)
+            if intent.kind == KIND_COUNT:
+                total = len(filtered_tasks)
+                critical_count = sum(1 for t in filtered_tasks if t.priority == PriorityLevel.CRITICAL)
+                high_count = sum(1 for t in filtered_tasks if t.priority == PriorityLevel.HIGH)
                 
                 response = f"You have **{total} tasks** matching your criteria.\n"
                 if critical_count > 0:
@@ -382,50 +494,50 @@ class AIEngine:
                 remaining = total - critical_count - high_count
                 if remaining > 0:
                     response += f"• {remaining} medium/low priority (can be scheduled later)"
-                return response.strip()
+                return response.strip(), expires_at
             
-            elif "list" in msg_lower or "show" in msg_lower or "what are" in msg_lower or "get" in msg_lower:
+            elif intent.kind == KIND_LIST:
                 # Detailed task list with analysis
-                response = f"**{len(sorted_tasks)} tasks** found:\n\n"
-                for i, task in enumerate(sorted_tasks[:15], 1):
+                response = f"**{len(filtered_tasks)} tasks** found:\n\n"
+                for i, task in enumerate(top_tasks(15), 1):
                     due_str = task.due_date.strftime("%b %d") if task.due_date else "No deadline"
                     priority_emoji = "🔴" if task.priority == PriorityLevel.CRITICAL else \
                                     "🟠" if task.priority == PriorityLevel.HIGH else \
                                     "🟡" if task.priority == PriorityLevel.MEDIUM else "🟢"
                     response += f"{priority_emoji} {i}. **{task.title}** ({due_str})\n"
                 
-                if len(sorted_tasks) > 15:
-                    response += f"\n...and {len(sorted_tasks) - 15} more tasks"
-                return response.strip()
+                if len(filtered_tasks) > 15:
+                    response += f"\n...and {len(filtered_tasks) - 15} more tasks"
+                return response.strip(), expires_at
             
-            elif "priority" in msg_lower or "urgent" in msg_lower:
+            elif intent.kind == KIND_PRIORITY:
                 # Focus on high-priority items
-                critical = [t for t in sorted_tasks if t.priority == PriorityLevel.CRITICAL]
-                high = [t for t in sorted_tasks if t.priority == PriorityLevel.HIGH]
+                critical_count = sum(1 for t in filtered_tasks if t.priority == PriorityLevel.CRITICAL)
+                high_count = sum(1 for t in filtered_tasks if t.priority == PriorityLevel.HIGH)
                 
                 response = "**Priority Analysis:**\n\n"
-                if critical:
-                    response += f"🔴 **CRITICAL ({len(critical)} tasks)** - Act now!\n"
-                    for t in critical[:3]:
+                if critical_count:
+                    response += f"🔴 **CRITICAL ({critical_count} tasks)** - Act now!\n"
+                    for t in top_tasks(3, PriorityLevel.CRITICAL):
                         response += f"  • {t.title}\n"
-                    if len(critical) > 3:
-                        response += f"  ... and {len(critical) - 3} more\n"
+                    if critical_count > 3:
+                        response += f"  ... and {critical_count - 3} more\n"
                 
-                if high:
-                    response += f"\n🟠 **HIGH PRIORITY ({len(high)} tasks)** - Important\n"
-                    for t in high[:3]:
+                if high_count:
+                    response += f"\n🟠 **HIGH PRIORITY ({high_count} tasks)** - Important\n"
+                    for t in top_tasks(3, PriorityLevel.HIGH):
                         response += f"  • {t.title}\n"
-                    if len(high) > 3:
-                        response += f"  ... and {len(high) - 3} more\n"
+                    if high_count > 3:
+                        response += f"  ... and {high_count - 3} more\n"
                 
-                if not critical and not high:
+                if not critical_count and not high_count:
                     response += "No critical or high-priority tasks right now. Good job! 👍"
                 
-                return response.strip()
+                return response.strip(), expires_at
             
-            elif "next" in msg_lower or "what should" in msg_lower or "recommend" in msg_lower:
+            elif intent.kind == KIND_NEXT:
                 # Recommendation engine
-                task = sorted_tasks[0]
+                task = top_tasks(1)[0]
                 response = f"**Recommended Next Task:**\n\n"
                 response += f"**{task.title}**\n"
                 response += f"Priority: {task.priority.value.upper()}\n"
@@ -433,9 +545,9 @@ class AIEngine:
                     response += f"Due: {task.due_date.strftime('%A, %B %d, %Y')}\n"
                 response += f"Source: {task.source_type.value}\n"
                 response += f"\n💡 Start with this task to maintain momentum!"
-                return response.strip()
+                return response.strip(), expires_at
             
-            elif "summary" in msg_lower or "overview" in msg_lower or "status" in msg_lower:
+            elif intent.kind == KIND_SUMMARY:
                 # Executive summary
                 all_tasks = tasks_context
                 completed = sum(1 for t in all_tasks if t.status == TaskStatus.COMPLETED)
@@ -443,7 +555,6 @@ class AIEngine:
                 critical = sum(1 for t in all_tasks if t.priority == PriorityLevel.CRITICAL)
                 
                 # Safe datetime comparison - handle both naive and aware datetimes
-                now = datetime.now()
                 overdue = 0
                 for t in all_tasks:
                     if t.due_date:
@@ -452,8 +563,10 @@ class AIEngine:
                             task_dt = t.due_date.replace(tzinfo=None) if t.due_date.tzinfo else t.due_date
                             if task_dt < now:
                                 overdue += 1
+                            elif expires_at is None or task_dt < expires_at:
+                                expires_at = task_dt
                         except:
-                            pass
+                            SWALLOWED_EXCEPTIONS.inc("ai_engine.chat_summary")
                 
                 response = f"**📊 Task Summary:**\n\n"
                 response += f"Total Tasks: {len(all_tasks)}\n"
@@ -467,30 +580,31 @@ class AIEngine:
                 else:
                     response += f"\n✨ You're on track! Keep up the good work."
                 
-                return response.strip()
+                return response.strip(), expires_at
             
             else:
                 # Smart default response with insights
-                critical = [t for t in sorted_tasks if t.priority == PriorityLevel.CRITICAL]
-                high = [t for t in sorted_tasks if t.priority == PriorityLevel.HIGH]
-                pending = [t for t in sorted_tasks if t.status == TaskStatus.PENDING]
+                critical_count = sum(1 for t in filtered_tasks if t.priority == PriorityLevel.CRITICAL)
+                high_count = sum(1 for t in filtered_tasks if t.priority == PriorityLevel.HIGH)
                 
                 response = f"**📋 Current Status:**\n\n"
                 
-                if critical:
-                    response += f"🔴 **Critical**: {len(critical)} tasks need immediate attention\n"
-                    response += f"   → Start with: **{critical[0].title}**\n\n"
-                elif high:
-                    response += f"🟠 **High Priority**: {len(high)} important tasks\n"
-                    response += f"   → Next: **{high[0].title}**\n\n"
+                if critical_count:
+                    response += f"🔴 **Critical**: {critical_count} tasks need immediate attention\n"
+                    response += f"   → Start with: **{top_tasks(1, PriorityLevel.CRITICAL)[0].title}**\n\n"
+                elif high_count:
+                    response += f"🟠 **High Priority**: {high_count} important tasks\n"
+                    response += f"   → Next: **{top_tasks(1, PriorityLevel.HIGH)[0].title}**\n\n"
                 
                 response += f"📊 You have {len(filtered_tasks)} tasks matching your criteria.\n"
                 response += f"**What else would you like to know?**"
                 
-                return response.strip()
+                return response.strip(), expires_at
 
         except Exception as e:
-            return f"I encountered an issue analyzing your tasks: {str(e)}"
+            SWALLOWED_EXCEPTIONS.inc("ai_engine.chat")
+            # Not cached: the next identical question retries
+            return f"I encountered an issue analyzing your tasks: {str(e)}", now
 
     def generate_task_insights(self, tasks: List[ExtractedTask]) -> Dict[str, Any]:
         """Generate insights about the task list using calculated statistics"""
@@ -498,22 +612,21 @@ class AIEngine:
             return {"message": "No tasks to analyze"}
 
         try:
-            # Calculate statistics
-            critical_count = sum(1 for t in tasks if t.priority == PriorityLevel.CRITICAL)
-            high_count = sum(1 for t in tasks if t.priority == PriorityLevel.HIGH)
-            medium_count = sum(1 for t in tasks if t.priority == PriorityLevel.MEDIUM)
-            low_count = sum(1 for t in tasks if t.priority == PriorityLevel.LOW)
-
-            email_count = sum(1 for t in tasks if t.source_type == SourceType.EMAIL)
-            teams_count = sum(1 for t in tasks if t.source_type == SourceType.TEAMS)
-            loop_count = sum(1 for t in tasks if t.source_type == SourceType.LOOP)
+            # Calculate statistics in a single pass, so tasks read from a
+            # compact store are only materialized once
+            by_priority = {level: 0 for level in PriorityLevel}
+            by_source = {source: 0 for source in SourceType}
 
             # Safe datetime comparison - handle both naive and aware datetimes
             now = datetime.now()
             overdue_count = 0
             upcoming = []
+            total = 0
             
             for t in tasks:
+                total += 1
+                by_priority[t.priority] += 1
+                by_source[t.source_type] += 1
                 if t.due_date:
                     try:
                         # Compare naive datetimes
@@ -524,40 +637,61 @@ class AIEngine:
                         if now <= task_dt <= (now + timedelta(days=3)):
                             upcoming.append(t.title)
                     except:
-                        pass
-
-            insights = {
-                "total_tasks": len(tasks),
-                "by_priority": {
-                    "critical": critical_count,
-                    "high": high_count,
-                    "medium": medium_count,
-                    "low": low_count,
-                },
-                "by_source": {
-                    "email": email_count,
-                    "teams": teams_count,
-                    "loop": loop_count,
-                },
-                "overdue_tasks": overdue_count,
-                "upcoming_deadlines": upcoming,
-                "key_insights": [
-                    f"You have {critical_count} critical tasks that need immediate attention." if critical_count > 0 else "",
-                    f"{email_count} tasks from emails, {teams_count} from Teams, {loop_count} from Loop.",
-                    f"Total of {overdue_count} overdue tasks." if overdue_count > 0 else "",
-                ],
-                "recommendations": [
-                    "Focus on critical and high-priority tasks first.",
-                    "Review upcoming deadlines to plan your week effectively.",
-                    "Consider breaking down large tasks into smaller subtasks.",
-                ],
-            }
-            
-            # Clean up empty insights
-            insights["key_insights"] = [i for i in insights["key_insights"] if i]
+                        SWALLOWED_EXCEPTIONS.inc("ai_engine.insights_due_date")
 
-            return insights
+            return self.insights_from_counts(total, by_priority, by_source, overdue_count, upcoming)
 
         except Exception as e:
+            SWALLOWED_EXCEPTIONS.inc("ai_engine.insights")
             print(f"Error generating insights: {e}")
             return {"error": str(e)}
+
+    def insights_from_counts(
+        self,
+        total: int,
+        by_priority: Dict[PriorityLevel, int],
+        by_source: Dict[SourceType, int],
+        overdue_count: int,
+        upcoming: List[str],
+    ) -> Dict[str, Any]:
+        """Insights from precomputed statistics (e.g. CompactTaskTable.facets())"""
+        critical_count = by_priority[PriorityLevel.CRITICAL]
+        high_count = by_priority[PriorityLevel.HIGH]
+        medium_count = by_priority[PriorityLevel.MEDIUM]
+        low_count = by_priority[PriorityLevel.LOW]
+
+        email_count = by_source[SourceType.EMAIL]
+        teams_count = by_source[SourceType.TEAMS]
+        loop_count = by_source[SourceType.LOOP]
+
+        insights = {
+            "total_tasks": total,
+            "by_priority": {
+                "critical": critical_count,
+                "high": high_count,
+                "medium": medium_count,
+                "low": low_count,
+            },
+            "by_source": {
+                "email": email_count,
+                "teams": teams_count,
+                "loop": loop_count,
+            },
+            "overdue_tasks": overdue_count,
+            "upcoming_deadlines": upcoming,
+            "key_insights": [
+                f"You have {critical_count} critical tasks that need immediate attention." if critical_count > 0 else "",
+                f"{email_count} tasks from emails, {teams_count} from Teams, {loop_count} from Loop.",
+                f"Total of {overdue_count} overdue tasks." if overdue_count > 0 else "",
+            ],
+            "recommendations": [
+                "Focus on critical and high-priority tasks first.",
+                "Review upcoming deadlines to plan your week effectively.",
+                "Consider breaking down large tasks into smaller subtasks.",
+            ],
+        }
+        
+        # Clean up empty insights
+        insights["key_insights"] = [i for i in insights["key_insights"] if i]
+
+        return insights
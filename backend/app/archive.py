@@ -0,0 +1,213 @@
+"""Cold storage for tasks that no longer need to be in the active set.
+
+A RetentionPolicy picks rows of the task table to retire: tasks completed
+more than N days ago and, optionally, open tasks overdue by more than M
+days. They are appended to a TaskArchive, a gzip-compressed NDJSON file on
+local disk, and dropped from the table, so prioritize, filter, chat and
+insights only pay for the active tasks. The archive stays queryable
+(include_archived=true on the list and filter endpoints), in batches that go
+through the same column filters as the active table.
+
+Each archiving run appends one gzip member; gzip readers treat the
+concatenation as a single stream, so the file is never rewritten.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.compact import CompactTaskTable
+from app.models import ExtractedTask
+
+# Archived tasks materialized per batch when reading the archive back
+READ_BATCH = 10_000
+
+
+def _days_from_env(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    if value.strip().lower() in ("off", "none", "never"):
+        return None
+    return float(value)
+
+
+class RetentionPolicy:
+    """Which tasks leave the active set: completed_days after completion, overdue_days past due (None = never)"""
+
+    def __init__(self, completed_days: Optional[float] = 7, overdue_days: Optional[float] = None):
+        self.completed_days = completed_days
+        self.overdue_days = overdue_days
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        return cls(
+            completed_days=_days_from_env("ARCHIVE_COMPLETED_DAYS", 7),
+            overdue_days=_days_from_env("ARCHIVE_OVERDUE_DAYS", None),
+        )
+
+    def expired_rows(self, table: CompactTaskTable, now: Optional[datetime] = None) -> List[int]:
+        if self.completed_days is None and self.overdue_days is None:
+            return []
+        now = now or datetime.now()
+        return table.expired(
+            completed_before=now - timedelta(days=self.completed_days) if self.completed_days is not None else None,
+            overdue_before=now - timedelta(days=self.overdue_days) if self.overdue_days is not None else None,
+        )
+
+    def as_dict(self) -> dict:
+        return {"completed_days": self.completed_days, "overdue_days": self.overdue_days}
+
+
+def archive_key(task: ExtractedTask) -> Tuple[str, str, str]:
+    """Identifies a task across extractions (task ids are regenerated on every run)"""
+    return task.source_type.value, task.source_id, task.title
+
+
+class TaskArchive:
+    """Append-only, gzip-compressed NDJSON archive of retired tasks.
+
+    Two small files sit next to the archive so nothing has to decompress it
+    to count or look up tasks: a manifest with the task count and the
+    archive's size, and a key index of 8-byte hashes of archive_key(), one
+    per task. The manifest is read once and the index loaded once into a
+    sorted array, which costs 8 bytes per archived task. If either file is
+    missing or doesn't match the archive's size (an older archive, or an
+    interrupted append), both are rebuilt from one pass over the archive.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.keys_path = self.path.with_name(self.path.name + ".keys")
+        self.manifest_path = self.path.with_name(self.path.name + ".manifest.json")
+        self._lock = threading.Lock()
+        self._count: Optional[int] = None
+        self._hashes: Optional[array] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load_manifest()
+            return self._count
+
+    def __contains__(self, task: ExtractedTask) -> bool:
+        """True if this task (by source and title) was archived before"""
+        with self._lock:
+            hashes = self._load_hashes()
+            key = _key_hash(archive_key(task))
+            position = bisect_left(hashes, key)
+            return position < len(hashes) and hashes[position] == key
+
+    def append(self, tasks: Iterable[ExtractedTask]) -> int:
+        """Write tasks as one new gzip member; returns how many were written"""
+        tasks = list(tasks)
+        if not tasks:
+            return 0
+        lines = [task.model_dump_json() + "\n" for task in tasks]
+        new_hashes = array("Q", (_key_hash(archive_key(task)) for task in tasks))
+        with self._lock:
+            self._load_manifest()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(gzip.compress("".join(lines).encode("utf-8")))
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.keys_path, "ab") as f:
+                f.write(new_hashes.tobytes())
+            self._count += len(lines)
+            self._write_manifest()
+            if self._hashes is not None:
+                merged = array("Q", sorted(chain(self._hashes, new_hashes)))
+                self._hashes = merged
+        return len(lines)
+
+    def __iter__(self) -> Iterator[ExtractedTask]:
+        for table in self.tables():
+            yield from table
+
+    def tables(self, batch: int = READ_BATCH) -> Iterator[CompactTaskTable]:
+        """The archive as a sequence of task tables of up to batch rows each"""
+        lines = self._lines()
+        while True:
+            chunk = list(islice(lines, batch))
+            if not chunk:
+                return
+            yield CompactTaskTable.from_tasks(ExtractedTask.model_validate_json(line) for line in chunk)
+
+    def select(self, **filters) -> Iterator[ExtractedTask]:
+        """Archived tasks matching CompactTaskTable.select() filters"""
+        for table in self.tables():
+            for row in table.select(**filters):
+                yield table.task(row)
+
+    def _lines(self) -> Iterator[str]:
+        if not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line
+        except (EOFError, OSError, zlib.error):
+            # A run interrupted mid-append leaves a truncated last member
+            print(f"Archive {self.path} ends with an incomplete batch; ignoring it")
+
+    def _load_manifest(self):
+        # Read once; append() keeps the count current afterwards
+        if self._count is not None:
+            return
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if not size:
+            self._count = 0
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest["bytes"] == size and self.keys_path.exists() and self.keys_path.stat().st_size == 8 * manifest["count"]:
+                self._count = manifest["count"]
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """Recount the archive and rewrite the key index, in one streaming pass"""
+        hashes = array("Q")
+        for line in self._lines():
+            record = json.loads(line)
+            hashes.append(_key_hash((record["source_type"], record["source_id"], record["title"])))
+        with open(self.keys_path, "wb") as f:
+            f.write(hashes.tobytes())
+        self._count = len(hashes)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if not size and not self._count:
+            return  # nothing archived yet; don't create files
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"count": self._count, "bytes": size}, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _load_hashes(self) -> array:
+        if self._hashes is None:
+            self._load_manifest()
+            hashes = array("Q")
+            if self.keys_path.exists():
+                with open(self.keys_path, "rb") as f:
+                    hashes.frombytes(f.read())
+            self._hashes = array("Q", sorted(hashes))
+        return self._hashes
+
+
+def _key_hash(key: Tuple[str, str, str]) -> int:
+    """64-bit hash of an archive key, as stored in the key index"""
+    return int.from_bytes(hashlib.blake2b("\x1f".join(key).encode("utf-8"), digest_size=8).digest(), "little")
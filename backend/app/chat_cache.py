@@ -0,0 +1,175 @@
+"""Canonical chat intents and a cache of rendered chat answers.
+
+parse_intent() reduces a chat message to what chat_interface actually acts
+on: time window, source, status, priority, person and response type. Different
+wordings of the same question ("what should I do next?", "What should I
+do next") share one intent, so the cache keys rendered answers on
+(intent, snapshot version). Publishing a new snapshot changes the version,
+so answers about changed tasks are never served.
+
+Answers that depend on the clock carry an expiry time: date-window intents
+("today", "this week") expire at midnight, and answers that count overdue
+tasks expire when the next deadline passes.
+"""
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+from app.models import PriorityLevel, SourceType, TaskStatus
+from app.people import GROUP_MENTIONS, ME
+
+WINDOW_TODAY = "today"
+WINDOW_TOMORROW = "tomorrow"
+WINDOW_WEEK = "week"
+WINDOW_OVERDUE = "overdue"
+
+KIND_COUNT = "count"
+KIND_LIST = "list"
+KIND_PRIORITY = "priority"
+KIND_NEXT = "next"
+KIND_SUMMARY = "summary"
+KIND_DEFAULT = "default"
+
+# Who a question is about, and in which role: "what do I owe sarah" (tasks
+# sarah asked for), "assigned to mike", "my mentions", or just "@lisa"
+_MY_MENTIONS = re.compile(r"\bmy @?mentions\b|\bmention(?:s|ed|ing)? me\b")
+_PERSON = [
+    (re.compile(r"\bowe @?([a-z][\w.'-]*)"), "requester"),
+    (re.compile(r"\b(?:asked|requested) by @?([a-z][\w.'-]*)"), "requester"),
+    (re.compile(r"\bfrom ([\w.+-]+@[\w-]+(?:\.[\w-]+)+)"), "requester"),
+    (re.compile(r"\bfrom @([a-z][\w.'-]*)"), "requester"),
+    (re.compile(r"\bassigned to @?([a-z][\w.'-]*)"), "assignee"),
+    (re.compile(r"\bmention(?:s|ed|ing)? (?:of )?@?([a-z][\w.'-]*)"), "mentioned"),
+    (re.compile(r"(?<![\w.])@([a-z][\w.'-]*)"), None),
+]
+# Words that follow "mentioned", "from" etc. without naming anyone; channel-wide
+# mentions aren't people either (they are kept out of the people index)
+_NOT_PEOPLE = {
+    "the", "a", "an", "them", "him", "her", "it", "this", "that", "these", "those",
+    "anyone", "someone", "everyone", "you", "my", "your", "our", "any", "all",
+    "in", "on", "at", "by", "from", "to", "with", "for", "of", "about", "into", "over", "and", "or",
+    "today", "tomorrow", "yesterday", "week", "email", "emails", "teams", "loop", "tasks", "task",
+} | GROUP_MENTIONS
+
+
+class ChatIntent(NamedTuple):
+    window: Optional[str]
+    source: Optional[SourceType]
+    status: Optional[TaskStatus]
+    priority: Optional[PriorityLevel]
+    kind: str
+    # A person reference as written ("sarah", "mike.chen", ME) and optionally the role
+    person: Optional[str] = None
+    role: Optional[str] = None
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+def parse_intent(message: str) -> ChatIntent:
+    """The intent chat_interface answers for message"""
+    return _parse_normalized(normalize_message(message))
+
+
+@lru_cache(maxsize=1024)
+def _parse_normalized(msg: str) -> ChatIntent:
+    window = None
+    if "today" in msg:
+        window = WINDOW_TODAY
+    elif "tomorrow" in msg:
+        window = WINDOW_TOMORROW
+    elif "week" in msg:
+        window = WINDOW_WEEK
+    elif "overdue" in msg:
+        window = WINDOW_OVERDUE
+
+    source = None
+    if "email" in msg and "@" not in msg:
+        source = SourceType.EMAIL
+    elif "teams" in msg:
+        source = SourceType.TEAMS
+    elif "loop" in msg:
+        source = SourceType.LOOP
+
+    status = None
+    if "pending" in msg or "incomplete" in msg:
+        status = TaskStatus.PENDING
+    elif "completed" in msg or "done" in msg:
+        status = TaskStatus.COMPLETED
+
+    priority = None
+    if "critical" in msg:
+        priority = PriorityLevel.CRITICAL
+    elif "high" in msg and "priority" in msg:
+        priority = PriorityLevel.HIGH
+
+    if "how many" in msg or "count" in msg or "total" in msg:
+        kind = KIND_COUNT
+    elif "list" in msg or "show" in msg or "what are" in msg or "get" in msg:
+        kind = KIND_LIST
+    elif "priority" in msg or "urgent" in msg:
+        kind = KIND_PRIORITY
+    elif "next" in msg or "what should" in msg or "recommend" in msg:
+        kind = KIND_NEXT
+    elif "summary" in msg or "overview" in msg or "status" in msg:
+        kind = KIND_SUMMARY
+    else:
+        kind = KIND_DEFAULT
+
+    person, role = _parse_person(msg)
+    if person is not None and kind == KIND_DEFAULT:
+        kind = KIND_LIST
+
+    return ChatIntent(window, source, status, priority, kind, person, role)
+
+
+def _parse_person(msg: str) -> Tuple[Optional[str], Optional[str]]:
+    if _MY_MENTIONS.search(msg):
+        return ME, "mentioned"
+    for pattern, role in _PERSON:
+        for match in pattern.finditer(msg):
+            name = match.group(1).rstrip(".'-")
+            if name in ("me", "i", "myself"):
+                return ME, role
+            if name and name not in _NOT_PEOPLE:
+                return name, role
+    return None, None
+
+
+class ChatCache:
+    """LRU map of cache key -> (response, expires_at or None)"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[str, Optional[datetime]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, now: Optional[datetime] = None) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at is not None and (now or datetime.now()) >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: Hashable, response: str, expires_at: Optional[datetime] = None):
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
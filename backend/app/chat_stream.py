@@ -0,0 +1,173 @@
+"""Streaming chat: the rule-based answer first, then generated text token by token.
+
+The structured part of a chat answer (counts, top tasks) comes from
+AIEngine.chat_interface in milliseconds and is sent as soon as it is ready.
+Generated text from the text-generation pipeline follows as it is decoded,
+until the model finishes, the latency budget runs out or the client goes
+away, whichever is first.
+
+With an in-process pipeline, tokens are streamed through transformers'
+TextIteratorStreamer and generation is stopped between tokens by a stopping
+criterion. A sidecar pipeline can't stream, so its whole completion is sent
+as one piece if it arrives within the budget.
+"""
+import asyncio
+import json
+import threading
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+# Tokens generated after the structured answer
+MAX_NEW_TOKENS = 60
+
+STOPPED_COMPLETE = "complete"
+STOPPED_BUDGET = "budget"
+STOPPED_CANCELLED = "cancelled"
+STOPPED_UNAVAILABLE = "unavailable"
+STOPPED_ERROR = "error"
+
+
+def sse_event(event: str, data: dict) -> str:
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def generation_prompt(message: str, answer: str) -> str:
+    return f"Question: {message}\nTask overview:\n{answer}\nAdvice:"
+
+
+class GenerationStream:
+    """Iterates generated text pieces (words as they are decoded); .stopped says why it ended"""
+
+    def __init__(self, generator, prompt: str, budget: float, cancel: threading.Event,
+                 max_new_tokens: int = MAX_NEW_TOKENS):
+        self.generator = generator
+        self.prompt = prompt
+        self.deadline = time.monotonic() + budget
+        self.cancel = cancel
+        self.max_new_tokens = max_new_tokens
+        self.stopped: Optional[str] = None
+        self.pieces = 0
+
+    def __iter__(self) -> Iterator[str]:
+        if self.generator is None:
+            self.stopped = STOPPED_UNAVAILABLE
+            return iter(())
+        if hasattr(self.generator, "tokenizer") and hasattr(self.generator, "model"):
+            return self._stream_tokens()
+        return self._whole_completion()
+
+    def _out_of_time(self) -> bool:
+        return self.cancel.is_set() or time.monotonic() >= self.deadline
+
+    def _end_reason(self) -> str:
+        if self.cancel.is_set():
+            return STOPPED_CANCELLED
+        if time.monotonic() >= self.deadline:
+            return STOPPED_BUDGET
+        return STOPPED_COMPLETE
+
+    def _stream_tokens(self) -> Iterator[str]:
+        from queue import Empty
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        stream = self
+
+        class _Deadline(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return stream._out_of_time()
+
+        streamer = TextIteratorStreamer(self.generator.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        failure = []
+
+        def generate():
+            try:
+                self.generator(
+                    self.prompt,
+                    streamer=streamer,
+                    max_new_tokens=self.max_new_tokens,
+                    stopping_criteria=StoppingCriteriaList([_Deadline()]),
+                    return_full_text=False,
+                    pad_token_id=self.generator.tokenizer.eos_token_id,
+                )
+            except Exception as e:
+                failure.append(e)
+                streamer.end()
+
+        worker = threading.Thread(target=generate, name="chat-generation", daemon=True)
+        worker.start()
+        while True:
+            streamer.timeout = max(self.deadline - time.monotonic(), 0.0)
+            try:
+                piece = next(streamer)
+            except StopIteration:
+                break
+            except Empty:
+                break  # generation stalled past the budget; the criterion stops it at the next token
+            if piece:
+                self.pieces += 1
+                yield piece
+            if self._out_of_time():
+                break
+        self.stopped = STOPPED_ERROR if failure else self._end_reason()
+
+    def _whole_completion(self) -> Iterator[str]:
+        result = []
+
+        def generate():
+            try:
+                result.append(self.generator(self.prompt, max_new_tokens=self.max_new_tokens,
+                                             return_full_text=False))
+            except Exception as e:
+                result.append(e)
+
+        worker = threading.Thread(target=generate, name="chat-generation", daemon=True)
+        worker.start()
+        # Wait in short steps so a cancelled request doesn't hold a thread for the whole budget
+        while worker.is_alive() and not self._out_of_time():
+            worker.join(0.05)
+        if not result:
+            self.stopped = self._end_reason()
+            return
+        if isinstance(result[0], Exception):
+            self.stopped = STOPPED_ERROR
+            return
+        text = result[0][0]["generated_text"] if result[0] else ""
+        if text.strip():
+            self.pieces += 1
+            yield text
+        self.stopped = STOPPED_COMPLETE
+
+
+async def stream_pieces(generation: GenerationStream) -> AsyncIterator[str]:
+    """generation's pieces, produced on a worker thread.
+
+    Waiting on the queue (unlike waiting on a threadpool call) is cancelled
+    at once when the client disconnects, and cancelling stops the generation.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # the loop is gone; nobody is listening any more
+
+    def produce():
+        try:
+            for piece in generation:
+                put(piece)
+        finally:
+            put(finished)
+
+    threading.Thread(target=produce, name="chat-stream", daemon=True).start()
+    try:
+        while True:
+            piece = await queue.get()
+            if piece is finished:
+                return
+            yield piece
+    finally:
+        generation.cancel.set()
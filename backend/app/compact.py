@@ -0,0 +1,589 @@
+"""Compact, array-backed storage for large task sets.
+
+A pydantic ExtractedTask with its own metadata dict costs a few kilobytes;
+across millions of tasks the sender, channel, tags and priority_reasoning
+strings are duplicated over and over. CompactTaskTable stores the same data
+column-wise:
+
+- enums as one-byte codes, dates and urgency scores as float64 epochs
+- repeated strings (source ids, assignees, and the metadata fields that repeat
+  across tasks: sender, channel, email subject, tags, priority reasoning)
+  interned once in a StringTable and referenced by integer id
+- free text (task id, title, description) and the rest of the metadata, as
+  JSON, appended to one UTF-8 buffer
+
+Deleting rows and rewriting metadata leave unreferenced bytes behind in the
+buffer and string table; maybe_compact() copies the table into fresh ones
+once that garbage passes a threshold.
+
+Pydantic objects are only built when a row is read, i.e. at the API boundary.
+"""
+import heapq
+import json
+import math
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from app.models import ExtractedTask, PriorityLevel, SourceType, TaskStatus
+
+_SOURCES = list(SourceType)
+_PRIORITIES = list(PriorityLevel)
+_STATUSES = list(TaskStatus)
+_SOURCE_CODES = {value: code for code, value in enumerate(_SOURCES)}
+_PRIORITY_CODES = {value: code for code, value in enumerate(_PRIORITIES)}
+_STATUS_CODES = {value: code for code, value in enumerate(_STATUSES)}
+
+_NONE = -1
+_NO_DATE = math.nan
+# Metadata fields whose values repeat across tasks; each is interned on its own.
+# Every other metadata field is per task and stored inline after the description.
+_INTERNED_METADATA = ("sender", "channel", "email_subject", "tags", "priority_reasoning")
+_INTERNED_COLUMNS = tuple("_meta_" + field for field in _INTERNED_METADATA)
+# Parsed interned metadata values kept around for reads; cleared when it grows past this
+_METADATA_CACHE_SIZE = 4096
+# maybe_compact() copies a table once this share of its buffer and strings is garbage...
+_COMPACT_RATIO = 0.5
+# ...and the garbage is at least this large
+_COMPACT_MIN_BYTES = 1 << 20
+# Flag bits recording which datetimes were timezone-aware
+_DUE_AWARE = 1
+_EXTRACTED_AWARE = 2
+# Flag bit: only the part of the description after the title is stored
+# (rule-based tasks take both from the same line)
+_DESCRIPTION_EXTENDS_TITLE = 4
+_COMPLETED_AWARE = 8
+
+# Due-date facet buckets, relative to the time of the scan
+DUE_BUCKETS = ("overdue", "today", "this_week", "later", "none")
+
+
+class Facets(NamedTuple):
+    """Result of CompactTaskTable.facets()"""
+    rows: List[int]
+    # dimension -> value -> rows matching every filter except that dimension's
+    counts: Dict[str, Dict[str, int]]
+
+
+class StringTable:
+    """Append-only interned strings; ids stay valid as the table grows"""
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+
+    def get(self, string_id: int) -> Optional[str]:
+        return None if string_id == _NONE else self._strings[string_id]
+
+    def __len__(self):
+        return len(self._strings)
+
+    def nbytes(self) -> int:
+        return sum(len(s) for s in self._strings)
+
+
+def _to_epoch(value: Optional[datetime]):
+    """(epoch seconds, aware flag); naive datetimes keep their wall time via UTC"""
+    if value is None:
+        return _NO_DATE, False
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc).timestamp(), False
+    return value.timestamp(), True
+
+
+def _from_epoch(value: float, aware: bool) -> Optional[datetime]:
+    if math.isnan(value):
+        return None
+    dt = datetime.fromtimestamp(value, tz=timezone.utc)
+    return dt if aware else dt.replace(tzinfo=None)
+
+
+class CompactTaskTable(Sequence):
+    """Column store of ExtractedTask rows; reading a row builds the pydantic model.
+
+    Rows can be updated in place (status, priority, urgency, metadata) and
+    deleted; deleted text stays in the buffer until compact() is called.
+    Tables made by copy() and take() share the buffer and string table, which
+    only ever grow, so published snapshots stay valid.
+    """
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        self.strings = strings if strings is not None else StringTable()
+        self._source = array("b")
+        self._priority = array("b")
+        self._status = array("b")
+        self._flags = array("B")
+        self._due = array("d")
+        self._extracted = array("d")
+        self._completed = array("d")
+        self._urgency = array("d")
+        self._source_id = array("i")
+        self._assigned_to = array("i")
+        for name in _INTERNED_COLUMNS:
+            setattr(self, name, array("i"))
+        # id, title, description and inline metadata JSON of a row are stored back to back in _text
+        self._text = bytearray()
+        self._text_start = array("Q")
+        self._id_len = array("I")
+        self._title_len = array("I")
+        self._description_len = array("I")
+        self._metadata_len = array("I")
+        # Bytes of _text no row of this table references
+        self._garbage = 0
+        self._row_by_id: Optional[Dict[str, int]] = None
+        self._metadata_cache: Dict[int, object] = {}
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[ExtractedTask], strings: Optional[StringTable] = None) -> "CompactTaskTable":
+        table = cls(strings)
+        table.extend(tasks)
+        return table
+
+    # Writing
+
+    def append(self, task: ExtractedTask):
+        due, due_aware = _to_epoch(task.due_date)
+        extracted, extracted_aware = _to_epoch(task.extracted_date)
+        completed, completed_aware = _to_epoch(task.completed_date)
+        flags = (
+            (_DUE_AWARE if due_aware else 0)
+            | (_EXTRACTED_AWARE if extracted_aware else 0)
+            | (_COMPLETED_AWARE if completed_aware else 0)
+        )
+        description = task.description
+        if task.title and description.startswith(task.title):
+            description = description[len(task.title):]
+            flags |= _DESCRIPTION_EXTENDS_TITLE
+
+        self._source.append(_SOURCE_CODES[task.source_type])
+        self._priority.append(_PRIORITY_CODES[task.priority])
+        self._status.append(_STATUS_CODES[task.status])
+        self._flags.append(flags)
+        self._due.append(due)
+        self._extracted.append(extracted)
+        self._completed.append(completed)
+        self._urgency.append(_NO_DATE if task.urgency_score is None else task.urgency_score)
+        self._source_id.append(self.strings.intern(task.source_id))
+        self._assigned_to.append(self.strings.intern(task.assigned_to))
+        interned, inline = self._encode_metadata(task.metadata)
+        for column, string_id in zip(self._interned_columns(), interned):
+            column.append(string_id)
+
+        encoded = [task.id.encode("utf-8"), task.title.encode("utf-8"), description.encode("utf-8"), inline]
+        self._text_start.append(len(self._text))
+        self._id_len.append(len(encoded[0]))
+        self._title_len.append(len(encoded[1]))
+        self._description_len.append(len(encoded[2]))
+        self._metadata_len.append(len(inline))
+        self._text += b"".join(encoded)
+
+        if self._row_by_id is not None:
+            self._row_by_id[task.id] = len(self._source) - 1
+
+    def extend(self, tasks: Iterable[ExtractedTask]):
+        for task in tasks:
+            self.append(task)
+
+    def update(self, row: int, task: ExtractedTask):
+        """Write a modified task back; id, title and description must be unchanged"""
+        due, due_aware = _to_epoch(task.due_date)
+        completed, completed_aware = _to_epoch(task.completed_date)
+        self._priority[row] = _PRIORITY_CODES[task.priority]
+        self._status[row] = _STATUS_CODES[task.status]
+        self._due[row] = due
+        self._completed[row] = completed
+        self._flags[row] = (
+            (self._flags[row] & ~(_DUE_AWARE | _COMPLETED_AWARE))
+            | (_DUE_AWARE if due_aware else 0)
+            | (_COMPLETED_AWARE if completed_aware else 0)
+        )
+        self._urgency[row] = _NO_DATE if task.urgency_score is None else task.urgency_score
+        self._assigned_to[row] = self.strings.intern(task.assigned_to)
+        interned, inline = self._encode_metadata(task.metadata)
+        for column, string_id in zip(self._interned_columns(), interned):
+            column[row] = string_id
+        start = self._text_start[row]
+        head = self._id_len[row] + self._title_len[row] + self._description_len[row]
+        if self._text[start + head:start + head + self._metadata_len[row]] != inline:
+            # Other tables may still read the old block, so the row moves to a new one at the end
+            block = self._text[start:start + head] + inline
+            self._garbage += head + self._metadata_len[row]
+            self._text_start[row] = len(self._text)
+            self._metadata_len[row] = len(inline)
+            self._text += block
+
+    def set_status(self, row: int, status: TaskStatus, at: Optional[datetime] = None):
+        """Change a row's status; completing it records completed_date (at, default now)"""
+        code = _STATUS_CODES[status]
+        if status != TaskStatus.COMPLETED:
+            self._completed[row] = _NO_DATE
+        elif self._status[row] != code:
+            completed, completed_aware = _to_epoch(at if at is not None else datetime.now())
+            self._completed[row] = completed
+            self._flags[row] = (self._flags[row] & ~_COMPLETED_AWARE) | (_COMPLETED_AWARE if completed_aware else 0)
+        self._status[row] = code
+
+    def delete(self, row: int):
+        self._garbage += self._row_bytes(row)
+        for column in self._columns():
+            del column[row]
+        self._row_by_id = None
+
+    def take(self, rows: Iterable[int]) -> "CompactTaskTable":
+        """New table with the given rows in that order.
+
+        Columns are copied; the text buffer and string table are shared, which
+        is safe because both are append-only and rows address them by offset.
+        """
+        rows = list(rows)
+        table = CompactTaskTable(self.strings)
+        for name in self._COLUMN_NAMES:
+            column = getattr(self, name)
+            setattr(table, name, array(column.typecode, [column[row] for row in rows]))
+        table._text = self._text
+        table._garbage = len(self._text) - table._live_bytes()
+        return table
+
+    def copy(self) -> "CompactTaskTable":
+        """Independent copy of all rows, sharing the append-only text and strings"""
+        table = CompactTaskTable(self.strings)
+        for name in self._COLUMN_NAMES:
+            column = getattr(self, name)
+            setattr(table, name, array(column.typecode, column))
+        table._text = self._text
+        table._garbage = self._garbage
+        if self._row_by_id is not None:
+            table._row_by_id = dict(self._row_by_id)
+        return table
+
+    def sorted_by_urgency(self) -> "CompactTaskTable":
+        """Rows reordered most urgent first (stable; unscored rows last)"""
+        urgency = self._urgency
+        order = sorted(range(len(self)), key=lambda row: -urgency[row] if not math.isnan(urgency[row]) else math.inf)
+        return self.take(order)
+
+    def compact(self) -> "CompactTaskTable":
+        """Copy of the rows into a new text buffer and string table, without the
+        text and strings only deleted rows and rewritten metadata used
+        """
+        strings = StringTable()
+        renumbered = {_NONE: _NONE}
+        table = CompactTaskTable(strings)
+        for name in self._COLUMN_NAMES:
+            column = getattr(self, name)
+            if name in self._STRING_COLUMNS:
+                ids = array(column.typecode)
+                for string_id in column:
+                    new_id = renumbered.get(string_id)
+                    if new_id is None:
+                        new_id = renumbered[string_id] = strings.intern(self.strings.get(string_id))
+                    ids.append(new_id)
+                setattr(table, name, ids)
+            elif name != "_text_start":
+                setattr(table, name, array(column.typecode, column))
+        text = self._text
+        for row in range(len(self)):
+            start = self._text_start[row]
+            table._text_start.append(len(table._text))
+            table._text += text[start:start + self._row_bytes(row)]
+        if self._row_by_id is not None:
+            table._row_by_id = dict(self._row_by_id)
+        return table
+
+    def maybe_compact(self, ratio: float = _COMPACT_RATIO, min_bytes: int = _COMPACT_MIN_BYTES) -> "CompactTaskTable":
+        """compact() if more than ratio of the text buffer (and at least min_bytes) is
+        garbage, else self. The check is O(1); the string table is compacted along
+        with the text, since dropping rows is what orphans strings.
+        """
+        if self._garbage >= min_bytes and self._garbage > ratio * len(self._text):
+            return self.compact()
+        return self
+
+    def garbage_bytes(self) -> int:
+        """Bytes of the shared text buffer no row of this table references"""
+        return self._garbage
+
+    def _encode_metadata(self, metadata: dict) -> tuple:
+        """(string id per interned field, inline JSON of the other fields)"""
+        if not metadata:
+            return (_NONE,) * len(_INTERNED_METADATA), b""
+        interned = tuple(
+            self.strings.intern(json.dumps(metadata[field], sort_keys=True, default=str)) if field in metadata else _NONE
+            for field in _INTERNED_METADATA
+        )
+        inline = {key: value for key, value in metadata.items() if key not in _INTERNED_METADATA}
+        if not inline:
+            return interned, b""
+        return interned, json.dumps(inline, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+
+    def _row_bytes(self, row: int) -> int:
+        return self._id_len[row] + self._title_len[row] + self._description_len[row] + self._metadata_len[row]
+
+    def _live_bytes(self) -> int:
+        return sum(self._id_len) + sum(self._title_len) + sum(self._description_len) + sum(self._metadata_len)
+
+    _COLUMN_NAMES = (
+        "_source", "_priority", "_status", "_flags", "_due", "_extracted",
+        "_completed", "_urgency", "_source_id", "_assigned_to",
+        "_text_start", "_id_len", "_title_len", "_description_len", "_metadata_len",
+    ) + _INTERNED_COLUMNS
+    # Columns holding StringTable ids
+    _STRING_COLUMNS = frozenset(("_source_id", "_assigned_to") + _INTERNED_COLUMNS)
+
+    def _columns(self):
+        return tuple(getattr(self, name) for name in self._COLUMN_NAMES)
+
+    def _interned_columns(self):
+        return tuple(getattr(self, name) for name in _INTERNED_COLUMNS)
+
+    # Reading
+
+    def __len__(self) -> int:
+        return len(self._source)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.task(i) for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("task row out of range")
+        return self.task(row)
+
+    def __iter__(self) -> Iterator[ExtractedTask]:
+        for row in range(len(self)):
+            yield self.task(row)
+
+    def task(self, row: int) -> ExtractedTask:
+        """Build the pydantic model for a row (stored data was validated on the way in)"""
+        flags = self._flags[row]
+        start = self._text_start[row]
+        title_start = start + self._id_len[row]
+        description_start = title_start + self._title_len[row]
+        urgency = self._urgency[row]
+        title = self._text[title_start:description_start].decode("utf-8")
+        description = self._text[description_start:description_start + self._description_len[row]].decode("utf-8")
+        if flags & _DESCRIPTION_EXTENDS_TITLE:
+            description = title + description
+        return ExtractedTask.model_construct(
+            id=self._text[start:title_start].decode("utf-8"),
+            title=title,
+            description=description,
+            source_type=_SOURCES[self._source[row]],
+            source_id=self.strings.get(self._source_id[row]),
+            priority=_PRIORITIES[self._priority[row]],
+            due_date=_from_epoch(self._due[row], bool(flags & _DUE_AWARE)),
+            extracted_date=_from_epoch(self._extracted[row], bool(flags & _EXTRACTED_AWARE)),
+            assigned_to=self.strings.get(self._assigned_to[row]),
+            status=_STATUSES[self._status[row]],
+            completed_date=_from_epoch(self._completed[row], bool(flags & _COMPLETED_AWARE)),
+            urgency_score=None if math.isnan(urgency) else urgency,
+            metadata=self._metadata_dict(row),
+        )
+
+    def title(self, row: int) -> str:
+        title_start = self._text_start[row] + self._id_len[row]
+        return self._text[title_start:title_start + self._title_len[row]].decode("utf-8")
+
+    def task_id(self, row: int) -> str:
+        start = self._text_start[row]
+        return self._text[start:start + self._id_len[row]].decode("utf-8")
+
+    def row_of(self, task_id: str) -> Optional[int]:
+        """Row holding task_id (the id -> row map is built on first use)"""
+        if self._row_by_id is None:
+            self._row_by_id = {self.task_id(row): row for row in range(len(self))}
+        return self._row_by_id.get(task_id)
+
+    def get(self, task_id: str) -> Optional[ExtractedTask]:
+        row = self.row_of(task_id)
+        return None if row is None else self.task(row)
+
+    def _metadata_dict(self, row: int) -> dict:
+        length = self._metadata_len[row]
+        if length:
+            start = self._text_start[row] + self._id_len[row] + self._title_len[row] + self._description_len[row]
+            metadata = json.loads(self._text[start:start + length])
+        else:
+            metadata = {}
+        for field, column in zip(_INTERNED_METADATA, self._interned_columns()):
+            string_id = column[row]
+            if string_id != _NONE:
+                metadata[field] = self._interned_value(string_id)
+        return dict(sorted(metadata.items()))
+
+    def _interned_value(self, string_id: int):
+        parsed = self._metadata_cache.get(string_id)
+        if parsed is None:
+            parsed = json.loads(self.strings.get(string_id))
+            if len(self._metadata_cache) >= _METADATA_CACHE_SIZE:
+                self._metadata_cache.clear()
+            self._metadata_cache[string_id] = parsed
+        # Lists (tags) are copied so callers can't change the cached value
+        return list(parsed) if isinstance(parsed, list) else parsed
+
+    # Column access without building models
+
+    def urgency_entries(self) -> Iterator[tuple]:
+        """(task id, urgency score) per row, for building an UrgencyIndex"""
+        for row in range(len(self)):
+            urgency = self._urgency[row]
+            yield self.task_id(row), (None if math.isnan(urgency) else urgency)
+
+    def reference_entries(self, start: int = 0, end: Optional[int] = None) -> Iterator[tuple]:
+        """(task id, assigned_to, metadata) per row start..end, for building a PeopleIndex"""
+        for row in range(start, len(self) if end is None else end):
+            yield self.task_id(row), self.strings.get(self._assigned_to[row]), self._metadata_dict(row)
+
+    def select(
+        self,
+        source_type: Optional[SourceType] = None,
+        priority: Optional[PriorityLevel] = None,
+        status: Optional[TaskStatus] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+    ) -> List[int]:
+        """Rows matching all given filters, evaluated on the columns.
+
+        Date bounds are naive wall-clock times; aware due dates are compared
+        in UTC. Rows without a due date never match a date bound.
+        """
+        rows = range(len(self))
+        if source_type is not None:
+            code = _SOURCE_CODES[source_type]
+            rows = [r for r in rows if self._source[r] == code]
+        if priority is not None:
+            code = _PRIORITY_CODES[priority]
+            rows = [r for r in rows if self._priority[r] == code]
+        if status is not None:
+            code = _STATUS_CODES[status]
+            rows = [r for r in rows if self._status[r] == code]
+        if due_from is not None:
+            bound = _to_epoch(due_from.replace(tzinfo=None))[0]
+            rows = [r for r in rows if self._due[r] >= bound]  # NaN compares False
+        if due_to is not None:
+            bound = _to_epoch(due_to.replace(tzinfo=None))[0]
+            rows = [r for r in rows if self._due[r] <= bound]
+        return list(rows)
+
+    def scan_columns(self) -> tuple:
+        """(source, priority, status, due) columns for whole-table scans: enum codes in
+        list(Enum) order and due dates as UTC epochs (NaN when undated). Don't modify them.
+        """
+        return self._source, self._priority, self._status, self._due
+
+    def facets(
+        self,
+        source_type: Optional[SourceType] = None,
+        priority: Optional[PriorityLevel] = None,
+        status: Optional[TaskStatus] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        now: Optional[datetime] = None,
+    ) -> Facets:
+        """select()'s rows plus facet counts, in one pass over the columns.
+
+        The count for a facet value is how many rows would match if that
+        dimension's filter were set to it: every other filter still applies.
+        The due-date buckets are the facet of the date range filter.
+        """
+        now = (now or datetime.now()).replace(tzinfo=None)
+        now_epoch = _to_epoch(now)[0]
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        tomorrow = _to_epoch(midnight + timedelta(days=1))[0]
+        week = _to_epoch(midnight + timedelta(days=7))[0]
+        source_code = _SOURCE_CODES[source_type] if source_type is not None else _NONE
+        priority_code = _PRIORITY_CODES[priority] if priority is not None else _NONE
+        status_code = _STATUS_CODES[status] if status is not None else _NONE
+        due_low = _to_epoch(due_from.replace(tzinfo=None))[0] if due_from is not None else -math.inf
+        due_high = _to_epoch(due_to.replace(tzinfo=None))[0] if due_to is not None else math.inf
+        date_filtered = due_from is not None or due_to is not None
+
+        sources = [0] * len(_SOURCES)
+        priorities = [0] * len(_PRIORITIES)
+        statuses = [0] * len(_STATUSES)
+        buckets = [0] * len(DUE_BUCKETS)
+        rows = []
+        for row, (source, prio, stat, due) in enumerate(zip(self._source, self._priority, self._status, self._due)):
+            if due != due:  # NaN: no due date
+                bucket = 4
+                due_ok = not date_filtered
+            else:
+                bucket = 0 if due < now_epoch else 1 if due < tomorrow else 2 if due < week else 3
+                due_ok = due_low <= due <= due_high
+            source_ok = source_code == _NONE or source == source_code
+            priority_ok = priority_code == _NONE or prio == priority_code
+            status_ok = status_code == _NONE or stat == status_code
+
+            if priority_ok and status_ok and due_ok:
+                sources[source] += 1
+            if source_ok and status_ok and due_ok:
+                priorities[prio] += 1
+            if source_ok and priority_ok and due_ok:
+                statuses[stat] += 1
+            if source_ok and priority_ok and status_ok:
+                buckets[bucket] += 1
+                if due_ok:
+                    rows.append(row)
+
+        return Facets(
+            rows=rows,
+            counts={
+                "source_type": {value.value: n for value, n in zip(_SOURCES, sources)},
+                "priority": {value.value: n for value, n in zip(_PRIORITIES, priorities)},
+                "status": {value.value: n for value, n in zip(_STATUSES, statuses)},
+                "due": dict(zip(DUE_BUCKETS, buckets)),
+            },
+        )
+
+    def most_urgent_rows(self, rows: Iterable[int], k: int) -> List[int]:
+        """The k most urgent of rows (unscored rows count as 0, ties in row order), as UrgencyIndex orders them"""
+        urgency = self._urgency
+        return heapq.nsmallest(k, rows, key=lambda row: (-urgency[row] if urgency[row] == urgency[row] else 0.0, row))
+
+    def open_rows(self) -> List[int]:
+        """Rows not yet completed"""
+        completed_code = _STATUS_CODES[TaskStatus.COMPLETED]
+        return [row for row in range(len(self)) if self._status[row] != completed_code]
+
+    def expired(
+        self,
+        completed_before: Optional[datetime] = None,
+        overdue_before: Optional[datetime] = None,
+    ) -> List[int]:
+        """Rows completed before completed_before, or still open and due before overdue_before.
+
+        A completed row without a completed_date (e.g. completed at the source)
+        counts from its extracted_date. Bounds are naive wall-clock times, as in select().
+        """
+        completed_code = _STATUS_CODES[TaskStatus.COMPLETED]
+        completed_bound = _to_epoch(completed_before.replace(tzinfo=None))[0] if completed_before else None
+        overdue_bound = _to_epoch(overdue_before.replace(tzinfo=None))[0] if overdue_before else None
+        rows = []
+        for row in range(len(self)):
+            if self._status[row] == completed_code:
+                if completed_bound is None:
+                    continue
+                completed = self._completed[row]
+                if math.isnan(completed):
+                    completed = self._extracted[row]
+                if completed < completed_bound:
+                    rows.append(row)
+            elif overdue_bound is not None and self._due[row] < overdue_bound:
+                rows.append(row)
+        return rows
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns, text buffer and string table"""
+        columns = sum(column.buffer_info()[1] * column.itemsize for column in self._columns())
+        return columns + len(self._text) + self.strings.nbytes()
@@ -0,0 +1,354 @@
+"""Pluggable source connectors for task extraction.
+
+A connector yields source items (OutlookEmail, TeamsMessage, LoopTask) lazily
+and keeps a watermark - the newest received_date / timestamp / created_date it
+has handed out - so the next sync only reads items newer than that.
+
+Connectors are looked up by type name in CONNECTOR_TYPES. New sources are added
+with @register_connector (or a "module:Class" type in data/connectors.json),
+without touching main.py.
+"""
+import email
+import email.policy
+import importlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import parseaddr, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from app.models import OutlookEmail, LoopTask, TeamsMessage
+from app.metrics import STAGE_SECONDS, SWALLOWED_EXCEPTIONS
+
+
+# Source kind -> (item model, field holding the item's timestamp)
+SOURCE_KINDS = {
+    "email": (OutlookEmail, "received_date"),
+    "teams": (TeamsMessage, "timestamp"),
+    "loop": (LoopTask, "created_date"),
+}
+
+CONNECTOR_TYPES: Dict[str, Type["SourceConnector"]] = {}
+
+
+def register_connector(type_name: str):
+    """Class decorator registering a connector under a config type name"""
+    def decorator(cls):
+        CONNECTOR_TYPES[type_name] = cls
+        return cls
+    return decorator
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """Parse an ISO timestamp into an aware UTC datetime (None if unparseable)"""
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+class WatermarkStore:
+    """Persists per-connector checkpoints ({"watermark": iso, ...}) in a JSON file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._checkpoints: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._checkpoints = json.load(f)
+            except (OSError, ValueError):
+                print(f"Ignoring unreadable watermark file {self.path}")
+
+    def get(self, name: str) -> Dict[str, Any]:
+        return dict(self._checkpoints.get(name, {}))
+
+    def set(self, name: str, checkpoint: Dict[str, Any]):
+        self._checkpoints[name] = dict(checkpoint)
+
+    def reset(self):
+        self._checkpoints = {}
+
+    def save(self):
+        """Write checkpoints atomically so a crash never leaves a torn file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._checkpoints, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class SourceConnector:
+    """Base class: subclasses implement iter_records() yielding raw item dicts.
+
+    read() validates records into the kind's model and skips anything older
+    than the checkpoint watermark, or at it and already read (the ids seen at
+    the watermark are checkpointed with it). After read() is exhausted,
+    self.checkpoint holds the state to persist for the next sync; callers save
+    it only once the items were processed so a failed sync is retried.
+    """
+
+    def __init__(self, name: str, kind: str, path: Path):
+        if kind not in SOURCE_KINDS:
+            raise ValueError(f"Unknown source kind '{kind}' for connector '{name}'")
+        self.name = name
+        self.kind = kind
+        self.path = Path(path)
+        self.model, self.timestamp_field = SOURCE_KINDS[kind]
+        self.checkpoint: Dict[str, Any] = {}
+
+    def iter_records(self, checkpoint: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def read(self, checkpoint: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Yield validated items newer than the checkpoint watermark"""
+        checkpoint = dict(checkpoint or {})
+        self.checkpoint = checkpoint
+        watermark = parse_timestamp(checkpoint.get("watermark") or "")
+        seen_at_watermark = set(checkpoint.get("watermark_ids", ()))
+        newest = watermark
+        # Items sharing the newest timestamp; the next read may bring more of them
+        newest_ids = set(seen_at_watermark)
+        validation_seconds = 0.0
+
+        for record in self.iter_records(checkpoint):
+            # Compare on the raw field first so old items never pay for validation
+            item_ts = parse_timestamp(str(record.get(self.timestamp_field, "")))
+            if watermark and item_ts and (
+                item_ts < watermark or (item_ts == watermark and str(record.get("id")) in seen_at_watermark)
+            ):
+                continue
+            started = time.perf_counter()
+            try:
+                item = self.model(**record)
+            except Exception as e:
+                SWALLOWED_EXCEPTIONS.inc("connectors.invalid_record")
+                print(f"Skipping invalid {self.kind} record in {self.name}: {e}")
+                continue
+            finally:
+                validation_seconds += time.perf_counter() - started
+            if item_ts and (newest is None or item_ts > newest):
+                newest = item_ts
+                newest_ids = set()
+            if item_ts and item_ts == newest:
+                newest_ids.add(item.id)
+            yield item
+
+        # Recorded once per read, not per item
+        STAGE_SECONDS.observe(validation_seconds, "validation")
+        if newest:
+            checkpoint["watermark"] = newest.isoformat()
+            checkpoint["watermark_ids"] = sorted(newest_ids)
+
+
+@register_connector("json")
+class JsonFileConnector(SourceConnector):
+    """A JSON array of items, e.g. data/outlook_emails.json"""
+
+    def iter_records(self, checkpoint):
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            with STAGE_SECONDS.time("json_load"):
+                records = json.load(f)
+        yield from records
+
+
+@register_connector("ndjson")
+class NdjsonConnector(SourceConnector):
+    """One JSON item per line; the byte offset is checkpointed so syncs seek past old lines"""
+
+    def iter_records(self, checkpoint):
+        if not self.path.exists():
+            return
+        offset = checkpoint.get("offset", 0)
+        if offset > self.path.stat().st_size:
+            offset = 0  # file was truncated or rotated
+
+        load_seconds = 0.0
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written line, pick it up next sync
+                offset += len(line)
+                checkpoint["offset"] = offset
+                line = line.strip()
+                if not line:
+                    continue
+                started = time.perf_counter()
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    SWALLOWED_EXCEPTIONS.inc("connectors.malformed_line")
+                    print(f"Skipping malformed line in {self.path}")
+                    continue
+                finally:
+                    load_seconds += time.perf_counter() - started
+                yield record
+        STAGE_SECONDS.observe(load_seconds, "json_load")
+
+
+def _email_record(msg, fallback_id: str) -> Dict[str, Any]:
+    """Map a parsed RFC 822 message onto OutlookEmail fields"""
+    sender_name, sender = parseaddr(str(msg.get("From", "")))
+
+    received_date = ""
+    if msg.get("Date"):
+        try:
+            received = parsedate_to_datetime(str(msg["Date"]))
+            if received.tzinfo is None:
+                received = received.replace(tzinfo=timezone.utc)
+            received_date = received.astimezone(timezone.utc).isoformat()
+        except (TypeError, ValueError):
+            pass
+
+    body_part = msg.get_body(preferencelist=("plain", "html"))
+    body = body_part.get_content() if body_part is not None else ""
+
+    return {
+        "id": str(msg.get("Message-ID", "")).strip("<> ") or fallback_id,
+        "subject": str(msg.get("Subject", "")),
+        "sender": sender,
+        "sender_name": sender_name or sender,
+        "body": body,
+        "received_date": received_date,
+        "has_attachments": any(True for _ in msg.iter_attachments()),
+        "in_reply_to": str(msg.get("In-Reply-To", "")).strip("<> ") or None,
+        "references": [ref.strip("<>") for ref in str(msg.get("References", "")).split()],
+    }
+
+
+@register_connector("eml_dir")
+class EmlDirectoryConnector(SourceConnector):
+    """A directory of .eml files; file mtimes are checkpointed so old files are never opened.
+
+    Files can share an mtime (coarse filesystem clocks, bulk copies), and one
+    may land after a sync already read others with that mtime, so the names
+    read at the newest mtime are checkpointed too.
+    """
+
+    def __init__(self, name: str, kind: str, path: Path):
+        super().__init__(name, kind, path)
+        if kind != "email":
+            raise ValueError(f"Connector '{name}': eml_dir only supports kind 'email'")
+
+    def iter_records(self, checkpoint):
+        if not self.path.is_dir():
+            return
+        last_mtime = checkpoint.get("mtime", 0.0)
+        seen_at_mtime = set(checkpoint.get("mtime_names", ()))
+        newest_mtime = last_mtime
+        newest_names = set(seen_at_mtime)
+
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".eml") or not entry.is_file():
+                    continue
+                mtime = entry.stat().st_mtime
+                if mtime < last_mtime or (mtime == last_mtime and entry.name in seen_at_mtime):
+                    continue
+                if mtime > newest_mtime:
+                    newest_mtime = mtime
+                    newest_names = set()
+                if mtime == newest_mtime:
+                    newest_names.add(entry.name)
+                with open(entry.path, "rb") as f:
+                    msg = email.message_from_binary_file(f, policy=email.policy.default)
+                yield _email_record(msg, Path(entry.name).stem)
+
+        checkpoint["mtime"] = newest_mtime
+        checkpoint["mtime_names"] = sorted(newest_names)
+
+
+@register_connector("mbox")
+class MboxConnector(SourceConnector):
+    """An mbox file read as a stream; the offset of the last complete message is checkpointed"""
+
+    def __init__(self, name: str, kind: str, path: Path):
+        super().__init__(name, kind, path)
+        if kind != "email":
+            raise ValueError(f"Connector '{name}': mbox only supports kind 'email'")
+
+    def iter_records(self, checkpoint):
+        if not self.path.exists():
+            return
+        offset = checkpoint.get("offset", 0)
+        if offset > self.path.stat().st_size:
+            offset = 0
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            message_lines: List[bytes] = []
+            message_start = offset
+            position = offset
+            previous_blank = True
+
+            for line in f:
+                if line.startswith(b"From ") and previous_blank and message_lines:
+                    yield self._record(message_lines, message_start)
+                    checkpoint["offset"] = position
+                    message_lines = []
+                    message_start = position
+                if not (line.startswith(b"From ") and not message_lines):
+                    message_lines.append(line)
+                previous_blank = line.strip() == b""
+                position += len(line)
+
+            if message_lines:
+                yield self._record(message_lines, message_start)
+                checkpoint["offset"] = position
+
+    def _record(self, lines: List[bytes], start: int) -> Dict[str, Any]:
+        # Undo mboxrd ">From " quoting before parsing
+        raw = b"".join(line[1:] if line.startswith(b">From ") else line for line in lines)
+        msg = email.message_from_bytes(raw, policy=email.policy.default)
+        return _email_record(msg, f"{self.path.stem}_{start}")
+
+
+def _resolve_connector_type(type_name: str) -> Type[SourceConnector]:
+    """Look up a registered type, or import one given as 'package.module:ClassName'"""
+    if type_name in CONNECTOR_TYPES:
+        return CONNECTOR_TYPES[type_name]
+    if ":" in type_name:
+        module_name, class_name = type_name.split(":", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+    raise ValueError(f"Unknown connector type '{type_name}'")
+
+
+DEFAULT_CONNECTORS = [
+    {"name": "outlook", "type": "json", "kind": "email", "path": "outlook_emails.json"},
+    {"name": "loop", "type": "json", "kind": "loop", "path": "loop_tasks.json"},
+    {"name": "teams", "type": "json", "kind": "teams", "path": "teams_messages.json"},
+]
+
+
+def build_connectors(data_dir: Path, config_path: Optional[Path] = None) -> List[SourceConnector]:
+    """Build connectors from data_dir/connectors.json, falling back to the bundled JSON files.
+
+    Relative paths in the config resolve against data_dir.
+    """
+    data_dir = Path(data_dir)
+    config_path = Path(config_path) if config_path else data_dir / "connectors.json"
+
+    specs = DEFAULT_CONNECTORS
+    if config_path.exists():
+        with open(config_path, "r", encoding="utf-8") as f:
+            specs = json.load(f)
+
+    connectors = []
+    for spec in specs:
+        connector_cls = _resolve_connector_type(spec["type"])
+        connectors.append(
+            connector_cls(
+                name=spec.get("name", spec["path"]),
+                kind=spec["kind"],
+                path=data_dir / spec["path"],
+            )
+        )
+    return connectors
@@ -0,0 +1,274 @@
+"""Conversation threading for email reply chains and Teams channel bursts.
+
+Replies and follow-ups repeat the same action items. ConversationTracker
+assigns each incoming message to a thread and remembers which lines the
+thread has already produced, so extraction and classification only run on
+the lines a message adds (its delta) instead of once per reply.
+
+Emails are threaded by In-Reply-To/References headers. Only a reply or
+forward (an RE:/FW: subject) without those headers falls back to the thread
+with the same stripped subject, and only if that thread was active within
+DEFAULT_SUBJECT_WINDOW: unrelated mails that share a subject ("Weekly
+status") stay separate. Teams messages are threaded by the parent message
+they reply to, else by channel and sender within a time window around the
+thread's existing messages.
+
+Seen lines are forgotten after DEFAULT_LINE_TTL, so a request repeated
+later produces a task again, and threads idle for DEFAULT_IDLE_TTL are
+dropped, so tracker state stays bounded.
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from app.connectors import parse_timestamp
+from app.models import OutlookEmail, TeamsMessage
+
+DEFAULT_TEAMS_WINDOW = timedelta(minutes=30)
+DEFAULT_SUBJECT_WINDOW = timedelta(days=14)
+DEFAULT_LINE_TTL = timedelta(days=7)
+DEFAULT_IDLE_TTL = timedelta(days=30)
+# Idle threads are swept every this many assignments
+_SWEEP_EVERY = 256
+
+_SUBJECT_PREFIX = re.compile(r"^\s*(?:(?:re|fw|fwd|aw|sv|wg|antw)\s*(?:\[\d+\])?\s*:\s*)+", re.IGNORECASE)
+_LINE_NOISE = re.compile(r"[\W_]+", re.UNICODE)
+# A follow-up asking for something gets a task even without task-like lines
+_REQUEST_CUE = re.compile(
+    r"\?|\b(?:please|can you|could you|would you|need(?:s|ed)? to|must|asap|by (?:eod|tomorrow|\w+day))\b",
+    re.IGNORECASE,
+)
+
+
+def strip_subject_prefixes(subject: str) -> str:
+    """'RE: FW: Budget report' -> 'Budget report'"""
+    return _SUBJECT_PREFIX.sub("", subject).strip()
+
+
+def normalize_subject(subject: str) -> str:
+    return " ".join(strip_subject_prefixes(subject).lower().split())
+
+
+def has_request(lines: Iterable[str]) -> bool:
+    """Whether new lines of a follow-up message ask for something"""
+    return any(_REQUEST_CUE.search(line) for line in lines)
+
+
+def _line_key(line: str) -> str:
+    """Key under which two lines count as the same content (case, bullets, punctuation ignored)"""
+    return _LINE_NOISE.sub(" ", line.lower()).strip()
+
+
+class Conversation:
+    """A thread: its messages and the content it has already produced tasks from"""
+
+    __slots__ = ("thread_id", "channel", "sender", "message_ids", "seen_lines", "first_seen", "last_seen", "line_ttl")
+
+    def __init__(
+        self,
+        thread_id: str,
+        channel: Optional[str] = None,
+        sender: Optional[str] = None,
+        line_ttl: Optional[timedelta] = DEFAULT_LINE_TTL,
+    ):
+        self.thread_id = thread_id
+        self.channel = channel
+        self.sender = sender
+        self.message_ids: List[str] = []
+        # Line key -> when it was last seen (None for undated messages)
+        self.seen_lines: Dict[str, Optional[datetime]] = {}
+        self.first_seen: Optional[datetime] = None
+        self.last_seen: Optional[datetime] = None
+        self.line_ttl = line_ttl
+
+    def add_message(self, message_id: str, timestamp: Optional[datetime]):
+        self.message_ids.append(message_id)
+        if timestamp:
+            if self.first_seen is None or timestamp < self.first_seen:
+                self.first_seen = timestamp
+            if self.last_seen is None or timestamp > self.last_seen:
+                self.last_seen = timestamp
+
+    @property
+    def size(self) -> int:
+        return len(self.message_ids)
+
+    def delta(self, lines: List[str]) -> List[str]:
+        """Return the lines this thread hasn't seen within line_ttl of its latest message, and mark them seen"""
+        now = self.last_seen
+        if now is not None and self.line_ttl is not None:
+            cutoff = now - self.line_ttl
+            self.seen_lines = {key: at for key, at in self.seen_lines.items() if at is None or at >= cutoff}
+        new_lines = []
+        for line in lines:
+            key = _line_key(line)
+            if not key:
+                new_lines.append(line)  # keep blank lines so paragraph structure survives
+                continue
+            seen = key in self.seen_lines
+            self.seen_lines[key] = now
+            if not seen:
+                new_lines.append(line)
+        return new_lines
+
+    def metadata(self) -> Dict[str, object]:
+        return {"thread_id": self.thread_id, "thread_position": self.size}
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "thread_id": self.thread_id,
+            "channel": self.channel,
+            "sender": self.sender,
+            "message_ids": self.message_ids,
+            "seen_lines": {key: at.isoformat() if at else None for key, at in self.seen_lines.items()},
+            "first_seen": self.first_seen.isoformat() if self.first_seen else None,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Conversation":
+        thread = cls(data["thread_id"], data.get("channel"), data.get("sender"))
+        thread.message_ids = list(data["message_ids"])
+        thread.first_seen = datetime.fromisoformat(data["first_seen"]) if data.get("first_seen") else None
+        thread.last_seen = datetime.fromisoformat(data["last_seen"]) if data.get("last_seen") else None
+        seen = data["seen_lines"]
+        if isinstance(seen, list):  # saved before lines had times
+            thread.seen_lines = {key: thread.last_seen for key in seen}
+        else:
+            thread.seen_lines = {key: datetime.fromisoformat(at) if at else None for key, at in seen.items()}
+        return thread
+
+
+class ConversationTracker:
+    """Assigns messages to threads incrementally, across extraction runs"""
+
+    def __init__(
+        self,
+        teams_window: timedelta = DEFAULT_TEAMS_WINDOW,
+        subject_window: timedelta = DEFAULT_SUBJECT_WINDOW,
+        line_ttl: Optional[timedelta] = DEFAULT_LINE_TTL,
+        idle_ttl: Optional[timedelta] = DEFAULT_IDLE_TTL,
+    ):
+        self.teams_window = teams_window
+        self.subject_window = subject_window
+        self.line_ttl = line_ttl
+        self.idle_ttl = idle_ttl
+        self.reset()
+
+    def reset(self):
+        self._threads: Dict[str, Conversation] = {}
+        self._by_message: Dict[str, str] = {}
+        self._by_subject: Dict[str, str] = {}
+        self._by_channel: Dict[str, List[str]] = {}
+        self._latest: Optional[datetime] = None
+        self._assigned = 0
+
+    def __len__(self):
+        return len(self._threads)
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-serializable state, for restoring with load_dict()"""
+        return {
+            "threads": [thread.to_dict() for thread in self._threads.values()],
+            "by_message": self._by_message,
+            "by_subject": self._by_subject,
+            "by_channel": self._by_channel,
+        }
+
+    def load_dict(self, data: Dict[str, object]):
+        self._threads = {thread["thread_id"]: Conversation.from_dict(thread) for thread in data["threads"]}
+        self._by_message = dict(data["by_message"])
+        self._by_subject = dict(data["by_subject"])
+        # Channel keys saved before threads were per sender can't be matched any more
+        self._by_channel = {key: list(ids) for key, ids in data["by_channel"].items() if "\x1f" in key}
+        self._latest = max((t.last_seen for t in self._threads.values() if t.last_seen), default=None)
+
+    def _new_thread(self, thread_id: str, channel: Optional[str] = None, sender: Optional[str] = None) -> Conversation:
+        thread = Conversation(thread_id, channel, sender, self.line_ttl)
+        self._threads[thread_id] = thread
+        return thread
+
+    def _parent_thread(self, parent_ids: Iterable[Optional[str]]) -> Optional[Conversation]:
+        for parent_id in parent_ids:
+            if parent_id and parent_id in self._by_message:
+                return self._threads[self._by_message[parent_id]]
+        return None
+
+    def _added(self, thread: Conversation, message_id: str, timestamp: Optional[datetime]):
+        self._by_message[message_id] = thread.thread_id
+        thread.add_message(message_id, timestamp)
+        if timestamp and (self._latest is None or timestamp > self._latest):
+            self._latest = timestamp
+        self._assigned += 1
+        if self._assigned % _SWEEP_EVERY == 0:
+            self.expire()
+
+    def assign_email(self, email: OutlookEmail) -> Conversation:
+        timestamp = parse_timestamp(email.received_date)
+        thread = self._parent_thread([email.in_reply_to, *reversed(email.references)])
+
+        subject_key = normalize_subject(email.subject)
+        is_reply = subject_key and strip_subject_prefixes(email.subject) != email.subject.strip()
+        if thread is None and is_reply:
+            candidate = self._threads.get(self._by_subject.get(subject_key, ""))
+            if candidate is not None and _within(candidate, timestamp, self.subject_window):
+                thread = candidate
+
+        if thread is None:
+            thread = self._new_thread(f"thread_{email.id}")
+            # A new thread takes over its subject, so replies join the latest one
+            if subject_key:
+                self._by_subject[subject_key] = thread.thread_id
+        self._added(thread, email.id, timestamp)
+        return thread
+
+    def assign_teams(self, message: TeamsMessage) -> Conversation:
+        timestamp = parse_timestamp(message.timestamp)
+        thread = self._parent_thread([message.reply_to])
+
+        key = _teams_key(message.channel, message.sender_email or message.sender_name)
+        if thread is None and timestamp:
+            # Recent threads are at the end; messages mostly arrive in order
+            for thread_id in reversed(self._by_channel.get(key, [])[-8:]):
+                candidate = self._threads[thread_id]
+                if candidate.first_seen and candidate.first_seen - self.teams_window <= timestamp <= candidate.last_seen + self.teams_window:
+                    thread = candidate
+                    break
+
+        if thread is None:
+            thread = self._new_thread(f"thread_{message.id}", message.channel, message.sender_email or message.sender_name)
+            self._by_channel.setdefault(key, []).append(thread.thread_id)
+        self._added(thread, message.id, timestamp)
+        return thread
+
+    def expire(self, before: Optional[datetime] = None) -> int:
+        """Drop threads whose last message is older than before (default: idle_ttl before the
+        newest message seen); returns how many were dropped
+        """
+        if before is None:
+            if self.idle_ttl is None or self._latest is None:
+                return 0
+            before = self._latest - self.idle_ttl
+        idle = {thread_id for thread_id, thread in self._threads.items() if thread.last_seen and thread.last_seen < before}
+        if not idle:
+            return 0
+        for thread_id in idle:
+            for message_id in self._threads.pop(thread_id).message_ids:
+                self._by_message.pop(message_id, None)
+        self._by_subject = {key: thread_id for key, thread_id in self._by_subject.items() if thread_id not in idle}
+        self._by_channel = {
+            key: kept for key, ids in self._by_channel.items()
+            if (kept := [thread_id for thread_id in ids if thread_id not in idle])
+        }
+        return len(idle)
+
+
+def _teams_key(channel: str, sender: str) -> str:
+    return f"{channel}\x1f{sender.lower()}"
+
+
+def _within(thread: Conversation, timestamp: Optional[datetime], window: timedelta) -> bool:
+    """Whether timestamp is within window of the thread's messages (undated counts as within)"""
+    if timestamp is None or thread.last_seen is None:
+        return True
+    return thread.first_seen - window <= timestamp <= thread.last_seen + window
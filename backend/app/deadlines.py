@@ -0,0 +1,207 @@
+"""Deadline extraction for email and Teams tasks.
+
+Resolves phrases such as "by next Friday", "by Nov 20th", "EOD today",
+"in 3 days" or "11/20" against the message's received_date / timestamp.
+
+All phrases are matched by a single precompiled regular expression, and the
+resolution of a (phrase, reference day) pair is memoized, since the same few
+phrases repeat across thousands of messages. General-purpose date parsers are
+deliberately avoided: they are orders of magnitude slower per line.
+"""
+import calendar
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Time of day a date-only deadline resolves to (matches the Loop task data)
+END_OF_DAY = time(17, 0)
+
+_WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "fri": 4, "friday": 4,
+    "saturday": 5, "sunday": 6,  # no "sat"/"sun": too common as plain words
+}
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "ten": 10}
+
+
+def _alternation(words) -> str:
+    # Longest first so "thursday" wins over "thu"
+    return "|".join(sorted(words, key=len, reverse=True))
+
+
+_WEEKDAY = _alternation(_WEEKDAYS)
+_MONTH = _alternation(_MONTHS)
+_COUNT = r"\d{1,3}|" + _alternation(_NUMBER_WORDS)
+
+# Every alternative starts at a word boundary with one of a few letters or a
+# digit; checking that first lets the scan skip most positions cheaply.
+# Input is lowercased before matching, which is faster than IGNORECASE.
+_GRAMMAR = re.compile(
+    r"\b(?=[\dacdefijmnostw])(?:"
+    r"(?P<eod>(?:eod|cob|eow|end of (?:the )?(?:day|business day)|close of business)\b)"
+    r"|(?P<period>end of (?:the )?(?:week|month)\b|(?:this|next) (?:week|month)\b)"
+    r"|(?P<relday>(?:today|tonight|tomorrow)\b)"
+    rf"|(?P<which>this |next |coming )?(?P<weekday>{_WEEKDAY})\b\.?"
+    rf"|(?P<month>{_MONTH})\.? (?P<mday>\d{{1,2}})(?:st|nd|rd|th)?\b(?:,? (?P<year>\d{{4}})\b)?"
+    rf"|(?P<dmday>\d{{1,2}})(?:st|nd|rd|th)? (?:of )?(?P<dmonth>{_MONTH})\b\.?(?:,? (?P<dyear>\d{{4}})\b)?"
+    r"|(?P<iso>\d{4}-\d{2}-\d{2})\b"
+    r"|(?P<num_month>1[0-2]|0?[1-9])/(?P<num_day>3[01]|[12]\d|0?[1-9])(?:/(?P<num_year>\d{4}|\d{2}))?\b"
+    rf"|in (?P<count>{_COUNT}) (?P<unit>hours?|hrs?|days?|business days?|weeks?)\b"
+    r")"
+)
+# Cue words marking a phrase as the deadline, checked just before a match
+_CUE = re.compile(r"(?:\bby|\bbefore|\bdue(?: on| by)?|\buntil|\btill|\bno later than|\bdeadline(?: is)?:?)\s+$")
+_CUE_LOOKBEHIND = 20
+
+
+def _at_end_of_day(day: date, tz) -> datetime:
+    return datetime.combine(day, END_OF_DAY, tzinfo=tz)
+
+
+def _next_weekday(day: date, weekday: int) -> date:
+    """The first date on or after day falling on weekday"""
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+
+def _add_business_days(day: date, count: int) -> date:
+    while count > 0:
+        day += timedelta(days=1)
+        if day.weekday() < 5:
+            count -= 1
+    return day
+
+
+def _closest_year(reference: date, month: int, mday: int) -> Optional[date]:
+    """Year-less dates refer to the next occurrence, unless only recently past"""
+    try:
+        candidate = date(reference.year, month, mday)
+    except ValueError:
+        return None
+    if (reference - candidate).days > 180:
+        try:
+            candidate = date(reference.year + 1, month, mday)
+        except ValueError:
+            return None
+    return candidate
+
+
+@lru_cache(maxsize=8192)
+def _resolve_day(phrase: str, reference: date) -> Optional[date]:
+    """Resolve a matched date-only phrase (lowercased) to a calendar day"""
+    match = _GRAMMAR.fullmatch(phrase)
+    if match is None:
+        return None
+    groups = match.groupdict()
+
+    if groups["eod"]:
+        if groups["eod"] == "eow":
+            return _next_weekday(reference, 4)
+        return reference
+    if groups["period"]:
+        period = groups["period"]
+        if period.endswith("month"):
+            year, month = reference.year, reference.month
+            if period.startswith("next"):
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return date(year, month, calendar.monthrange(year, month)[1])
+        friday = _next_weekday(reference, 4)
+        return friday + timedelta(days=7) if period.startswith("next") else friday
+    if groups["relday"]:
+        return reference + timedelta(days=1) if groups["relday"] == "tomorrow" else reference
+    if groups["weekday"]:
+        day = _next_weekday(reference, _WEEKDAYS[groups["weekday"]])
+        # "next Friday" said early in a week means the Friday of the following week
+        if (groups["which"] or "").strip() == "next" and day.isocalendar()[:2] == reference.isocalendar()[:2]:
+            day += timedelta(days=7)
+        return day
+    if groups["month"] or groups["dmonth"]:
+        month = _MONTHS[groups["month"] or groups["dmonth"]]
+        mday = int(groups["mday"] or groups["dmday"])
+        year = groups["year"] or groups["dyear"]
+        if year:
+            try:
+                return date(int(year), month, mday)
+            except ValueError:
+                return None
+        return _closest_year(reference, month, mday)
+    if groups["iso"]:
+        try:
+            return date.fromisoformat(groups["iso"])
+        except ValueError:
+            return None
+    if groups["num_month"]:
+        month, mday = int(groups["num_month"]), int(groups["num_day"])
+        if groups["num_year"]:
+            year = int(groups["num_year"])
+            year += 2000 if year < 100 else 0
+            try:
+                return date(year, month, mday)
+            except ValueError:
+                return None
+        return _closest_year(reference, month, mday)
+    if groups["count"]:
+        count = groups["count"]
+        count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+        unit = groups["unit"]
+        if unit.startswith("business"):
+            return _add_business_days(reference, count)
+        if unit.startswith("day"):
+            return reference + timedelta(days=count)
+        if unit.startswith("week"):
+            return reference + timedelta(weeks=count)
+    return None
+
+
+class DeadlineExtractor:
+    """Finds the deadline in a line of text relative to a reference timestamp"""
+
+    def extract(self, text: str, reference: Optional[datetime]) -> Optional[datetime]:
+        """Return the deadline mentioned in text, or None."""
+        return self.find(text, reference)[0]
+
+    def find(self, text: str, reference: Optional[datetime]) -> Tuple[Optional[datetime], bool]:
+        """Return (deadline, cued) for text; cued is True if a cue word introduced it.
+
+        When several dates appear, one introduced by a cue word ("by",
+        "before", "due", ...) wins over a bare mention. Naive references are
+        treated as UTC; results carry the reference's timezone.
+        """
+        if reference is None:
+            return None, False
+        if reference.tzinfo is None:
+            reference = reference.replace(tzinfo=timezone.utc)
+
+        text = text.lower()
+        chosen = None
+        cued = False
+        for match in _GRAMMAR.finditer(text):
+            if chosen is None:
+                chosen = match
+            if _CUE.search(text, max(0, match.start() - _CUE_LOOKBEHIND), match.start()):
+                chosen = match
+                cued = True
+                break
+        if chosen is None:
+            return None, False
+
+        # Relative hours can't be memoized per day; everything else can
+        unit = chosen.group("unit")
+        if unit and unit.startswith(("hour", "hr")):
+            count = chosen.group("count")
+            count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+            return reference + timedelta(hours=count), cued
+
+        day = _resolve_day(chosen.group(0).rstrip("."), reference.date())
+        return (_at_end_of_day(day, reference.tzinfo) if day else None), cued
+
+
+def cache_info():
+    """Hit/miss statistics of the phrase resolution cache"""
+    return _resolve_day.cache_info()
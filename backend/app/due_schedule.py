@@ -0,0 +1,278 @@
+"""Due-date state that follows the clock, updated one task at a time.
+
+Urgency scores fold priority and the absolute due date together, so the
+urgency order never changes as time passes. What does change is each task's
+due bucket (later, this week, today, overdue) and whether it is upcoming
+(due within three days), and with them the dashboard's due counts and the
+insights' overdue and upcoming figures.
+
+A DueSchedule classifies every row of a snapshot's table once and keeps a
+min-heap of each row's next threshold: the start of its due week (six days
+before the due day), three days before the due time, the start of the due
+day and the due time itself. advance() pops only the thresholds that have
+passed, moves those rows on, adjusts the counts and returns a DueEvent for
+each row that reached a threshold. Times are naive wall-clock datetimes compared as UTC, as in
+CompactTaskTable.select() and facets().
+
+DueScheduler runs advance() in the background whenever the earliest
+threshold passes, so events go out on time without anyone rescanning.
+"""
+import heapq
+import math
+import threading
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.compact import DUE_BUCKETS, CompactTaskTable
+from app.metrics import DUE_TRANSITIONS, STAGE_SECONDS
+from app.models import PriorityLevel, SourceType, TaskStatus
+
+_SOURCES = list(SourceType)
+_PRIORITIES = list(PriorityLevel)
+_STATUSES = list(TaskStatus)
+_DAY = 86400.0
+_UNDATED = -1
+# Stages a dated row moves through, their names in events, and the facet bucket
+# of each; stages 2 and 3 are "upcoming" in the insights
+_LATER, _WEEK, _UPCOMING, _TODAY, _OVERDUE = range(5)
+STAGES = ("later", "this_week", "due_in_3_days", "today", "overdue")
+_STAGE_BUCKET = ("later", "this_week", "this_week", "today", "overdue")
+_NONE_BUCKET = DUE_BUCKETS.index("none")
+_BUCKET_INDEX = {bucket: index for index, bucket in enumerate(DUE_BUCKETS)}
+
+
+def _wall_epoch(moment: Optional[datetime]) -> float:
+    moment = moment or datetime.now()
+    return moment.replace(tzinfo=timezone.utc).timestamp() if moment.tzinfo is None else moment.timestamp()
+
+
+def _wall_datetime(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+def _thresholds(due: float) -> Tuple[float, float, float, float]:
+    """When a row due at due enters each of stages 1-4 (overdue only once due has passed)"""
+    midnight = due - due % _DAY
+    return midnight - 6 * _DAY, due - 3 * _DAY, midnight, math.nextafter(due, math.inf)
+
+
+class DueEvent(NamedTuple):
+    task_id: str
+    stage: str
+    previous: str
+    at: datetime
+
+
+class DueSchedule:
+    """Per-row due stage, the heap of next thresholds and the counts that depend on them.
+
+    Also keeps the table's source, priority and status totals, so everything
+    the insights and the unfiltered dashboard show is available without a scan.
+    """
+
+    def __init__(self, table: CompactTaskTable, now: Optional[datetime] = None, _empty: bool = False):
+        self._table = table
+        self._lock = threading.Lock()
+        self._stage = array("b")
+        self._heap: List[Tuple[float, int]] = []
+        self._upcoming = set()
+        self._by_source = [0] * len(_SOURCES)
+        self._by_priority = [0] * len(_PRIORITIES)
+        self._by_status = [0] * len(_STATUSES)
+        self._by_bucket = [0] * len(DUE_BUCKETS)
+        if not _empty:
+            with STAGE_SECONDS.time("due_schedule"):
+                self._heap = self._add_rows(0, _wall_epoch(now))
+                heapq.heapify(self._heap)
+
+    def _add_rows(self, start: int, now: float) -> List[Tuple[float, int]]:
+        """Classify rows start.. of the table at now; returns their (next threshold, row) entries"""
+        sources, priorities, statuses, dues = self._table.scan_columns()
+        stages = self._stage
+        entries = []
+        for row in range(start, len(self._table)):
+            self._by_source[sources[row]] += 1
+            self._by_priority[priorities[row]] += 1
+            self._by_status[statuses[row]] += 1
+            due = dues[row]
+            if due != due:  # NaN: no due date
+                stages.append(_UNDATED)
+                self._by_bucket[_NONE_BUCKET] += 1
+                continue
+            thresholds = _thresholds(due)
+            stage = 0
+            while stage < _OVERDUE and thresholds[stage] <= now:
+                stage += 1
+            stages.append(stage)
+            self._by_bucket[_BUCKET_INDEX[_STAGE_BUCKET[stage]]] += 1
+            if stage in (_UPCOMING, _TODAY):
+                self._upcoming.add(row)
+            if stage < _OVERDUE:
+                entries.append((thresholds[stage], row))
+        return entries
+
+    def copy(self, table: CompactTaskTable) -> "DueSchedule":
+        """Schedule for table, a copy of this one's table with the same rows (possibly more
+        appended, or one deleted that remove() is then told about)
+        """
+        with self._lock:
+            schedule = DueSchedule(table, _empty=True)
+            schedule._stage = array("b", self._stage)
+            schedule._heap = list(self._heap)
+            schedule._upcoming = set(self._upcoming)
+            schedule._by_source = list(self._by_source)
+            schedule._by_priority = list(self._by_priority)
+            schedule._by_status = list(self._by_status)
+            schedule._by_bucket = list(self._by_bucket)
+        return schedule
+
+    def extend(self, now: Optional[datetime] = None):
+        """Classify rows appended to the table since this schedule covered it"""
+        with self._lock:
+            for entry in self._add_rows(len(self._stage), _wall_epoch(now)):
+                heapq.heappush(self._heap, entry)
+
+    def remove(self, table: CompactTaskTable, row: int):
+        """Drop row of table, the table before the row was deleted; later rows move up one"""
+        sources, priorities, statuses, _ = table.scan_columns()
+        with self._lock:
+            self._by_source[sources[row]] -= 1
+            self._by_priority[priorities[row]] -= 1
+            self._by_status[statuses[row]] -= 1
+            stage = self._stage[row]
+            self._by_bucket[_NONE_BUCKET if stage == _UNDATED else _BUCKET_INDEX[_STAGE_BUCKET[stage]]] -= 1
+            del self._stage[row]
+            # Renumbering keeps the heap order: rows after the deleted one stay after all earlier rows
+            self._heap = [(at, r - 1 if r > row else r) for at, r in self._heap if r != row]
+            self._upcoming = {r - 1 if r > row else r for r in self._upcoming if r != row}
+
+    def set_status(self, row: int, previous: TaskStatus):
+        """Account for a row whose status changed from previous to what the table now holds"""
+        _, _, statuses, _ = self._table.scan_columns()
+        with self._lock:
+            self._by_status[_STATUSES.index(previous)] -= 1
+            self._by_status[statuses[row]] += 1
+
+    def advance(self, now: Optional[datetime] = None) -> List[DueEvent]:
+        """Move rows whose thresholds have passed by now; one event per row that moved"""
+        now_epoch = _wall_epoch(now)
+        events = []
+        with self._lock:
+            heap = self._heap
+            if not heap or heap[0][0] > now_epoch:
+                return events
+            _, _, _, dues = self._table.scan_columns()
+            while heap and heap[0][0] <= now_epoch:
+                _, row = heapq.heappop(heap)
+                stage = self._stage[row]
+                thresholds = _thresholds(dues[row])
+                new_stage = stage
+                while new_stage < _OVERDUE and thresholds[new_stage] <= now_epoch:
+                    new_stage += 1
+                self._stage[row] = new_stage
+                if new_stage in (_UPCOMING, _TODAY):
+                    self._upcoming.add(row)
+                else:
+                    self._upcoming.discard(row)
+                if new_stage < _OVERDUE:
+                    heapq.heappush(heap, (thresholds[new_stage], row))
+
+                self._by_bucket[_BUCKET_INDEX[_STAGE_BUCKET[stage]]] -= 1
+                self._by_bucket[_BUCKET_INDEX[_STAGE_BUCKET[new_stage]]] += 1
+                at = _wall_datetime(thresholds[new_stage - 1])
+                events.append(DueEvent(self._table.task_id(row), STAGES[new_stage], STAGES[stage], at))
+                DUE_TRANSITIONS.inc(STAGES[new_stage])
+        return events
+
+    def next_at(self) -> Optional[datetime]:
+        """When the earliest pending threshold passes (None if no row has one)"""
+        with self._lock:
+            return _wall_datetime(self._heap[0][0]) if self._heap else None
+
+    # Counts as of the last advance()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Unfiltered facet counts, shaped like CompactTaskTable.facets().counts"""
+        with self._lock:
+            return {
+                "source_type": {value.value: n for value, n in zip(_SOURCES, self._by_source)},
+                "priority": {value.value: n for value, n in zip(_PRIORITIES, self._by_priority)},
+                "status": {value.value: n for value, n in zip(_STATUSES, self._by_status)},
+                "due": dict(zip(DUE_BUCKETS, self._by_bucket)),
+            }
+
+    def totals(self) -> Tuple[Dict[PriorityLevel, int], Dict[SourceType, int], int, List[int]]:
+        """(by priority, by source, overdue count, upcoming rows in table order) for the insights"""
+        with self._lock:
+            return (
+                dict(zip(_PRIORITIES, self._by_priority)),
+                dict(zip(_SOURCES, self._by_source)),
+                self._by_bucket[_BUCKET_INDEX["overdue"]],
+                sorted(self._upcoming),
+            )
+
+
+class DueEventLog:
+    """The last maxlen due events of a tenant, numbered so clients can poll for new ones"""
+
+    def __init__(self, maxlen: int = 1000):
+        self._events = deque(maxlen=maxlen)
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def extend(self, events: List[DueEvent]):
+        with self._lock:
+            for event in events:
+                self._last += 1
+                self._events.append((self._last, event))
+
+    def since(self, after: int = 0) -> Tuple[int, List[dict]]:
+        """(latest sequence number, events numbered after `after`, oldest first)"""
+        with self._lock:
+            return self._last, [
+                {"seq": seq, **event._asdict()} for seq, event in self._events if seq > after
+            ]
+
+
+class DueScheduler:
+    """Background thread calling advance() whenever the next threshold is due.
+
+    advance() updates every schedule and returns the seconds until the
+    earliest next threshold (None if none); the thread sleeps that long,
+    at most max_sleep, or until wake().
+    """
+
+    def __init__(self, advance: Callable[[], Optional[float]], max_sleep: float = 60.0):
+        self._advance = advance
+        self.max_sleep = max_sleep
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="due-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self._advance()
+            except Exception as e:
+                print(f"Error advancing due schedules: {e}")
+                delay = None
+            self._wake.wait(self.max_sleep if delay is None else min(max(delay, 0.0), self.max_sleep))
+            self._wake.clear()
@@ -0,0 +1,165 @@
+"""Streaming bulk export of tasks as NDJSON, CSV or Parquet.
+
+Each format is a generator of byte chunks fed to a StreamingResponse, so an
+export of the whole store holds one chunk of rows (or one Parquet row group)
+in memory at a time rather than the full list of task models.
+
+Parquet needs pyarrow, which is optional: require_parquet() raises
+ImportError when it is missing. Datetimes are written as UTC timestamps;
+naive ones (Loop due dates) keep their wall-clock time, as in the task table.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from app.models import ExtractedTask
+
+# Rows serialized per chunk of NDJSON / CSV output
+CHUNK_ROWS = 1000
+PARQUET_ROW_GROUP = 50_000
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),  # the response adds the charset
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+FIELDS = [
+    "id", "title", "description", "source_type", "source_id", "priority", "due_date",
+    "extracted_date", "assigned_to", "status", "completed_date", "urgency_score", "metadata",
+]
+_DATE_FIELDS = ("due_date", "extracted_date", "completed_date")
+
+
+def _batches(tasks: Iterable[ExtractedTask], size: int) -> Iterator[List[ExtractedTask]]:
+    iterator = iter(tasks)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _record(task: ExtractedTask) -> dict:
+    """Flat row: enums as values, metadata as a JSON string"""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "source_type": task.source_type.value,
+        "source_id": task.source_id,
+        "priority": task.priority.value,
+        "due_date": task.due_date,
+        "extracted_date": task.extracted_date,
+        "assigned_to": task.assigned_to,
+        "status": task.status.value,
+        "completed_date": task.completed_date,
+        "urgency_score": task.urgency_score,
+        "metadata": json.dumps(task.metadata, sort_keys=True, default=str) if task.metadata else None,
+    }
+
+
+def ndjson_chunks(tasks: Iterable[ExtractedTask]) -> Iterator[bytes]:
+    for batch in _batches(tasks, CHUNK_ROWS):
+        yield "".join(task.model_dump_json() + "\n" for task in batch).encode("utf-8")
+
+
+def csv_chunks(tasks: Iterable[ExtractedTask]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    for batch in _batches(tasks, CHUNK_ROWS):
+        for task in batch:
+            record = _record(task)
+            for field in _DATE_FIELDS:
+                if record[field] is not None:
+                    record[field] = record[field].isoformat()
+            writer.writerow(record)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def require_parquet():
+    """Import pyarrow, raising ImportError with an install hint if it is missing"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+class _DrainableSink:
+    """Write-only file object for ParquetWriter; written bytes are collected until drained"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(tasks: Iterable[ExtractedTask], row_group: int = PARQUET_ROW_GROUP) -> Iterator[bytes]:
+    """One Parquet file, emitted a row group at a time"""
+    pa, pq = require_parquet()
+    timestamp = pa.timestamp("us", tz="UTC")
+    schema = pa.schema([
+        ("id", pa.string()), ("title", pa.string()), ("description", pa.string()),
+        ("source_type", pa.string()), ("source_id", pa.string()), ("priority", pa.string()),
+        ("due_date", timestamp), ("extracted_date", timestamp), ("assigned_to", pa.string()),
+        ("status", pa.string()), ("completed_date", timestamp), ("urgency_score", pa.float64()),
+        ("metadata", pa.string()),
+    ])
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    closed = False
+    try:
+        for batch in _batches(tasks, row_group):
+            writer.write_table(pa.Table.from_pylist([_record(task) for task in batch], schema=schema))
+            yield sink.drain()
+        writer.close()
+        closed = True
+        yield sink.drain()
+    finally:
+        if not closed:
+            writer.close()
+
+
+def export_chunks(format: str, tasks: Iterable[ExtractedTask]) -> Iterator[bytes]:
+    if format == "ndjson":
+        return ndjson_chunks(tasks)
+    if format == "csv":
+        return csv_chunks(tasks)
+    if format == "parquet":
+        return parquet_chunks(tasks)
+    raise ValueError(f"Unknown export format '{format}'")
+
+
+def export_filename(format: str, now: Optional[datetime] = None) -> str:
+    now = now or datetime.now()
+    return f"tasks-{now:%Y%m%d-%H%M%S}.{FORMATS[format][1]}"
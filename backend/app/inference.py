@@ -0,0 +1,361 @@
+"""Model loading and the shared inference sidecar.
+
+Each uvicorn worker building its own AIEngine used to load its own copy of
+distilgpt2 and bart-large-mnli. With INFERENCE_MODE=sidecar the models are
+loaded once, in a separate process started with `python -m app.inference`
+(or by `python -m app.serve`). Workers then call that process over a local
+socket: a Unix domain socket on Linux/macOS, a named pipe on Windows. Worker
+memory no longer includes any model weights, so adding workers adds only
+their own small footprint.
+
+The proxies returned by connect_models() are called exactly like the
+transformers pipelines they stand in for, so AIEngine code is unchanged.
+
+Both ends unpickle what they receive, so connections are always
+authenticated. The key is INFERENCE_AUTHKEY when set (app.serve generates
+one for the sidecar and workers it starts); otherwise the sidecar generates
+one and writes it to a file next to its socket that only its user can read,
+and clients of the same user read it from there.
+
+The zero-shot classifier, bart-large-mnli, dominates CPU time. It can run
+as loaded (CLASSIFIER_BACKEND=fp32, the default), with its linear layers
+quantized to int8 when it is loaded (int8), or from an artifact quantized
+ahead of time with save_quantized_classifier() (CLASSIFIER_ARTIFACT=<dir>),
+which skips loading the fp32 weights at all. An artifact holds only the
+config, tokenizer and a state dict of tensors, read with
+torch.load(weights_only=True); the quantized module is rebuilt in code, so
+loading an artifact never unpickles arbitrary objects. INFERENCE_THREADS sets the
+intra-op thread count. benchmarks/bench_classifier.py measures accuracy and
+latency of each backend.
+"""
+import os
+import secrets
+import signal
+import sys
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+GENERATOR_MODEL = "distilgpt2"
+CLASSIFIER_MODEL = "facebook/bart-large-mnli"
+CLASSIFIER_BACKENDS = ("fp32", "int8")
+# File holding the quantized model's state dict inside an artifact directory
+ARTIFACT_STATE_FILE = "quantized_state_dict.pt"
+
+
+def default_address() -> str:
+    """Sidecar address: INFERENCE_ADDRESS, else a per-user socket / pipe name"""
+    address = os.getenv("INFERENCE_ADDRESS")
+    if address:
+        return address
+    if sys.platform == "win32":
+        return r"\\.\pipe\superproductive-inference"
+    return os.path.join(tempfile.gettempdir(), f"superproductive-inference-{os.getuid()}.sock")
+
+
+def key_path(address: str) -> Path:
+    """File where a sidecar without INFERENCE_AUTHKEY leaves its generated key"""
+    if address.startswith("\\\\"):
+        return Path(tempfile.gettempdir()) / (address.rsplit("\\", 1)[-1] + ".key")
+    return Path(address + ".key")
+
+
+def _authkey(address: str) -> bytes:
+    """Client key: INFERENCE_AUTHKEY, else the one the sidecar at address wrote.
+
+    Raises PermissionError if the key file could have been written by another
+    user, and FileNotFoundError if there is no key at all.
+    """
+    key = os.getenv("INFERENCE_AUTHKEY")
+    if key:
+        return key.encode("utf-8")
+    path = key_path(address)
+    if not path.exists():
+        raise FileNotFoundError(f"no INFERENCE_AUTHKEY set and no sidecar key at {path}")
+    if sys.platform != "win32":
+        stat = path.lstat()
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077 or not path.is_file() or path.is_symlink():
+            raise PermissionError(f"sidecar key {path} must be a regular file only its owner can access")
+    return path.read_bytes().strip()
+
+
+def _server_authkey(address: str) -> Tuple[bytes, Optional[Path]]:
+    """(sidecar key, file it was written to): INFERENCE_AUTHKEY, else a new random key
+    written to key_path(address) with owner-only permissions
+    """
+    key = os.getenv("INFERENCE_AUTHKEY")
+    if key:
+        return key.encode("utf-8"), None
+    key = secrets.token_hex(16).encode("utf-8")
+    path = key_path(address)
+    if path.is_symlink() or path.exists():
+        path.unlink()
+    # O_EXCL: fail rather than write through a file someone created in between
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as f:
+        f.write(key)
+    return key, path
+
+
+def classifier_backend() -> Tuple[str, Optional[Path]]:
+    """(backend, artifact dir) from CLASSIFIER_BACKEND and CLASSIFIER_ARTIFACT"""
+    artifact = os.getenv("CLASSIFIER_ARTIFACT")
+    if artifact:
+        return "artifact", Path(artifact)
+    backend = os.getenv("CLASSIFIER_BACKEND", "fp32").lower()
+    if backend not in CLASSIFIER_BACKENDS:
+        print(f"Unknown CLASSIFIER_BACKEND '{backend}' - using fp32")
+        backend = "fp32"
+    return backend, None
+
+
+def configure_threads(threads: Optional[int] = None) -> Optional[int]:
+    """Set torch's intra-op threads (INFERENCE_THREADS if not given); returns the count in use.
+
+    One inter-op thread: requests are already parallel across workers, and
+    a single forward pass gains nothing from running ops side by side.
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+    if threads is None and os.getenv("INFERENCE_THREADS"):
+        threads = int(os.environ["INFERENCE_THREADS"])
+    if threads:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # only settable before the first parallel op
+    return torch.get_num_threads()
+
+
+def quantize_linear(model):
+    """int8 dynamic quantization of the model's nn.Linear layers (weights int8, activations per batch)"""
+    import torch
+    engines = torch.backends.quantized.supported_engines
+    if torch.backends.quantized.engine not in engines or torch.backends.quantized.engine == "none":
+        torch.backends.quantized.engine = "qnnpack" if "qnnpack" in engines else engines[0]
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_classifier(backend: str = "fp32", artifact: Optional[Path] = None):
+    """The zero-shot pipeline on CPU: "fp32", "int8", or "artifact" loaded from the artifact dir"""
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    if backend == "artifact":
+        import torch
+        from transformers import AutoConfig
+        tokenizer = AutoTokenizer.from_pretrained(artifact)
+        model = quantize_linear(_uninitialized_model(AutoConfig.from_pretrained(artifact)))
+        # weights_only: tensors and plain containers only, never code
+        model.load_state_dict(torch.load(Path(artifact) / ARTIFACT_STATE_FILE, weights_only=True))
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(CLASSIFIER_MODEL)
+        model = AutoModelForSequenceClassification.from_pretrained(CLASSIFIER_MODEL)
+        if backend == "int8":
+            model = quantize_linear(model)
+    return pipeline("zero-shot-classification", model=model.eval(), tokenizer=tokenizer, device=-1)
+
+
+def _uninitialized_model(config):
+    """The classifier architecture for config, without spending time on random weights"""
+    from transformers import AutoModelForSequenceClassification
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        return AutoModelForSequenceClassification.from_config(config)
+    with no_init_weights():
+        return AutoModelForSequenceClassification.from_config(config)
+
+
+def save_quantized_classifier(out_dir: Path) -> Path:
+    """Quantize the classifier once and save it (config, tokenizer, state dict) for CLASSIFIER_ARTIFACT"""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    AutoTokenizer.from_pretrained(CLASSIFIER_MODEL).save_pretrained(out_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(CLASSIFIER_MODEL)
+    model.config.save_pretrained(out_dir)
+    torch.save(quantize_linear(model).state_dict(), out_dir / ARTIFACT_STATE_FILE)
+    return out_dir
+
+
+def load_pipelines() -> Tuple[Any, Any]:
+    """Load (generator, classifier) on CPU; either is None if unavailable.
+
+    Raises ImportError if transformers is not installed.
+    """
+    from transformers import pipeline
+    print("[OK] Transformers library available")
+    threads = configure_threads()
+
+    # Text generation pipeline
+    try:
+        generator = pipeline(
+            "text-generation",
+            model=GENERATOR_MODEL,
+            device=-1  # CPU
+        )
+        print("[OK] Text generation model loaded")
+    except Exception:
+        generator = None
+        print("Note: Text generation model couldn't load")
+
+    # Zero-shot classification
+    backend, artifact = classifier_backend()
+    try:
+        try:
+            classifier = load_classifier(backend, artifact)
+        except Exception as e:
+            if backend == "fp32":
+                raise
+            print(f"Note: {backend} classifier couldn't load ({e}) - falling back to fp32")
+            backend, classifier = "fp32", load_classifier()
+        print(f"[OK] Classification model loaded ({backend}, {threads} threads)")
+    except Exception:
+        classifier = None
+        print("Note: Classification model couldn't load (will use keyword matching)")
+
+    return generator, classifier
+
+
+class InferenceServer:
+    """Serves one set of loaded pipelines to any number of worker processes"""
+
+    def __init__(self, generator=None, classifier=None, address: Optional[str] = None):
+        self.models = {"generate": generator, "classify": classifier}
+        self.address = address or default_address()
+        # Pipelines are not thread-safe; one call at a time (each already uses all cores)
+        self._model_lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._key_file: Optional[Path] = None
+
+    def serve_forever(self, ready: Optional[threading.Event] = None):
+        if not self.address.startswith("\\\\") and os.path.exists(self.address):
+            os.unlink(self.address)  # stale socket from a previous run
+        authkey, self._key_file = _server_authkey(self.address)
+        self._listener = Listener(self.address, authkey=authkey)
+        if not self.address.startswith("\\\\"):
+            os.chmod(self.address, 0o600)
+        print(f"[OK] Inference sidecar listening on {self.address}")
+        if ready is not None:
+            ready.set()
+
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                break  # listener closed
+            except Exception as e:
+                print(f"Rejected inference client: {e}")
+                continue
+            threading.Thread(target=self._serve_client, args=(connection,), daemon=True).start()
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+        if self._key_file is not None:
+            self._key_file.unlink(missing_ok=True)
+
+    def _serve_client(self, connection):
+        with connection:
+            while True:
+                try:
+                    operation, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                connection.send(self._handle(operation, args, kwargs))
+
+    def _handle(self, operation: str, args: tuple, kwargs: dict) -> Tuple[bool, Any]:
+        """Returns (ok, result or error message)"""
+        if operation == "status":
+            return True, {name: model is not None for name, model in self.models.items()}
+        model = self.models.get(operation)
+        if model is None:
+            return False, f"model for '{operation}' is not loaded"
+        try:
+            with self._model_lock:
+                return True, model(*args, **kwargs)
+        except Exception as e:
+            return False, str(e)
+
+
+class SidecarClient:
+    """One connection per thread to the inference sidecar, reopened after errors"""
+
+    def __init__(self, address: Optional[str] = None):
+        self.address = address or default_address()
+        self._local = threading.local()
+
+    def call(self, operation: str, *args, **kwargs) -> Any:
+        connection = getattr(self._local, "connection", None)
+        try:
+            if connection is None:
+                connection = self._local.connection = Client(self.address, authkey=_authkey(self.address))
+            connection.send((operation, args, kwargs))
+            ok, result = connection.recv()
+        except (EOFError, OSError, AuthenticationError):
+            self._local.connection = None
+            raise
+        if not ok:
+            raise RuntimeError(f"Inference sidecar error: {result}")
+        return result
+
+    def status(self) -> Dict[str, bool]:
+        return self.call("status")
+
+
+class RemotePipeline:
+    """Callable standing in for a transformers pipeline hosted by the sidecar"""
+
+    def __init__(self, client: SidecarClient, operation: str):
+        self.client = client
+        self.operation = operation
+
+    def __call__(self, *args, **kwargs):
+        return self.client.call(self.operation, *args, **kwargs)
+
+
+def connect_models(address: Optional[str] = None) -> Tuple[Optional[RemotePipeline], Optional[RemotePipeline]]:
+    """(generator, classifier) proxies for the models the sidecar has loaded.
+
+    Both are None if the sidecar can't be reached, so callers fall back to
+    rule-based extraction exactly as when transformers is missing.
+    """
+    client = SidecarClient(address)
+    try:
+        loaded = client.status()
+    except (OSError, EOFError, RuntimeError, AuthenticationError) as e:
+        print(f"Note: Inference sidecar at {client.address} not reachable ({e})")
+        return None, None
+    generator = RemotePipeline(client, "generate") if loaded.get("generate") else None
+    classifier = RemotePipeline(client, "classify") if loaded.get("classify") else None
+    return generator, classifier
+
+
+def main():
+    try:
+        generator, classifier = load_pipelines()
+    except ImportError:
+        print("Transformers not available - sidecar will report no models loaded")
+        generator = classifier = None
+
+    server = InferenceServer(generator, classifier)
+    # Exit through the finally block (removing the socket) when the launcher stops us
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
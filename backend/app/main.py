@@ -1,10 +1,17 @@
 import json
 import os
+import secrets
+import threading
+import time
+from contextlib import asynccontextmanager
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from app.models import (
@@ -20,8 +27,45 @@ from app.models import (
     TaskStatus,
 )
 from app.ai_engine import AIEngine
+from app.compact import CompactTaskTable
+from app.archive import RetentionPolicy
+from app import export
+from app.chat_cache import parse_intent
+from app.chat_stream import GenerationStream, generation_prompt, sse_event, stream_pieces
+from app.due_schedule import DueScheduler
+from app.people import ME, ROLES
+from app.metrics import (
+    ARCHIVED_TASKS,
+    CHAT_CACHE,
+    CONTENT_TYPE,
+    MODEL_LOADED,
+    REGISTRY,
+    STAGE_SECONDS,
+    SWALLOWED_EXCEPTIONS,
+    TASKS,
+    TASKS_EXTRACTED,
+    TENANTS,
+    MetricsMiddleware,
+)
+from app.profiling import MemoryProfiler, ProfilerBusy, RequestProfileStore, SamplingProfiler
+from app.tenants import (
+    DEFAULT_TENANT,
+    Tenant,
+    TenantPathMiddleware,
+    TenantRegistry,
+    valid_tenant_id,
+    worker_ring,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    due_scheduler.start()
+    yield
+    due_scheduler.stop()
 
-app = FastAPI(title="Superproductive AI Agent API", version="1.0.0")
+
+app = FastAPI(title="Superproductive AI Agent API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -32,23 +76,156 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# /t/<tenant>/api/... is routed as /api/... for that tenant
+app.add_middleware(TenantPathMiddleware)
+
 # Initialize AI Engine
 ai_engine = AIEngine()
 
-# In-memory storage for extracted tasks
-extracted_tasks: List[ExtractedTask] = []
-
 # Data paths
 DATA_DIR = Path(__file__).parent.parent / "data"
-
-
-def load_json_data(filename: str):
-    """Load JSON data from file"""
-    filepath = DATA_DIR / filename
-    if not filepath.exists():
-        return []
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+TENANTS_DIR = Path(os.getenv("TENANTS_DIR", DATA_DIR / "tenants"))
+
+# One partition per user or mailbox (app/tenants.py), each with its own
+# connectors and watermarks, conversation threads, task snapshots (a
+# column-packed table plus its urgency index; writers publish a new
+# snapshot), archive and chat answer cache. Requests only touch their
+# tenant's data. Completed (and optionally long-overdue) tasks move to the
+# tenant's compressed archive on disk.
+tenants = TenantRegistry(
+    root=TENANTS_DIR,
+    default_dir=DATA_DIR,
+    retention=RetentionPolicy.from_env(),
+    idle_seconds=float(os.getenv("TENANT_IDLE_SECONDS", "900")),
+    max_resident=int(os.getenv("TENANT_MAX_RESIDENT", "1000")),
+    chat_cache_size=int(os.getenv("CHAT_CACHE_SIZE", "256")),
+)
+# Set when this process is one of several partitioned workers (app/router.py)
+worker_assignment = worker_ring()
+
+# Scrape-time gauges
+TASKS.set_function(lambda: {(): sum(len(tenant.task_store.current()) for tenant in tenants.resident())})
+ARCHIVED_TASKS.set_function(lambda: {(): sum(len(tenant.archive) for tenant in tenants.resident())})
+TENANTS.set_function(lambda: {(): len(tenants.resident())})
+MODEL_LOADED.set_function(lambda: {
+    ("generator",): int(ai_engine.generator is not None),
+    ("classifier",): int(ai_engine.classifier is not None),
+})
+
+
+
+def advance_due_schedules() -> Optional[float]:
+    """Advance every resident tenant's due schedule; seconds until the next threshold"""
+    now = datetime.now()
+    next_at = None
+    for tenant in tenants.resident():
+        tenant.advance_due(now)
+        tenant_next = tenant.task_store.current().due.next_at()
+        if tenant_next is not None and (next_at is None or tenant_next < next_at):
+            next_at = tenant_next
+    return None if next_at is None else (next_at - now).total_seconds()
+
+
+# Moves tasks across due-date thresholds (due in 3 days, today, overdue) as
+# they pass, touching only those tasks; readers also advance before reading
+due_scheduler = DueScheduler(advance_due_schedules)
+
+# On-demand profilers behind the admin endpoints
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
+request_profiles = RequestProfileStore()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need X-Admin-Token matching ADMIN_TOKEN; without ADMIN_TOKEN they don't exist"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def start_request_profile(path: str, profile: bool, admin_token: Optional[str]):
+    """(profile id, profile) when an admin asked to profile this request, else (None, None)"""
+    if not profile:
+        return None, None
+    require_admin(admin_token)
+    return request_profiles.new(path)
+
+
+def get_tenant(x_tenant_id: Optional[str] = Header(None)) -> Iterator[Tenant]:
+    """The request's tenant (X-Tenant-ID or /t/<tenant>/, else the default), in use until the response is sent"""
+    tenant_id = x_tenant_id or DEFAULT_TENANT
+    if not valid_tenant_id(tenant_id):
+        raise HTTPException(status_code=400, detail="Invalid tenant id")
+    if worker_assignment is not None:
+        ring, node = worker_assignment
+        owner = ring.node(tenant_id)
+        if owner != node:
+            raise HTTPException(
+                status_code=421,
+                detail=f"Tenant '{tenant_id}' is served by worker {owner}",
+                headers={"X-Tenant-Worker": owner},
+            )
+    try:
+        tenant = tenants.acquire(tenant_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown tenant '{tenant_id}'")
+    try:
+        yield tenant
+    finally:
+        tenants.release(tenant)
+
+
+def run_connectors(tenant: Tenant, incremental: bool, table: CompactTaskTable) -> dict:
+    """Read every connector and append the extracted tasks to table.
+
+    A full run ignores saved watermarks; an incremental run only reads items
+    newer than them. Checkpoints are persisted once all connectors succeeded.
+    Returns the number of new tasks per source.
+    """
+    if not incremental:
+        tenant.watermarks.reset()
+        tenant.conversations.reset()
+    tenant.preprocess_stats.reset()
+
+    by_source = {source.value: 0 for source in SourceType}
+    # Tasks already archived stay archived when their source item is read again
+    skip_archived = len(tenant.archive) > 0
+    for connector in tenant.connectors:
+        checkpoint = tenant.watermarks.get(connector.name) if incremental else {}
+        for item in connector.read(checkpoint):
+            for task in ai_engine.extract_tasks_from_item(item, tenant.conversations, tenant.preprocess_stats):
+                if skip_archived and task in tenant.archive:
+                    continue
+                table.append(task)
+                by_source[task.source_type.value] += 1
+        tenant.watermarks.set(connector.name, connector.checkpoint)
+
+    tenant.watermarks.save()
+    for source, count in by_source.items():
+        TASKS_EXTRACTED.inc(source, amount=count)
+    return by_source
+
+
+def archive_expired(tenant: Tenant, table: CompactTaskTable) -> tuple:
+    """Move rows the retention policy retires into the archive; returns (remaining table, archived count).
+
+    The remaining table is compacted once archived, deleted and rewritten rows
+    have left enough garbage in its text buffer; row order is unchanged.
+    """
+    rows = tenant.retention.expired_rows(table)
+    if rows:
+        with STAGE_SECONDS.time("archive"):
+            tenant.archive.append(table.task(row) for row in rows)
+            retired = set(rows)
+            table = table.take(row for row in range(len(table)) if row not in retired)
+    with STAGE_SECONDS.time("compact"):
+        table = table.maybe_compact()
+    return table, len(rows)
 
 
 @app.get("/")
@@ -59,199 +236,574 @@ async def root():
         "endpoints": {
             "tasks": "/api/tasks",
             "extract": "/api/tasks/extract",
+            "sync": "/api/tasks/sync",
             "prioritize": "/api/tasks/prioritize",
+            "top": "/api/tasks/top",
             "filter": "/api/tasks/filter",
+            "export": "/api/tasks/export",
             "chat": "/api/chat",
+            "chat_stream": "/api/chat/stream",
             "insights": "/api/insights",
+            "dashboard": "/api/dashboard",
+            "due_events": "/api/tasks/due-events",
+            "people": "/api/people",
+            "archive": "/api/tasks/archive",
+            "metrics": "/metrics",
         },
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/api/tasks", response_model=List[ExtractedTask])
-async def get_tasks():
-    """Get all extracted tasks"""
-    return extracted_tasks
+async def get_tasks(
+    tenant: Tenant = Depends(get_tenant),
+    sort: Optional[str] = Query(None, pattern="^urgency$"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    include_archived: bool = Query(False, description="Also return archived tasks, after the active ones"),
+):
+    """Get all extracted tasks, or a page of them in urgency order with sort=urgency"""
+    snapshot = tenant.task_store.current()
+    if include_archived:
+        active = snapshot.index.page(0, len(snapshot.index)) if sort == "urgency" else snapshot.tasks
+        end = offset + limit if limit is not None else None
+        return await run_in_threadpool(lambda: list(islice(chain(active, tenant.archive), offset, end)))
+    if sort == "urgency":
+        return snapshot.index.page(offset, limit if limit is not None else len(snapshot.index))
+    if limit is not None or offset:
+        end = offset + limit if limit is not None else None
+        return snapshot.tasks[offset:end]
+    return list(snapshot.tasks)
+
+
+@app.get("/api/tasks/top", response_model=List[ExtractedTask])
+async def get_top_tasks(k: int = Query(5, ge=1, le=500), tenant: Tenant = Depends(get_tenant)):
+    """Get the k most urgent tasks"""
+    return tenant.task_store.current().index.top(k)
 
 
 @app.post("/api/tasks/extract")
-async def extract_tasks():
+async def extract_tasks(
+    tenant: Tenant = Depends(get_tenant),
+    profile: bool = Query(False, description="Admin only: attach a CPU/memory profile of this run"),
+    x_admin_token: Optional[str] = Header(None),
+):
     """Extract tasks from all data sources"""
-    global extracted_tasks
-    extracted_tasks = []
+    profile_id, request_profile = start_request_profile("/api/tasks/extract", profile, x_admin_token)
+
+    def rebuild():
+        # Readers keep getting the previous snapshot until this one is published
+        with tenant.task_store.writer():
+            table = CompactTaskTable()
+            by_source = run_connectors(tenant, incremental=False, table=table)
+            table, archived = archive_expired(tenant, table)
+            return tenant.task_store.publish(table), by_source, archived
 
     try:
-        # Load data from files
-        emails_data = load_json_data("outlook_emails.json")
-        loop_data = load_json_data("loop_tasks.json")
-        teams_data = load_json_data("teams_messages.json")
-
-        # Extract from emails
-        for email_data in emails_data:
-            email = OutlookEmail(**email_data)
-            tasks = ai_engine.extract_tasks_from_email(email)
-            extracted_tasks.extend(tasks)
-
-        # Convert Loop tasks
-        for loop_data_item in loop_data:
-            loop_task = LoopTask(**loop_data_item)
-            task = ai_engine.convert_loop_task(loop_task)
-            extracted_tasks.append(task)
-
-        # Extract from Teams messages
-        for teams_data_item in teams_data:
-            teams_msg = TeamsMessage(**teams_data_item)
-            tasks = ai_engine.extract_tasks_from_teams(teams_msg)
-            extracted_tasks.extend(tasks)
+        snapshot, by_source, archived = await run_in_threadpool(
+            request_profile.wrap(rebuild) if request_profile else rebuild
+        )
 
-        return {
+        response = {
             "message": "Tasks extracted successfully",
-            "total_tasks": len(extracted_tasks),
-            "by_source": {
-                "email": len([t for t in extracted_tasks if t.source_type == SourceType.EMAIL]),
-                "loop": len([t for t in extracted_tasks if t.source_type == SourceType.LOOP]),
-                "teams": len([t for t in extracted_tasks if t.source_type == SourceType.TEAMS]),
-            },
+            "total_tasks": len(snapshot),
+            "version": snapshot.version,
+            "by_source": by_source,
+            "archived": archived,
+            "preprocessing": tenant.preprocess_stats.as_dict(),
+            "threads": len(tenant.conversations),
         }
+        if request_profile:
+            response["profile_id"] = profile_id
+            response["profile"] = request_profile.result
+        return response
 
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error extracting tasks: {str(e)}")
 
 
+@app.post("/api/tasks/sync")
+async def sync_tasks(tenant: Tenant = Depends(get_tenant)):
+    """Extract tasks only from items newer than each source's watermark"""
+
+    def append_new():
+        with tenant.task_store.writer() as current:
+            table = current.tasks.copy()
+            by_source = run_connectors(tenant, incremental=True, table=table)
+            new_tasks = len(table) - len(current.tasks)
+            table, archived = archive_expired(tenant, table)
+            if archived:
+                return tenant.task_store.publish(table), new_tasks, by_source, archived
+            if not new_tasks:
+                return current, 0, by_source, 0
+            index = current.index.copy(lookup=table.get)
+            index.extend(table.task(row) for row in range(len(current.tasks), len(table)))
+            due = current.due.copy(table)
+            due.extend()
+            people = current.people.copy()
+            people.extend(table)
+            return tenant.task_store.publish(table, index, due, people), new_tasks, by_source, 0
+
+    try:
+        snapshot, new_tasks, by_source, archived = await run_in_threadpool(append_new)
+
+        return {
+            "message": "Tasks synced successfully",
+            "new_tasks": new_tasks,
+            "total_tasks": len(snapshot),
+            "version": snapshot.version,
+            "by_source": by_source,
+            "archived": archived,
+            "preprocessing": tenant.preprocess_stats.as_dict(),
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error syncing tasks: {str(e)}")
+
+
 @app.post("/api/tasks/prioritize")
-async def prioritize_tasks():
+async def prioritize_tasks(
+    tenant: Tenant = Depends(get_tenant),
+    profile: bool = Query(False, description="Admin only: attach a CPU/memory profile of this run"),
+    x_admin_token: Optional[str] = Header(None),
+):
     """Prioritize all extracted tasks using AI"""
-    global extracted_tasks
-
-    if not extracted_tasks:
+    # Checked first, so an unauthorized ?profile=true is refused whatever the store holds
+    profile_id, request_profile = start_request_profile("/api/tasks/prioritize", profile, x_admin_token)
+    if not tenant.task_store.current().tasks:
         raise HTTPException(
             status_code=400,
             detail="No tasks to prioritize. Please extract tasks first.",
         )
 
+    def reprioritize():
+        with tenant.task_store.writer() as current:
+            # One task model at a time, written into a private copy of the
+            # table; completed tasks keep their priority
+            table = current.tasks.copy()
+            with STAGE_SECONDS.time("classifier_batch"):
+                for row in table.open_rows():
+                    table.update(row, ai_engine.reprioritize_task(table.task(row)))
+            with STAGE_SECONDS.time("sort"):
+                table = table.sorted_by_urgency()
+            with STAGE_SECONDS.time("compact"):
+                table = table.maybe_compact()
+            return tenant.task_store.publish(table)
+
     try:
-        extracted_tasks = ai_engine.prioritize_tasks(extracted_tasks)
-        return {
+        snapshot = await run_in_threadpool(request_profile.wrap(reprioritize) if request_profile else reprioritize)
+        response = {
             "message": "Tasks prioritized successfully",
-            "total_tasks": len(extracted_tasks),
+            "total_tasks": len(snapshot),
+            "version": snapshot.version,
         }
+        if request_profile:
+            response["profile_id"] = profile_id
+            response["profile"] = request_profile.result
+        return response
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error prioritizing tasks: {str(e)}")
 
 
-@app.get("/api/tasks/filter", response_model=List[ExtractedTask])
-async def filter_tasks(
+def parse_date_bound(value: Optional[str], end_of_day: bool) -> Optional[datetime]:
+    """A start_date / end_date query value as a datetime (whole days cover 00:00:00-23:59:59)"""
+    if not value:
+        return None
+    try:
+        # Handle both YYYY-MM-DD format from UI and ISO format
+        if 'T' in value:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        # Convert YYYY-MM-DD to datetime at the start or end of the day
+        return datetime.fromisoformat(value + ("T23:59:59" if end_of_day else "T00:00:00"))
+    except:
+        SWALLOWED_EXCEPTIONS.inc("main.filter_end_date" if end_of_day else "main.filter_start_date")
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def task_filters(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     source_type: Optional[SourceType] = Query(None),
     priority: Optional[PriorityLevel] = Query(None),
     status: Optional[TaskStatus] = Query(None),
-):
-    """Filter tasks based on various criteria"""
-    filtered = extracted_tasks
+) -> dict:
+    """Query filters shared by /api/tasks/filter, /api/tasks/export and /api/dashboard, as CompactTaskTable.select() arguments"""
+    return dict(
+        source_type=source_type,
+        priority=priority,
+        status=status,
+        due_from=parse_date_bound(start_date, end_of_day=False),
+        due_to=parse_date_bound(end_date, end_of_day=True),
+    )
 
-    # Filter by date range
-    if start_date:
-        try:
-            # Handle both YYYY-MM-DD format from UI and ISO format
-            if 'T' in start_date:
-                start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-            else:
-                # Convert YYYY-MM-DD to datetime at 00:00:00
-                start_dt = datetime.fromisoformat(start_date + "T00:00:00")
-        except:
-            start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-        
-        # Safe date comparison - strip timezone for comparison
-        filtered = [
-            t for t in filtered if t.due_date and (
-                (t.due_date.replace(tzinfo=None) if t.due_date.tzinfo else t.due_date) >= start_dt.replace(tzinfo=None)
-            )
-        ]
 
-    if end_date:
+@app.get("/api/tasks/filter", response_model=List[ExtractedTask])
+async def filter_tasks(
+    tenant: Tenant = Depends(get_tenant),
+    filters: dict = Depends(task_filters),
+    include_archived: bool = Query(False, description="Also search archived tasks"),
+):
+    """Filter tasks based on various criteria"""
+    # Source, priority, status and date range are matched on the table's
+    # columns; only matching rows are built into models
+    tasks = tenant.task_store.current().tasks
+    matches = [tasks.task(row) for row in tasks.select(**filters)]
+    if include_archived:
+        matches.extend(await run_in_threadpool(lambda: list(tenant.archive.select(**filters))))
+    return matches
+
+
+@app.get("/api/tasks/export")
+async def export_tasks(
+    tenant: Tenant = Depends(get_tenant),
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    filters: dict = Depends(task_filters),
+    include_archived: bool = Query(False, description="Also export archived tasks"),
+):
+    """Stream tasks matching the /api/tasks/filter criteria as NDJSON, CSV or Parquet"""
+    if format == "parquet":
         try:
-            # Handle both YYYY-MM-DD format from UI and ISO format
-            if 'T' in end_date:
-                end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-            else:
-                # Convert YYYY-MM-DD to datetime at 23:59:59
-                end_dt = datetime.fromisoformat(end_date + "T23:59:59")
-        except:
-            end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-        
-        # Safe date comparison - strip timezone for comparison
-        filtered = [
-            t for t in filtered if t.due_date and (
-                (t.due_date.replace(tzinfo=None) if t.due_date.tzinfo else t.due_date) <= end_dt.replace(tzinfo=None)
-            )
-        ]
-
-    # Filter by source type
-    if source_type:
-        filtered = [t for t in filtered if t.source_type == source_type]
-
-    # Filter by priority
-    if priority:
-        filtered = [t for t in filtered if t.priority == priority]
-
-    # Filter by status
-    if status:
-        filtered = [t for t in filtered if t.status == status]
-
-    return filtered
+            export.require_parquet()
+        except ImportError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+    # The whole export reads one snapshot, however long the download takes
+    tasks = tenant.task_store.current().tasks
+    rows = tasks.select(**filters)
+    matches = (tasks.task(row) for row in rows)
+    if include_archived:
+        matches = chain(matches, tenant.archive.select(**filters))
+
+    media_type = export.FORMATS[format][0]
+    return StreamingResponse(
+        export.export_chunks(format, matches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.export_filename(format)}"'},
+    )
+
+
+NO_TASKS_REPLY = "You don't have any tasks yet. Please extract tasks from your emails, Teams, or Loop first."
+NO_OWNER_REPLY = "I don't know who you are yet. Set OWNER_PERSON_ID to your name or email address."
+
+
+def cached_chat_answer(tenant: Tenant, message: str, snapshot) -> str:
+    """chat_interface's answer for message over snapshot, rendered once per intent and version"""
+    if not snapshot.tasks:
+        return NO_TASKS_REPLY
+    intent = parse_intent(message)
+    if intent.person == ME:
+        if tenant.owner is None:
+            return NO_OWNER_REPLY
+        intent = intent._replace(person=tenant.owner)
+    key = (intent, snapshot.version)
+    response = tenant.chat_cache.get(key)
+    if response is not None:
+        CHAT_CACHE.inc("hit")
+        return response
+    CHAT_CACHE.inc("miss")
+    response, expires_at = ai_engine.chat_answer(intent, snapshot.tasks, snapshot.index, people=snapshot.people)
+    tenant.chat_cache.put(key, response, expires_at)
+    return response
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage):
+async def chat(message: ChatMessage, tenant: Tenant = Depends(get_tenant)):
     """Chat interface for task-related queries"""
     try:
         # Pass current tasks as context for better responses
-        if not extracted_tasks:
-            response = "You don't have any tasks yet. Please extract tasks from your emails, Teams, or Loop first."
-        else:
-            response = ai_engine.chat_interface(message.message, extracted_tasks)
+        snapshot = tenant.task_store.current()
+        response = cached_chat_answer(tenant, message.message, snapshot)
         return ChatResponse(response=response, extracted_tasks=None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in chat: {str(e)}")
 
 
+# Seconds of text generation a streamed chat answer may add after the structured part
+CHAT_STREAM_BUDGET = float(os.getenv("CHAT_STREAM_BUDGET_SECONDS", "5"))
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(
+    message: ChatMessage,
+    budget: float = Query(CHAT_STREAM_BUDGET, gt=0, le=60),
+    tenant: Tenant = Depends(get_tenant),
+):
+    """Server-sent events: the structured answer at once, then generated text until done or out of budget"""
+    snapshot = tenant.task_store.current()
+
+    async def events():
+        # Set when the stream ends for any reason, including the client
+        # disconnecting (the response task is cancelled): generation stops
+        # at its next token
+        cancel = threading.Event()
+        started = time.perf_counter()
+        try:
+            answer = await run_in_threadpool(cached_chat_answer, tenant, message.message, snapshot)
+            yield sse_event("answer", {"text": answer})
+
+            generator = ai_engine.generator if snapshot.tasks else None
+            generation = GenerationStream(generator, generation_prompt(message.message, answer), budget, cancel)
+            async for piece in stream_pieces(generation):
+                yield sse_event("token", {"text": piece})
+
+            yield sse_event("done", {
+                "stopped": generation.stopped,
+                "pieces": generation.pieces,
+                "seconds": round(time.perf_counter() - started, 3),
+            })
+        finally:
+            cancel.set()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/insights")
-async def get_insights():
+async def get_insights(tenant: Tenant = Depends(get_tenant)):
     """Get AI-generated insights about tasks"""
-    if not extracted_tasks:
+    snapshot = tenant.task_store.current()
+    if not snapshot.tasks:
         return {"message": "No tasks available. Please extract tasks first."}
 
     try:
-        insights = ai_engine.generate_task_insights(extracted_tasks)
-        return insights
+        return schedule_insights(tenant, snapshot)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating insights: {str(e)}")
 
 
+def schedule_insights(tenant: Tenant, snapshot) -> dict:
+    """generate_task_insights() output from the snapshot's due schedule, without scanning the tasks"""
+    tenant.advance_due(snapshot=snapshot)
+    by_priority, by_source, overdue, upcoming = snapshot.due.totals()
+    titles = [snapshot.tasks.title(row) for row in upcoming]
+    return ai_engine.insights_from_counts(len(snapshot.tasks), by_priority, by_source, overdue, titles)
+
+
+@app.get("/api/dashboard")
+def get_dashboard(
+    tenant: Tenant = Depends(get_tenant),
+    filters: dict = Depends(task_filters),
+    sort: Optional[str] = Query(None, pattern="^urgency$"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """A page of filtered tasks, facet counts per filter option and the insights, from one snapshot.
+
+    Unfiltered, the counts and insights come from the snapshot's due
+    schedule and the page from its urgency index, without a scan. With
+    filters, one scan of the table's columns yields the rows and the counts.
+    """
+    snapshot = tenant.task_store.current()
+    tasks = snapshot.tasks
+    tenant.advance_due(snapshot=snapshot)
+    end = offset + limit if limit is not None else None
+
+    if all(value is None for value in filters.values()):
+        total = len(tasks)
+        counts = snapshot.due.counts()
+        if sort == "urgency":
+            page = snapshot.index.page(offset, limit if limit is not None else total)
+        else:
+            page = tasks[offset:end]
+    else:
+        facets = tasks.facets(**filters)
+        total = len(facets.rows)
+        counts = facets.counts
+        if sort == "urgency":
+            rows = tasks.most_urgent_rows(facets.rows, end if end is not None else total)[offset:]
+        else:
+            rows = facets.rows[offset:end]
+        page = [tasks.task(row) for row in rows]
+
+    if tasks:
+        insights = schedule_insights(tenant, snapshot)
+    else:
+        insights = {"message": "No tasks available. Please extract tasks first."}
+
+    return {
+        "version": snapshot.version,
+        "total": total,
+        "offset": offset,
+        "tasks": page,
+        "facets": counts,
+        "insights": insights,
+    }
+
+
+@app.get("/api/tasks/due-events")
+async def get_due_events(tenant: Tenant = Depends(get_tenant), after: int = Query(0, ge=0)):
+    """Tasks that crossed a due-date threshold (due in 3 days, due today, overdue) since event `after`"""
+    tenant.advance_due()
+    last, events = tenant.due_events.since(after)
+    return {"last": last, "events": events}
+
+
+@app.get("/api/people")
+async def get_people(tenant: Tenant = Depends(get_tenant)):
+    """Number of tasks naming each person ID (as assignee, requester or mentioned)"""
+    return tenant.task_store.current().people.people()
+
+
+@app.get("/api/people/{person_id}/tasks", response_model=List[ExtractedTask])
+async def get_person_tasks(
+    person_id: str,
+    tenant: Tenant = Depends(get_tenant),
+    role: Optional[str] = Query(None, pattern=f"^({'|'.join(ROLES)})$"),
+    status: Optional[TaskStatus] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Tasks naming a person, most urgent first, from the snapshot's people index.
+
+    person_id can be a name, email address or handle in any form, or "me"
+    for the tenant's own user.
+    """
+    if person_id == ME:
+        if tenant.owner is None:
+            raise HTTPException(status_code=404, detail="No owner person set for this tenant")
+        person_id = tenant.owner
+    snapshot = tenant.task_store.current()
+    if not snapshot.people.resolve(person_id):
+        raise HTTPException(status_code=404, detail="Person not found")
+    tasks = snapshot.tasks
+    rows = [tasks.row_of(task_id) for task_id in snapshot.people.tasks_for(person_id, role)]
+    if status is not None:
+        # Filter on the status column; only the rows returned are built into models
+        statuses = tasks.scan_columns()[2]
+        code = list(TaskStatus).index(status)
+        rows = [row for row in rows if statuses[row] == code]
+    rows = tasks.most_urgent_rows(rows, limit if limit is not None else len(rows))
+    return [tasks.task(row) for row in rows]
+
+
+# Single-task writes are plain functions so FastAPI runs them in its
+# threadpool: waiting for the write lock must not block the event loop
+
+
 @app.delete("/api/tasks/{task_id}")
-async def delete_task(task_id: str):
+def delete_task(task_id: str, tenant: Tenant = Depends(get_tenant)):
     """Delete a specific task"""
-    global extracted_tasks
-    initial_count = len(extracted_tasks)
-    extracted_tasks = [t for t in extracted_tasks if t.id != task_id]
-
-    if len(extracted_tasks) == initial_count:
-        raise HTTPException(status_code=404, detail="Task not found")
+    with tenant.task_store.writer() as current:
+        row = current.tasks.row_of(task_id)
+
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        people = current.people.copy()
+        people.remove(current.tasks, row)
+        table = current.tasks.copy()
+        table.delete(row)
+        table = table.maybe_compact()
+        index = current.index.copy(lookup=table.get)
+        index.remove(task_id)
+        due = current.due.copy(table)
+        due.remove(current.tasks, row)
+        tenant.task_store.publish(table, index, due, people)
 
     return {"message": "Task deleted successfully"}
 
 
 @app.put("/api/tasks/{task_id}/status")
-async def update_task_status(task_id: str, status: TaskStatus):
+def update_task_status(task_id: str, status: TaskStatus, tenant: Tenant = Depends(get_tenant)):
     """Update task status"""
-    for task in extracted_tasks:
-        if task.id == task_id:
-            task.status = status
-            return {"message": "Task status updated", "task": task}
+    with tenant.task_store.writer() as current:
+        row = current.tasks.row_of(task_id)
+        if row is not None:
+            table = current.tasks.copy()
+            previous = table.task(row).status
+            table.set_status(row, status)
+            due = current.due.copy(table)
+            due.set_status(row, previous)
+            tenant.task_store.publish(table, current.index.copy(lookup=table.get), due, current.people)
+            return {"message": "Task status updated", "task": table.task(row)}
 
     raise HTTPException(status_code=404, detail="Task not found")
 
 
+@app.post("/api/tasks/archive")
+def archive_tasks(tenant: Tenant = Depends(get_tenant)):
+    """Apply the retention policy now, moving expired tasks to the archive"""
+    with tenant.task_store.writer() as current:
+        table, archived = archive_expired(tenant, current.tasks.copy())
+        snapshot = tenant.task_store.publish(table) if archived else current
+
+    return {
+        "message": "Retention policy applied",
+        "archived": archived,
+        "total_tasks": len(snapshot),
+        "archived_total": len(tenant.archive),
+        "policy": tenant.retention.as_dict(),
+    }
+
+
+# Admin-only profiling of the running process
+
+
+@app.post("/admin/profile/cpu/start", dependencies=[Depends(require_admin)])
+async def start_cpu_profile(interval_ms: float = Query(10.0, ge=1.0, le=1000.0)):
+    """Start sampling all threads' stacks"""
+    started = cpu_profiler.start(interval_ms / 1000.0)
+    return {"started": started, "running": cpu_profiler.running, "interval_ms": cpu_profiler.interval * 1000}
+
+
+@app.get("/admin/profile/cpu", dependencies=[Depends(require_admin)])
+async def cpu_profile_status():
+    return {"running": cpu_profiler.running, "samples": cpu_profiler.samples}
+
+
+@app.post("/admin/profile/cpu/stop", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def stop_cpu_profile():
+    """Stop sampling; returns collapsed stacks for flamegraph.pl / speedscope"""
+    return cpu_profiler.stop()
+
+
+@app.post("/admin/profile/memory/snapshot", dependencies=[Depends(require_admin)])
+def take_memory_snapshot(nframes: int = Query(10, ge=1, le=50), limit: int = Query(25, ge=1, le=500)):
+    """Take a tracemalloc snapshot (tracing starts with the first one)"""
+    snapshot_id = memory_profiler.take(nframes)
+    return {"id": snapshot_id, "snapshots": memory_profiler.ids(), "top": memory_profiler.top(snapshot_id, limit)}
+
+
+@app.get("/admin/profile/memory/diff", dependencies=[Depends(require_admin)])
+def diff_memory_snapshots(
+    old: str,
+    new: str,
+    limit: int = Query(25, ge=1, le=500),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+):
+    """Allocation growth between two snapshots, largest first"""
+    try:
+        return memory_profiler.diff(old, new, limit, key_type)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.delete("/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def stop_memory_profile():
+    """Stop tracemalloc and drop the snapshots"""
+    memory_profiler.stop()
+    return {"message": "Memory tracing stopped"}
+
+
+@app.get("/admin/profile/requests/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_request_profile(profile_id: str):
+    """A per-request profile from ?profile=true on extract or prioritize"""
+    result = request_profiles.get(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return result
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,238 @@
+"""Prometheus-style metrics, rendered in the text exposition format at /metrics.
+
+A small in-process registry (counters, gauges, histograms with labels)
+rather than a client library dependency. Updates are a lock plus a dict
+lookup, cheap enough for per-item hot paths; per-line work is aggregated by
+the caller and recorded once.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; spans sub-millisecond keyword work up to multi-minute extractions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, labels: Tuple[str, ...]):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            value = self._values.get(labels)
+            if value is None:
+                self._check(labels)
+                value = 0.0
+            self._values[labels] = value + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Set directly, or computed at scrape time from set_function()"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def set(self, value: float, *labels: str):
+        if labels not in self._values:
+            self._check(labels)
+        self._values[labels] = value
+
+    def set_function(self, function: Callable[[], Dict[Tuple[str, ...], float]]):
+        """function() returns {label values tuple: value}; () for an unlabeled gauge"""
+        self._function = function
+
+    def samples(self):
+        values = dict(self._values)
+        if self._function is not None:
+            try:
+                values.update(self._function())
+            except Exception:
+                pass  # a failing callback must not break the scrape
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                self._check(labels)
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            series_items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in series_items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4"  # the response adds the charset
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "pipeline_stage_seconds",
+    "Time per pipeline stage: json_load, validation, rule_extraction, classifier_call, classifier_batch, sort, "
+    "archive, compact, due_schedule, people_index",
+    ("stage",)))
+TASKS_EXTRACTED = REGISTRY.register(Counter(
+    "tasks_extracted_total", "Tasks extracted, by source", ("source",)))
+CLASSIFICATIONS = REGISTRY.register(Counter(
+    "priority_classifications_total", "Priority classifications by method (model or keyword)", ("method",)))
+CHAT_CACHE = REGISTRY.register(Counter(
+    "chat_cache_requests_total", "Chat answers served from the cache (hit) or rendered (miss)", ("result",)))
+DUE_TRANSITIONS = REGISTRY.register(Counter(
+    "due_transitions_total", "Tasks reaching a due-date threshold as time passed, by stage reached", ("stage",)))
+SWALLOWED_EXCEPTIONS = REGISTRY.register(Counter(
+    "swallowed_exceptions_total", "Exceptions caught and ignored, by code location", ("location",)))
+TASKS = REGISTRY.register(Gauge(
+    "tasks", "Tasks in the current snapshot"))
+ARCHIVED_TASKS = REGISTRY.register(Gauge(
+    "archived_tasks", "Tasks moved to the on-disk archive by the retention policy"))
+TENANTS = REGISTRY.register(Gauge(
+    "tenants_resident", "Tenants loaded in this process"))
+MODEL_LOADED = REGISTRY.register(Gauge(
+    "model_loaded", "1 if the model is available to the engine, else 0", ("model",)))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware, which adds a task and
+    response streaming overhead to every request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict[object, str]] = None
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route)
+            REQUESTS.inc(scope["method"], route, str(status[0]))
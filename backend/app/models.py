@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+from itertools import count
 
 
 class SourceType(str, Enum):
@@ -31,6 +32,8 @@ class OutlookEmail(BaseModel):
     body: str
     received_date: str
     has_attachments: bool
+    in_reply_to: Optional[str] = None
+    references: List[str] = []
 
 
 class LoopTask(BaseModel):
@@ -54,10 +57,16 @@ class TeamsMessage(BaseModel):
     timestamp: str
     mentions: List[str]
     reactions: List[str]
+    # Id of the message this one replies to, when the source reports it
+    reply_to: Optional[str] = None
+
+
+# Suffix keeping ids unique when several tasks are created within one clock tick
+_task_sequence = count()
 
 
 class ExtractedTask(BaseModel):
-    id: str = Field(default_factory=lambda: f"task_{datetime.now().timestamp()}")
+    id: str = Field(default_factory=lambda: f"task_{datetime.now().timestamp()}_{next(_task_sequence)}")
     title: str
     description: str
     source_type: SourceType
@@ -67,6 +76,8 @@ class ExtractedTask(BaseModel):
     extracted_date: datetime = Field(default_factory=datetime.now)
     assigned_to: Optional[str] = None
     status: TaskStatus = TaskStatus.PENDING
+    completed_date: Optional[datetime] = None
+    urgency_score: Optional[float] = None
     metadata: dict = {}
 
 
@@ -0,0 +1,240 @@
+"""People referenced by tasks, and an index from person to task.
+
+Every task can name people in three roles:
+
+- assignee: the task's assigned_to, which extraction now fills in from who a
+  line is addressed to ("@Mike can you share the wireframes?", "Sarah, could
+  you ...", "Assigned to: Lisa")
+- requester: the sender of the email or message the task came from
+- mentioned: @mentions in the message (group mentions like @channel excluded)
+
+person_id() normalizes names, handles and addresses to one ID: "Sarah
+Johnson", "sarah.johnson@company.com" and "@sarah_johnson" are all
+"sarah-johnson", and "@DevOps" and "DevOps Team" are both "devops".
+Extraction stores the IDs per role in the task's metadata["people"].
+
+A PeopleIndex maps each person ID to the IDs of the tasks that reference
+them, in table order, and is carried from snapshot to snapshot like the
+urgency index: appended rows are added and deleted tasks removed without
+rebuilding. A bare first name ("@Sarah") and the one full name it can stand
+for ("sarah-johnson") are looked up together.
+"""
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.compact import CompactTaskTable
+from app.metrics import STAGE_SECONDS
+
+ROLES = ("assignee", "requester", "mentioned")
+# Stands for the tenant's own user (Tenant.owner) in queries
+ME = "me"
+# Mentions that address a whole channel rather than a person
+GROUP_MENTIONS = {"channel", "team", "here", "everyone", "all"}
+# Capitalized words that can start "..., can you" without being a name
+_NOT_NAMES = {
+    "also", "and", "but", "so", "then", "now", "ok", "okay", "hi", "hey", "hello",
+    "please", "thanks", "guys", "folks", "someone", "anyone", "everyone", "team", "all",
+}
+
+_MENTION = re.compile(r"(?<![\w.@])@([A-Za-z][\w.'-]*\w|[A-Za-z])")
+_ADDRESSED = [
+    # "@Mike can you ...", "@Sarah please ..."
+    re.compile(r"(?<![\w.@])@([A-Za-z][\w.'-]*\w|[A-Za-z]),?\s+(?:(?:can|could|would|will)\s+you|please)\b", re.I),
+    # "Mike, can you ...", "Hi Sarah, could you ..."
+    re.compile(r"(?:^|[.!?;]\s+|\b(?:[Hh]i|[Hh]ey|[Hh]ello)\s+)([A-Z][a-z]+),?\s+(?:can|could|would|will)\s+you\b", re.M),
+    # "Assigned to: Lisa Park", "Owner: @lisa"
+    re.compile(r"\b(?:[Aa]ssigned to|[Aa]ssignee|[Oo]wner)\s*:?\s+@?([A-Z][\w.'-]*(?:\s+[A-Z][\w'-]*)?)"),
+]
+_TOKENS = re.compile(r"[a-z0-9]+")
+
+
+def person_id(reference: Optional[str]) -> str:
+    """Normalized ID for a name, @handle or email address ("" if there is none)"""
+    if not reference:
+        return ""
+    reference = reference.strip().lstrip("@")
+    if "@" in reference:
+        reference = reference.split("@", 1)[0]
+    tokens = _TOKENS.findall(reference.lower())
+    if len(tokens) > 1 and tokens[-1] == "team":
+        tokens.pop()
+    return "-".join(tokens)
+
+
+def mentions(text: str) -> List[str]:
+    """@mentions in text, in order, as written (without the @)"""
+    return _MENTION.findall(text)
+
+
+def addressed(text: str) -> List[str]:
+    """Names text asks to do something, in order of appearance"""
+    found = []
+    for pattern in _ADDRESSED:
+        for match in pattern.finditer(text):
+            name = match.group(1)
+            if name.lower() not in _NOT_NAMES and name.lower() not in GROUP_MENTIONS:
+                found.append((match.start(1), name))
+    names = []
+    for _, name in sorted(found):
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def _ids(references: Iterable[Optional[str]]) -> List[str]:
+    ids = []
+    for reference in references:
+        pid = person_id(reference)
+        if pid and pid not in GROUP_MENTIONS and pid not in ids:
+            ids.append(pid)
+    return ids
+
+
+def resolve_people(
+    assigned_to: Optional[str],
+    sender: Optional[str] = None,
+    mentioned: Sequence[str] = (),
+) -> Dict[str, List[str]]:
+    """Person IDs per role (roles without anyone left out), as stored in metadata["people"]"""
+    people = {
+        "assignee": _ids([assigned_to]),
+        "requester": _ids([sender]),
+        "mentioned": _ids(mentioned),
+    }
+    return {role: ids for role, ids in people.items() if ids}
+
+
+def _roles_of(people: Dict[str, List[str]]) -> Dict[str, Tuple[str, ...]]:
+    """Person ID -> the roles they have in one task"""
+    roles_of: Dict[str, Tuple[str, ...]] = {}
+    for role in ROLES:
+        for person in people.get(role, ()):
+            roles_of[person] = roles_of.get(person, ()) + (role,)
+    return roles_of
+
+
+def task_people(assigned_to: Optional[str], metadata: dict) -> Dict[str, List[str]]:
+    """A task's people: metadata["people"] if extraction stored it, else resolved from its fields"""
+    people = metadata.get("people")
+    if people is not None:
+        return people
+    return resolve_people(assigned_to, metadata.get("sender"), metadata.get("mentions") or ())
+
+
+class PeopleIndex:
+    """Person ID -> {task ID: roles}, for the rows of a table.
+
+    Never changed once its snapshot is published; writers copy() it, then
+    extend() with appended rows or remove() deleted tasks. A copy shares
+    every person's task dict with the original and copies one only when it
+    first changes it, so a sync or delete costs O(people) plus the entries
+    it touches, not O(entries).
+    """
+
+    def __init__(self, table: Optional[CompactTaskTable] = None):
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._tasks: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        # First name -> full IDs starting with it, for matching bare first names
+        self._by_first: Dict[str, FrozenSet[str]] = {}
+        # Persons whose task dict this index created (the rest are shared with the original)
+        self._owned: Optional[Set[str]] = None
+        if table is not None:
+            with STAGE_SECONDS.time("people_index"):
+                self.extend(table)
+
+    def copy(self) -> "PeopleIndex":
+        index = PeopleIndex()
+        with self._lock:
+            index._rows = self._rows
+            index._tasks = dict(self._tasks)
+            index._by_first = dict(self._by_first)
+            index._owned = set()
+        return index
+
+    def _own(self, person: str) -> Dict[str, Tuple[str, ...]]:
+        """person's task dict, copied first if it is shared with the index this was copied from"""
+        tasks = self._tasks[person]
+        if self._owned is not None and person not in self._owned:
+            tasks = self._tasks[person] = dict(tasks)
+            self._owned.add(person)
+        return tasks
+
+    def extend(self, table: CompactTaskTable):
+        """Add the rows appended to table since this index covered it"""
+        with self._lock:
+            for task_id, assigned_to, metadata in table.reference_entries(self._rows):
+                self._add(task_id, task_people(assigned_to, metadata))
+            self._rows = len(table)
+
+    def _add(self, task_id: str, people: Dict[str, List[str]]):
+        for person, roles in _roles_of(people).items():
+            if person in self._tasks:
+                tasks = self._own(person)
+            else:
+                tasks = self._tasks[person] = {}
+                if self._owned is not None:
+                    self._owned.add(person)
+                first, _, rest = person.partition("-")
+                if rest:
+                    self._by_first[first] = self._by_first.get(first, frozenset()) | {person}
+            tasks[task_id] = roles
+
+    def remove(self, table: CompactTaskTable, row: int):
+        """Drop the task at row of table, which is about to be deleted from it"""
+        task_id, assigned_to, metadata = next(table.reference_entries(row, row + 1))
+        with self._lock:
+            self._rows -= 1
+            for person in _roles_of(task_people(assigned_to, metadata)):
+                if task_id not in self._tasks.get(person, ()):
+                    continue
+                tasks = self._own(person)
+                del tasks[task_id]
+                if not tasks:
+                    del self._tasks[person]
+                    first, _, rest = person.partition("-")
+                    if rest:
+                        remaining = self._by_first[first] - {person}
+                        if remaining:
+                            self._by_first[first] = remaining
+                        else:
+                            del self._by_first[first]
+
+    def resolve(self, reference: str) -> List[str]:
+        """Indexed IDs reference stands for: itself, plus the full name a unique first name
+        matches, or the first name alone for a full name that is the only one with it
+        """
+        pid = person_id(reference)
+        with self._lock:
+            first, _, rest = pid.partition("-")
+            full = self._by_first.get(first, ())
+            ids = [pid] if pid in self._tasks else []
+            if not rest and len(full) == 1:
+                ids += list(full)
+            elif rest and len(full) == 1 and first in self._tasks:
+                ids.append(first)
+            return ids
+
+    def tasks_for(self, reference: str, role: Optional[str] = None) -> List[str]:
+        """IDs of tasks referencing the person (in the given role)"""
+        ids = self.resolve(reference)
+        with self._lock:
+            if len(ids) == 1:
+                tasks = self._tasks[ids[0]].items()
+            else:
+                # A task naming both the first and the full name gets both role lists
+                merged: Dict[str, Tuple[str, ...]] = {}
+                for pid in ids:
+                    for task_id, roles in self._tasks[pid].items():
+                        merged[task_id] = merged.get(task_id, ()) + roles
+                tasks = merged.items()
+            return [task_id for task_id, roles in tasks if role is None or role in roles]
+
+    def people(self) -> Dict[str, int]:
+        """Number of tasks per person ID"""
+        with self._lock:
+            return {person: len(tasks) for person, tasks in self._tasks.items()}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
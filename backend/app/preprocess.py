@@ -0,0 +1,229 @@
+"""Email body normalization run before task extraction.
+
+Outlook bodies carry HTML markup, quoted reply chains, forwarded headers,
+signatures and legal disclaimers. None of that holds new action items, but
+every line of it would be scanned by _extract_tasks_rule_based and possibly
+sent to the classifier. clean_email_body() strips it in a single linear pass.
+"""
+import html
+import re
+from typing import Dict, List, Tuple
+
+DEFAULT_MAX_BODY_BYTES = 64 * 1024
+
+_HTML_HINT = re.compile(r"<(?:html|body|div|p|br|table|span|blockquote)\b", re.IGNORECASE)
+_TAG = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)([^>]*)>|<!--.*?-->", re.DOTALL)
+
+# Tags whose content is dropped entirely
+_SKIPPED_TAGS = {"head", "style", "script", "title", "blockquote"}
+# Tags that end a line of text
+_BLOCK_TAGS = {"br", "p", "div", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "hr", "ul", "ol"}
+# Outlook / Gmail markers for the start of quoted history in HTML replies
+_HTML_QUOTE_MARKER = re.compile(r"""(?:id|class)\s*=\s*["']?(?:divRplyFwdMsg|appendonsend|gmail_quote|moz-cite-prefix)""", re.IGNORECASE)
+
+# Lines that start quoted or forwarded history; everything after them is dropped
+_HISTORY_START = re.compile(
+    r"^(?:"
+    r"on\s.{0,200}\swrote:?"
+    r"|-{2,}\s*(?:original message|forwarded message)\s*-{2,}"
+    r"|begin forwarded message:"
+    r"|_{10,}"
+    r")$",
+    re.IGNORECASE,
+)
+# A "From:" line starts quoted history only when other header lines follow it
+_FROM_HEADER = re.compile(r"^from:\s.+$", re.IGNORECASE)
+_QUOTED_HEADER = re.compile(r"^(?:sent|to|cc|date|subject):\s", re.IGNORECASE)
+_QUOTED_HEADER_WINDOW = 3
+# Legal disclaimers; everything after them is dropped. A "Disclaimer" word only
+# counts as a heading on its own line, or followed by the usual boilerplate
+_DISCLAIMER_HEADING = r"(?:confidentiality notice|disclaimer|legal notice)"
+_DISCLAIMER_START = re.compile(
+    rf"^(?:{_DISCLAIMER_HEADING}\s*:?\s*$"
+    rf"|(?:{_DISCLAIMER_HEADING}\s*:\s*)?"
+    r"(?:this (?:e-?mail|message)(?: and any attachments)? (?:is|are|may be|contains?) (?:confidential|privileged|intended)"
+    r"|the information (?:contained )?in this (?:e-?mail|message)))",
+    re.IGNORECASE,
+)
+_SIGNATURE_DELIMITER = re.compile(r"^--\s?$")
+_SIGN_OFF = re.compile(
+    r"^(?:best|best regards|kind regards|regards|thanks|thank you|many thanks|cheers|sincerely|warm regards|br)[,.!]?$",
+    re.IGNORECASE,
+)
+_MOBILE_FOOTER = re.compile(r"^sent from my \w+", re.IGNORECASE)
+# Bullets, numbered items and imperative openings: never part of a signature
+_TASK_LIKE = re.compile(
+    r"^(?:[-*•◦]|\d+[.)])\s*\S"
+    r"|^(?:please|send|book|review|submit|prepare|schedule|update|complete|finish|check|confirm|approve"
+    r"|share|call|email|reply|follow up|set up|make sure|don't forget|remember to)\b",
+    re.IGNORECASE,
+)
+
+# What signature lines look like: a name or title in capitalized words, a phone
+# number, an address or link. Parts may be joined with "|" or "•"
+_SIGNATURE_NAME = re.compile(
+    r"^[A-Z][\w.'’&-]*(?:,?\s+(?:[A-Z0-9][\w.'’&-]*|of|and|the|for|at|de|van|von|&))*\.?$"
+)
+_SIGNATURE_PHONE = re.compile(r"^(?:(?:tel|phone|mobile|cell|[tmp])\s*[.:]?\s*)?\+?[\d(][\d\s().-]{5,}\d$", re.IGNORECASE)
+_SIGNATURE_CONTACT = re.compile(r"^\S*(?:@\S+\.\w+|https?://\S+|www\.\S+)\S*$", re.IGNORECASE)
+_SIGNATURE_SEPARATOR = re.compile(r"\s*[|•·]\s*")
+
+# A sign-off followed by at most this many short signature-like lines up to the
+# end of the body is treated as a signature
+_MAX_SIGNATURE_LINES = 4
+_MAX_SIGNATURE_LINE_LENGTH = 60
+
+
+def _truncate_utf8(text: str, max_bytes: int) -> Tuple[str, bool]:
+    """Cut text to at most max_bytes of UTF-8 without splitting a character"""
+    if len(text) * 4 <= max_bytes:
+        return text, False  # can't exceed the limit even if every char is 4 bytes
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text, False
+    return encoded[:max_bytes].decode("utf-8", errors="ignore"), True
+
+
+def html_to_text(markup: str) -> str:
+    """Convert HTML to plain text in one pass over the tags.
+
+    Drops head/style/script and <blockquote> content, and everything after an
+    Outlook/Gmail reply container, since those only hold quoted history.
+    """
+    parts: List[str] = []
+    skip_depth = 0
+    position = 0
+
+    for match in _TAG.finditer(markup):
+        if skip_depth == 0:
+            parts.append(markup[position:match.start()])
+        position = match.end()
+
+        tag = (match.group(2) or "").lower()
+        if not tag:
+            continue  # comment
+        closing = match.group(1) == "/"
+
+        if tag in _SKIPPED_TAGS:
+            skip_depth += -1 if closing else 1
+            skip_depth = max(skip_depth, 0)
+        elif not closing and _HTML_QUOTE_MARKER.search(match.group(3) or ""):
+            position = len(markup)
+            break
+        elif skip_depth == 0 and tag in _BLOCK_TAGS:
+            parts.append("\n- " if tag == "li" and not closing else "\n")
+
+    if skip_depth == 0:
+        parts.append(markup[position:])
+    return html.unescape("".join(parts)).replace("\xa0", " ")
+
+
+def _starts_quoted_headers(lines: List[str], position: int) -> bool:
+    """Whether the From: line at position is followed by Sent:/To:/Subject:-style header lines"""
+    following = lines[position + 1:position + 1 + _QUOTED_HEADER_WINDOW]
+    return any(_QUOTED_HEADER.match(line.strip()) for line in following)
+
+
+def _looks_like_signature(line: str) -> bool:
+    """Whether a line after a sign-off reads as a name, title or contact detail"""
+    if len(line) > _MAX_SIGNATURE_LINE_LENGTH or _TASK_LIKE.match(line):
+        return False
+    parts = [part for part in _SIGNATURE_SEPARATOR.split(line) if part]
+    return bool(parts) and all(
+        _SIGNATURE_NAME.match(part) or _SIGNATURE_PHONE.match(part) or _SIGNATURE_CONTACT.match(part)
+        for part in parts
+    )
+
+
+def clean_email_body(body: str, max_bytes: int = DEFAULT_MAX_BODY_BYTES) -> Tuple[str, Dict[str, int]]:
+    """Strip markup, quoted history, signatures and disclaimers from an email body.
+
+    Returns the cleaned text and a report with the bytes and lines removed.
+    """
+    original_bytes = len(body.encode("utf-8"))
+
+    text, truncated = _truncate_utf8(body, max_bytes)
+    is_html = bool(_HTML_HINT.search(text))
+    if is_html:
+        text = html_to_text(text)
+    # Line counts are taken after HTML conversion, which is what extraction would scan
+    original_lines = text.count("\n") + 1 if text else 0
+
+    kept: List[str] = []
+    signature: List[str] = []  # the sign-off and lines held back after it
+    in_signature = False
+
+    lines = text.split("\n")
+    for position, raw_line in enumerate(lines):
+        line = raw_line.strip()
+
+        if line.startswith(">"):
+            continue
+        if _HISTORY_START.match(line) or _DISCLAIMER_START.match(line) or _SIGNATURE_DELIMITER.match(line):
+            break
+        if _FROM_HEADER.match(line) and _starts_quoted_headers(lines, position):
+            break
+        if _MOBILE_FOOTER.match(line):
+            continue
+
+        if in_signature:
+            if line and (len(signature) > _MAX_SIGNATURE_LINES or not _looks_like_signature(line)):
+                # Not a signature: the sign-off was part of the message
+                kept.extend(signature)
+                signature = []
+                in_signature = False
+            else:
+                signature.append(raw_line)
+                continue
+
+        if _SIGN_OFF.match(line):
+            in_signature = True
+            signature = [raw_line]
+            continue
+
+        kept.append(raw_line)
+
+    while kept and not kept[-1].strip():
+        kept.pop()
+    cleaned = "\n".join(kept)
+
+    report = {
+        "bytes_removed": original_bytes - len(cleaned.encode("utf-8")),
+        "lines_removed": original_lines - (len(kept) if cleaned else 0),
+        "truncated": int(truncated),
+        "html": int(is_html),
+    }
+    return cleaned, report
+
+
+class PreprocessStats:
+    """Running totals of clean_email_body() reports for an extraction run"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.emails = 0
+        self.bytes_in = 0
+        self.bytes_removed = 0
+        self.lines_removed = 0
+        self.truncated = 0
+        self.html = 0
+
+    def add(self, original: str, report: Dict[str, int]):
+        self.emails += 1
+        self.bytes_in += len(original.encode("utf-8"))
+        self.bytes_removed += report["bytes_removed"]
+        self.lines_removed += report["lines_removed"]
+        self.truncated += report["truncated"]
+        self.html += report["html"]
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "emails": self.emails,
+            "bytes_in": self.bytes_in,
+            "bytes_removed": self.bytes_removed,
+            "lines_removed": self.lines_removed,
+            "truncated": self.truncated,
+            "html": self.html,
+        }
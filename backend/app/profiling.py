@@ -0,0 +1,287 @@
+"""On-demand profiling of the running process (served under /admin/profile).
+
+- SamplingProfiler: a background thread samples every thread's stack at a
+  fixed interval and aggregates collapsed stacks ("a;b;c 42"), the input
+  format of flamegraph.pl / speedscope. Cost is one sys._current_frames()
+  walk per interval, independent of request load.
+- MemoryProfiler: named tracemalloc snapshots and diffs between them.
+- RequestProfile: cProfile plus a tracemalloc diff around one extract or
+  prioritize call, reporting time per AIEngine method and memory per
+  app source line. One at a time: a second raises ProfilerBusy.
+
+tracemalloc is process-wide, so MemoryProfiler sessions and request profiles
+share it through _claim_tracing()/_release_tracing(); it is stopped only when
+the last of them that needed it is done, never under another one's feet.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from itertools import count
+from typing import Callable, Dict, List, Optional
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ProfilerBusy(RuntimeError):
+    """Another request is already being profiled"""
+
+
+# cProfile allows one active profiler; request profiles take turns
+_request_profile_lock = threading.Lock()
+
+_tracing_lock = threading.Lock()
+_tracing_claims = 0
+_started_tracing = False
+
+
+def _claim_tracing(nframes: int):
+    """Start tracemalloc unless it's already running, and note one more user of it"""
+    global _tracing_claims, _started_tracing
+    with _tracing_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(nframes)
+            _started_tracing = True
+        _tracing_claims += 1
+
+
+def _release_tracing():
+    """Drop one user; the last one stops tracemalloc if it was started here"""
+    global _tracing_claims, _started_tracing
+    with _tracing_lock:
+        _tracing_claims = max(_tracing_claims - 1, 0)
+        if _tracing_claims == 0 and _started_tracing:
+            _started_tracing = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Statistical CPU profiler over all threads, started and stopped at runtime"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = 0.01
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01) -> bool:
+        """Start sampling every interval seconds; False if already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = max(interval, 0.001)
+            self._stacks = Counter()
+            self.samples = 0
+            self.started_at = time.monotonic()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks"""
+        with self._lock:
+            if self._thread is not None:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+            return self.collapsed()
+
+    def collapsed(self) -> str:
+        """One "root;...;leaf count" line per distinct stack, most frequent first"""
+        return "".join(f"{stack} {samples}\n" for stack, samples in self._stacks.most_common())
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+
+class MemoryProfiler:
+    """Keeps named tracemalloc snapshots for diffing"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._ids = count(1)
+        self._tracing = False
+
+    def take(self, nframes: int = 10) -> str:
+        """Snapshot current allocations (starting tracemalloc if needed); returns its id"""
+        if not self._tracing:
+            _claim_tracing(nframes)
+            self._tracing = True
+        snapshot_id = str(next(self._ids))
+        self._snapshots[snapshot_id] = tracemalloc.take_snapshot()
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def ids(self) -> List[str]:
+        return list(self._snapshots)
+
+    def top(self, snapshot_id: str, limit: int = 25, key_type: str = "lineno") -> List[dict]:
+        stats = self._get(snapshot_id).statistics(key_type)
+        return [{"location": _location(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                for stat in stats[:limit]]
+
+    def diff(self, old_id: str, new_id: str, limit: int = 25, key_type: str = "lineno") -> List[dict]:
+        stats = self._get(new_id).compare_to(self._get(old_id), key_type)
+        return [
+            {
+                "location": _location(stat.traceback),
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def stop(self):
+        """Drop all snapshots and stop tracing unless a request profile still needs it"""
+        self._snapshots.clear()
+        if self._tracing:
+            self._tracing = False
+            _release_tracing()
+
+    def _get(self, snapshot_id: str) -> tracemalloc.Snapshot:
+        try:
+            return self._snapshots[snapshot_id]
+        except KeyError:
+            raise KeyError(f"Unknown snapshot '{snapshot_id}'")
+
+
+def _location(traceback) -> str:
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class RequestProfile:
+    """CPU and memory profile of one request's pipeline work"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.result: Dict[str, object] = {"path": path, "status": "running"}
+
+    def wrap(self, function: Callable) -> Callable:
+        """function, measured when called (cProfile only sees the calling thread)"""
+        def wrapper(*args, **kwargs):
+            with self.measure():
+                return function(*args, **kwargs)
+        return wrapper
+
+    @contextmanager
+    def measure(self):
+        """Profile the enclosed block (run it in the thread doing the work).
+
+        Raises ProfilerBusy, without running the block, while another request
+        is being profiled.
+        """
+        if not _request_profile_lock.acquire(blocking=False):
+            self.result.update(status="busy")
+            raise ProfilerBusy("Another request is being profiled")
+        try:
+            _claim_tracing(5)
+            try:
+                before = tracemalloc.take_snapshot()
+                profiler = cProfile.Profile()
+                started = time.perf_counter()
+                profiler.enable()
+                try:
+                    yield
+                finally:
+                    profiler.disable()
+                    elapsed = time.perf_counter() - started
+                    after = tracemalloc.take_snapshot()
+                    self.result.update(
+                        status="done",
+                        seconds=round(elapsed, 6),
+                        cpu=_summarize_cpu(profiler),
+                        memory=_summarize_memory(before, after),
+                    )
+            finally:
+                _release_tracing()
+        finally:
+            _request_profile_lock.release()
+
+
+def _summarize_cpu(profiler: cProfile.Profile, limit: int = 25) -> dict:
+    """Cumulative time per AIEngine method, plus the top functions overall"""
+    stats = pstats.Stats(profiler).stats
+    engine = {}
+    functions = []
+    for (filename, lineno, name), (calls, _, own, cumulative, _) in stats.items():
+        label = f"{os.path.basename(filename)}:{lineno}({name})"
+        functions.append({"function": label, "calls": calls, "own_seconds": round(own, 6),
+                          "cumulative_seconds": round(cumulative, 6)})
+        if filename == os.path.join(APP_DIR, "ai_engine.py"):
+            engine[f"AIEngine.{name}"] = {"calls": calls, "cumulative_seconds": round(cumulative, 6)}
+    functions.sort(key=lambda entry: entry["cumulative_seconds"], reverse=True)
+    return {"engine_methods": engine, "top_functions": functions[:limit]}
+
+
+def _summarize_memory(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int = 25) -> dict:
+    """Net allocations attributed to the innermost app frame (task table, models, metadata...)"""
+    by_line: Counter = Counter()
+    by_file: Counter = Counter()
+    for stat in after.compare_to(before, "traceback"):
+        if stat.size_diff == 0:
+            continue
+        frame = next((frame for frame in stat.traceback if frame.filename.startswith(APP_DIR)), None)
+        if frame is None or frame.filename == __file__:
+            continue
+        by_line[f"{os.path.basename(frame.filename)}:{frame.lineno}"] += stat.size_diff
+        by_file[os.path.basename(frame.filename)] += stat.size_diff
+    return {
+        "net_bytes_by_file": dict(by_file.most_common()),
+        "top_lines": [{"location": location, "size_diff_bytes": size} for location, size in by_line.most_common(limit)],
+    }
+
+
+class RequestProfileStore:
+    """The most recent per-request profiles, by id"""
+
+    def __init__(self, keep: int = 20):
+        self.keep = keep
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._ids = count(1)
+
+    def new(self, path: str):
+        """Create a profile for a request; returns (id, profile)"""
+        profile_id = str(next(self._ids))
+        profile = RequestProfile(path)
+        self._profiles[profile_id] = profile
+        while len(self._profiles) > self.keep:
+            self._profiles.popitem(last=False)
+        return profile_id, profile
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        profile = self._profiles.get(profile_id)
+        return None if profile is None else profile.result
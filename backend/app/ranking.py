@@ -0,0 +1,177 @@
+"""Urgency scoring and the priority-ordered task index.
+
+Every task carries a precomputed urgency_score that folds priority level and
+due date into one float, so ordering tasks never rebuilds (priority, due_date)
+tuples or strips tzinfo again. Higher scores are more urgent, and ordering by
+descending score matches the old sort: priority first, then earliest due date,
+with undated tasks last within their priority.
+"""
+import heapq
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.models import ExtractedTask, PriorityLevel
+
+PRIORITY_ORDER = {
+    PriorityLevel.CRITICAL: 0,
+    PriorityLevel.HIGH: 1,
+    PriorityLevel.MEDIUM: 2,
+    PriorityLevel.LOW: 3,
+}
+
+# Each priority level owns a band wider than any due date in epoch seconds
+# (1e10 s is year 2286), so priority always dominates and the due date only
+# orders tasks within a level.
+_PRIORITY_BAND = 1e10
+_NO_DUE_DATE = _PRIORITY_BAND - 1
+
+
+def due_epoch(due_date: Optional[datetime]) -> float:
+    """Due date as seconds since the UTC epoch; naive datetimes are taken as UTC"""
+    if due_date is None:
+        return _NO_DUE_DATE
+    if due_date.tzinfo is None:
+        due_date = due_date.replace(tzinfo=timezone.utc)
+    return min(max(due_date.timestamp(), 0.0), _NO_DUE_DATE)
+
+
+def urgency_score(priority: PriorityLevel, due_date: Optional[datetime]) -> float:
+    """Single sortable urgency value; higher means do it sooner"""
+    levels_above_unknown = len(PRIORITY_ORDER) - PRIORITY_ORDER.get(priority, len(PRIORITY_ORDER))
+    return levels_above_unknown * _PRIORITY_BAND - due_epoch(due_date)
+
+
+def score_task(task: ExtractedTask) -> ExtractedTask:
+    """Compute and store the task's urgency score (after extraction or re-prioritization)"""
+    task.urgency_score = urgency_score(task.priority, task.due_date)
+    return task
+
+
+def urgency_key(task: ExtractedTask) -> float:
+    """Sort key putting the most urgent task first"""
+    if task.urgency_score is None:
+        score_task(task)
+    return -task.urgency_score
+
+
+class UrgencyIndex:
+    """Tasks kept in urgency order in a sorted list, for O(1) next-task and O(k) top-k/pages.
+
+    add() and remove() find the position by bisect in O(log n) but then shift
+    the tail of the list, so they are O(n) (one memmove; cheap next to
+    building the snapshot). extend() inserts a batch with one merge, in
+    O(n + k log k) rather than k shifts; copy() is O(n).
+
+    Ties keep insertion order, matching a stable sort of the task list. The
+    index holds task objects itself unless given a lookup(task_id) callable,
+    in which case it only keeps ids and scores (e.g. over a CompactTaskTable).
+    """
+
+    def __init__(self, tasks: Iterable[ExtractedTask] = (), lookup: Optional[Callable[[str], ExtractedTask]] = None):
+        self._lookup = lookup
+        self.rebuild(tasks)
+
+    def rebuild(self, tasks: Iterable[ExtractedTask]):
+        """Index a whole task list with one sort"""
+        self._tasks: Dict[str, ExtractedTask] = {}
+        entries = []
+        for task in tasks:
+            if self._lookup is None:
+                self._tasks[task.id] = task
+            entries.append((task.id, urgency_key(task)))
+        self._load(entries)
+
+    def rebuild_from_scores(self, entries: Iterable[Tuple[str, Optional[float]]]):
+        """Index (task id, urgency score) pairs; requires a lookup"""
+        self._tasks = {}
+        self._load((task_id, -score if score is not None else 0.0) for task_id, score in entries)
+
+    def _load(self, entries: Iterable[Tuple[str, float]]):
+        # Insertion counter breaking ties between equal scores
+        self._next_sequence = 0
+        self._key_by_id: Dict[str, Tuple[float, int]] = {}
+        for task_id, key in entries:
+            self._key_by_id[task_id] = (key, self._take_sequence())
+        self._order: List[Tuple[float, int, str]] = sorted(
+            (key[0], key[1], task_id) for task_id, key in self._key_by_id.items()
+        )
+
+    def copy(self, lookup: Optional[Callable[[str], ExtractedTask]] = None) -> "UrgencyIndex":
+        """Independent copy of the index, optionally resolving ids through another lookup"""
+        index = UrgencyIndex.__new__(UrgencyIndex)
+        index._lookup = lookup if lookup is not None else self._lookup
+        index._tasks = dict(self._tasks)
+        index._key_by_id = dict(self._key_by_id)
+        index._order = list(self._order)
+        index._next_sequence = self._next_sequence
+        return index
+
+    def _take_sequence(self) -> int:
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        return sequence
+
+    def _resolve(self, task_id: str) -> ExtractedTask:
+        return self._lookup(task_id) if self._lookup is not None else self._tasks[task_id]
+
+    def add(self, task: ExtractedTask):
+        """Insert or re-position one task"""
+        if task.id in self._key_by_id:
+            self.remove(task.id)
+        key = (urgency_key(task), self._take_sequence())
+        if self._lookup is None:
+            self._tasks[task.id] = task
+        self._key_by_id[task.id] = key
+        insort(self._order, (key[0], key[1], task.id))
+
+    def extend(self, tasks: Iterable[ExtractedTask]):
+        """Insert or re-position a batch of tasks, merging them in with one pass"""
+        replaced = set()
+        added = []
+        for task in tasks:
+            if task.id in self._key_by_id:
+                replaced.add(task.id)
+            key = (urgency_key(task), self._take_sequence())
+            if self._lookup is None:
+                self._tasks[task.id] = task
+            self._key_by_id[task.id] = key
+            added.append((key[0], key[1], task.id))
+        # A task given twice keeps only its last position
+        added = sorted(entry for entry in added if self._key_by_id[entry[2]][1] == entry[1])
+        order = self._order
+        if replaced:
+            order = [entry for entry in order if entry[2] not in replaced]
+        self._order = list(heapq.merge(order, added))
+
+    def remove(self, task_id: str) -> bool:
+        key = self._key_by_id.pop(task_id, None)
+        if key is None:
+            return False
+        self._tasks.pop(task_id, None)
+        position = bisect_left(self._order, (key[0], key[1], task_id))
+        del self._order[position]
+        return True
+
+    def first(self) -> Optional[ExtractedTask]:
+        return self._resolve(self._order[0][2]) if self._order else None
+
+    def top(self, k: int) -> List[ExtractedTask]:
+        return self.page(0, k)
+
+    def page(self, offset: int, limit: int) -> List[ExtractedTask]:
+        return [self._resolve(entry[2]) for entry in self._order[offset:offset + limit]]
+
+    def __iter__(self) -> Iterator[ExtractedTask]:
+        return (self._resolve(entry[2]) for entry in self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._key_by_id
+
+
+def most_urgent(tasks: Iterable[ExtractedTask], k: int) -> List[ExtractedTask]:
+    """Top k tasks by urgency from an unindexed (e.g. filtered) list, in O(n log k)"""
+    return heapq.nsmallest(k, tasks, key=urgency_key)
@@ -0,0 +1,64 @@
+"""Front router for partitioned workers.
+
+    python -m app.serve --partitioned --workers 4
+
+runs four independent API processes, each started with WORKER_INDEX and
+WORKER_COUNT, and this router in front of them. The router reads the tenant
+from X-Tenant-ID or the /t/<tenant>/ prefix, picks the owning worker on the
+same HashRing the workers use, and proxies the request, streaming both
+bodies. A tenant's tasks and caches therefore live in one worker only.
+Workers reject requests for tenants they don't own with 421, so a
+misconfigured proxy fails loudly rather than splitting a tenant's state.
+"""
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.tenants import HashRing, tenant_from_request
+
+# Hop-by-hop headers are not forwarded in either direction
+_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "upgrade", "te", "trailer",
+                "proxy-authorization", "proxy-authenticate", "host", "content-length"}
+
+
+def build_router(upstreams: List[str], transport: Optional[httpx.AsyncBaseTransport] = None) -> Starlette:
+    """ASGI app proxying each request to upstreams[ring.node(tenant)]"""
+    ring = HashRing([str(index) for index in range(len(upstreams))])
+    client = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(None, connect=5.0))
+
+    async def proxy(request: Request):
+        tenant_id, _ = tenant_from_request(request.url.path, request.headers)
+        upstream = upstreams[int(ring.node(tenant_id))]
+        headers = [(k, v) for k, v in request.headers.raw if k.decode("latin-1").lower() not in _HOP_HEADERS]
+        outgoing = client.build_request(
+            request.method,
+            upstream + request.url.path,
+            params=request.url.query,
+            headers=headers,
+            content=request.stream(),
+        )
+        try:
+            response = await client.send(outgoing, stream=True)
+        except httpx.TransportError as e:
+            return JSONResponse({"detail": f"Worker {upstream} unavailable: {e}"}, status_code=502)
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _HOP_HEADERS},
+            background=BackgroundTask(response.aclose),
+        )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await client.aclose()
+
+    methods = ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"]
+    return Starlette(routes=[Route("/{path:path}", proxy, methods=methods)], lifespan=lifespan)
+
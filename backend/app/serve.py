@@ -0,0 +1,103 @@
+"""Serving with one shared copy of the models.
+
+    python -m app.serve
+
+Starts the inference sidecar (which loads the models once), waits until it
+answers, then runs the API in one uvicorn process that uses the sidecar's
+models instead of loading its own.
+
+    python -m app.serve --partitioned --workers 4
+
+does the same but runs the workers as separate uvicorn processes on the
+next ports (--port + 1, + 2, ...), each owning a share of the tenants, behind
+the tenant-aware router (app/router.py) on --port.
+
+Snapshots, tenants, the chat cache and due events live in process memory, so
+plain uvicorn workers would each hold their own copy and answers would depend
+on which worker took the request; --workers above 1 therefore requires
+--partitioned, where every tenant has exactly one owning process.
+"""
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import time
+
+import uvicorn
+
+from app.inference import SidecarClient, default_address
+from app.router import build_router
+
+
+def wait_for_sidecar(process: subprocess.Popen, timeout: float) -> bool:
+    """Poll until the sidecar answers a status call (model loading can take minutes)"""
+    client = SidecarClient()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            loaded = client.status()
+            print(f"Inference sidecar ready: {loaded}")
+            return True
+        except (OSError, EOFError):
+            time.sleep(0.5)
+    return False
+
+
+def run_partitioned(host: str, port: int, workers: int):
+    """Start one API process per worker on the following ports and route tenants to them"""
+    processes = []
+    upstreams = []
+    try:
+        for index in range(workers):
+            worker_port = port + 1 + index
+            env = dict(os.environ, WORKER_INDEX=str(index), WORKER_COUNT=str(workers))
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(worker_port)],
+                env=env,
+            ))
+            upstreams.append(f"http://127.0.0.1:{worker_port}")
+        uvicorn.run(build_router(upstreams), host=host, port=port)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with its models in a shared sidecar process")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=1,
+                        help="API processes; more than one requires --partitioned")
+    parser.add_argument("--sidecar-timeout", type=float, default=600.0)
+    parser.add_argument("--partitioned", action="store_true",
+                        help="one process per worker, each serving the tenants hashed to it")
+    args = parser.parse_args()
+    if args.workers > 1 and not args.partitioned:
+        parser.error("--workers > 1 needs --partitioned: unpartitioned workers would each keep "
+                     "their own tasks, tenants and caches in memory")
+
+    # Workers and sidecar find each other through the environment they inherit
+    os.environ["INFERENCE_MODE"] = "sidecar"
+    os.environ["INFERENCE_ADDRESS"] = default_address()
+    os.environ.setdefault("INFERENCE_AUTHKEY", secrets.token_hex(16))
+
+    sidecar = subprocess.Popen([sys.executable, "-m", "app.inference"])
+    try:
+        if not wait_for_sidecar(sidecar, args.sidecar_timeout):
+            print("Inference sidecar did not start - workers will use rule-based extraction")
+        if args.partitioned:
+            run_partitioned(args.host, args.port, args.workers)
+        else:
+            uvicorn.run("app.main:app", host=args.host, port=args.port)
+    finally:
+        sidecar.terminate()
+        sidecar.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Versioned, copy-on-write snapshots of the task store.
+
+A TaskSnapshot (a task table plus its urgency and people indexes) is never
+modified once published. Writers derive a new table from the current snapshot - copying
+columns while sharing the append-only text buffer and string table - and
+publish it by swapping a single reference. Readers call current() once per
+request and use that snapshot throughout, so they never see a half-built
+extraction or half-applied re-sort and never wait on a writer. Snapshots no
+request holds any more are freed by normal reference counting.
+"""
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional
+
+from app.compact import CompactTaskTable
+from app.due_schedule import DueSchedule
+from app.metrics import STAGE_SECONDS
+from app.people import PeopleIndex
+from app.ranking import UrgencyIndex
+
+
+class TaskSnapshot:
+    """One published version of the tasks; treat as read-only.
+
+    Only its due schedule changes, as time passes (DueSchedule.advance()).
+    """
+
+    __slots__ = ("version", "tasks", "index", "due", "people", "published_at", "__weakref__")
+
+    def __init__(
+        self,
+        version: int,
+        tasks: CompactTaskTable,
+        index: Optional[UrgencyIndex] = None,
+        due: Optional[DueSchedule] = None,
+        people: Optional[PeopleIndex] = None,
+    ):
+        if index is None:
+            index = UrgencyIndex(lookup=tasks.get)
+            with STAGE_SECONDS.time("sort"):
+                index.rebuild_from_scores(tasks.urgency_entries())
+        self.version = version
+        self.tasks = tasks
+        self.index = index
+        self.due = due if due is not None else DueSchedule(tasks)
+        self.people = people if people is not None else PeopleIndex(tasks)
+        self.published_at = datetime.now(timezone.utc)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+
+class SnapshotStore:
+    """Holds the current snapshot; writers are serialized, readers take no lock"""
+
+    def __init__(self):
+        self._write_lock = threading.RLock()
+        self._version = 0
+        self._live = weakref.WeakSet()
+        self._current = self._make_snapshot(CompactTaskTable())
+
+    def current(self) -> TaskSnapshot:
+        """The latest published snapshot (a single reference read, safe from any thread)"""
+        return self._current
+
+    @contextmanager
+    def writer(self) -> Iterator[TaskSnapshot]:
+        """Hold the write lock and yield the snapshot to derive the next one from.
+
+        Everything read and published inside the block is one atomic update
+        as far as other writers are concerned.
+        """
+        with self._write_lock:
+            yield self._current
+
+    def publish(
+        self,
+        tasks: CompactTaskTable,
+        index: Optional[UrgencyIndex] = None,
+        due: Optional[DueSchedule] = None,
+        people: Optional[PeopleIndex] = None,
+    ) -> TaskSnapshot:
+        """Make tasks (a table no reader has seen yet) the current snapshot"""
+        with self._write_lock:
+            self._current = self._make_snapshot(tasks, index, due, people)
+            return self._current
+
+    def live_versions(self) -> List[int]:
+        """Versions of snapshots still referenced somewhere, oldest first"""
+        return sorted(snapshot.version for snapshot in list(self._live))
+
+    def _make_snapshot(
+        self,
+        tasks: CompactTaskTable,
+        index: Optional[UrgencyIndex] = None,
+        due: Optional[DueSchedule] = None,
+        people: Optional[PeopleIndex] = None,
+    ) -> TaskSnapshot:
+        snapshot = TaskSnapshot(self._version, tasks, index, due, people)
+        self._version += 1
+        self._live.add(snapshot)
+        return snapshot
@@ -0,0 +1,315 @@
+"""Per-tenant partitions: each user or mailbox gets its own tasks and state.
+
+A Tenant bundles everything that used to be process-global: source
+connectors and their watermarks, conversation threads, the task snapshot
+store, the archive, the chat answer cache, preprocessing totals and the log of
+due-date events. Requests
+name their tenant with the X-Tenant-ID header or a /t/<tenant>/ path prefix;
+without either they use the "default" tenant, whose data directory is
+backend/data as before. Other tenants live in TENANTS_DIR/<tenant>/, laid out
+like backend/data (JSON files or a connectors.json); a tenant exists when its
+directory does.
+
+Tenants are loaded on first use. Ones idle for longer than the idle timeout,
+or beyond the resident limit (least recently used first), are evicted: their
+tasks and conversation threads are saved under <data dir>/.state/ and read
+back when the tenant is next used. Tenants serving a request are never
+evicted.
+
+With several worker processes, HashRing assigns each tenant to one worker
+(see app.router), so a tenant's state lives in exactly one process.
+"""
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.archive import RetentionPolicy, TaskArchive
+from app.chat_cache import ChatCache
+from app.compact import CompactTaskTable
+from app.connectors import WatermarkStore, build_connectors
+from app.conversations import ConversationTracker
+from app.due_schedule import DueEvent, DueEventLog
+from app.models import ExtractedTask
+from app.people import person_id
+from app.preprocess import PreprocessStats
+from app.snapshots import SnapshotStore
+
+TENANT_HEADER = "X-Tenant-ID"
+DEFAULT_TENANT = "default"
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.@-]{0,63}$")
+
+
+def valid_tenant_id(tenant_id: str) -> bool:
+    """Ids are used as directory names: letters, digits and _ . @ - only"""
+    return bool(_TENANT_ID.match(tenant_id)) and ".." not in tenant_id
+
+
+class Tenant:
+    """One partition's sources, tasks and caches"""
+
+    def __init__(self, tenant_id: str, data_dir: Path, retention: RetentionPolicy, chat_cache_size: int = 256):
+        self.id = tenant_id
+        # Person ID for "me" in people queries: the tenant's user, or OWNER_PERSON_ID for the default tenant
+        self.owner = person_id(os.getenv("OWNER_PERSON_ID") if tenant_id == DEFAULT_TENANT else tenant_id) or None
+        self.data_dir = Path(data_dir)
+        self.retention = retention
+        self.connectors = build_connectors(self.data_dir)
+        self.watermarks = WatermarkStore(self.data_dir / ".watermarks.json")
+        self.conversations = ConversationTracker()
+        self.preprocess_stats = PreprocessStats()
+        self.task_store = SnapshotStore()
+        self.archive = TaskArchive(self.data_dir / "archive" / "tasks.ndjson.gz")
+        self.chat_cache = ChatCache(maxsize=chat_cache_size)
+        self.due_events = DueEventLog()
+        # Requests currently using this tenant, and when the last one started
+        self.active = 0
+        self.last_used = time.monotonic()
+        self._load_state()
+
+    @property
+    def state_dir(self) -> Path:
+        return self.data_dir / ".state"
+
+    def save_state(self):
+        """Write tasks and conversation threads to disk, replacing any previous state"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with self.task_store.writer() as current:
+            tasks_path = self.state_dir / "tasks.ndjson.gz"
+            tmp_path = tasks_path.with_suffix(".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                for task in current.tasks:
+                    f.write(task.model_dump_json() + "\n")
+            os.replace(tmp_path, tasks_path)
+
+            threads_path = self.state_dir / "conversations.json"
+            tmp_path = threads_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.conversations.to_dict(), f)
+            os.replace(tmp_path, threads_path)
+
+    def advance_due(self, now: Optional[datetime] = None, snapshot=None) -> List[DueEvent]:
+        """Bring a snapshot's due schedule (default: the current one) up to now.
+
+        Events are logged only for the current snapshot, so a transition is
+        not reported twice by a superseded copy of its schedule.
+        """
+        current = self.task_store.current()
+        snapshot = snapshot or current
+        events = snapshot.due.advance(now)
+        if events and snapshot is current:
+            self.due_events.extend(events)
+        return events
+
+    def _load_state(self):
+        tasks_path = self.state_dir / "tasks.ndjson.gz"
+        threads_path = self.state_dir / "conversations.json"
+        try:
+            if tasks_path.exists():
+                with gzip.open(tasks_path, "rt", encoding="utf-8") as f:
+                    table = CompactTaskTable.from_tasks(ExtractedTask.model_validate_json(line) for line in f if line.strip())
+                self.task_store.publish(table)
+            if threads_path.exists():
+                with open(threads_path, "r", encoding="utf-8") as f:
+                    self.conversations.load_dict(json.load(f))
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            print(f"Ignoring unreadable saved state for tenant '{self.id}': {e}")
+
+
+class TenantRegistry:
+    """Loads tenants on demand and evicts idle ones"""
+
+    def __init__(
+        self,
+        root: Path,
+        default_dir: Path,
+        retention: RetentionPolicy,
+        idle_seconds: float = 900.0,
+        max_resident: int = 1000,
+        chat_cache_size: int = 256,
+    ):
+        self.root = Path(root)
+        self.default_dir = Path(default_dir)
+        self.retention = retention
+        self.idle_seconds = idle_seconds
+        self.max_resident = max_resident
+        self.chat_cache_size = chat_cache_size
+        self._tenants: Dict[str, Tenant] = {}
+        # Evicted tenants whose state is still being written; reused if requested meanwhile
+        self._evicting: Dict[str, Tenant] = {}
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._last_sweep = time.monotonic()
+
+    def data_dir(self, tenant_id: str) -> Optional[Path]:
+        if tenant_id == DEFAULT_TENANT:
+            return self.default_dir
+        path = self.root / tenant_id
+        return path if path.is_dir() else None
+
+    def acquire(self, tenant_id: str) -> Tenant:
+        """The tenant, loaded if needed and marked in use until release(); KeyError if unknown"""
+        with self._lock:
+            tenant = self._tenants.get(tenant_id) or self._evicting.get(tenant_id)
+            if tenant is not None:
+                self._tenants[tenant_id] = tenant
+                tenant.active += 1
+                tenant.last_used = time.monotonic()
+                return tenant
+            loading = self._loading.setdefault(tenant_id, threading.Lock())
+
+        # Load outside the registry lock so other tenants aren't held up;
+        # concurrent first requests for the same tenant load it once
+        try:
+            with loading:
+                with self._lock:
+                    tenant = self._tenants.get(tenant_id)
+                if tenant is None:
+                    data_dir = self.data_dir(tenant_id)
+                    if data_dir is None:
+                        raise KeyError(tenant_id)
+                    tenant = Tenant(tenant_id, data_dir, self.retention, self.chat_cache_size)
+                with self._lock:
+                    tenant = self._tenants.setdefault(tenant_id, tenant)
+                    tenant.active += 1
+                    tenant.last_used = time.monotonic()
+        finally:
+            # Also on failure, so unknown ids don't leave a lock behind each
+            with self._lock:
+                self._loading.pop(tenant_id, None)
+        self.evict_idle()
+        return tenant
+
+    def release(self, tenant: Tenant):
+        with self._lock:
+            tenant.active -= 1
+
+    @contextmanager
+    def use(self, tenant_id: str) -> Iterator[Tenant]:
+        tenant = self.acquire(tenant_id)
+        try:
+            yield tenant
+        finally:
+            self.release(tenant)
+
+    def get(self, tenant_id: str) -> Tenant:
+        """The tenant, loaded if needed, without marking it in use"""
+        with self.use(tenant_id) as tenant:
+            return tenant
+
+    def resident(self) -> List[Tenant]:
+        with self._lock:
+            return list(self._tenants.values())
+
+    def evict_idle(self, force: bool = False) -> List[str]:
+        """Save and drop idle tenants, and the least recently used beyond max_resident.
+
+        Runs at most every idle_seconds / 4 unless forced or over the limit.
+        """
+        now = time.monotonic()
+        with self._lock:
+            over_limit = len(self._tenants) > self.max_resident
+            if not (force or over_limit or now - self._last_sweep >= self.idle_seconds / 4):
+                return []
+            self._last_sweep = now
+            idle = [t for t in self._tenants.values() if t.active == 0]
+            idle.sort(key=lambda t: t.last_used)
+            excess = len(self._tenants) - self.max_resident
+            victims = [
+                t for position, t in enumerate(idle)
+                if position < excess or now - t.last_used >= self.idle_seconds
+            ]
+            for tenant in victims:
+                del self._tenants[tenant.id]
+                self._evicting[tenant.id] = tenant
+
+        for tenant in victims:
+            try:
+                tenant.save_state()
+            except OSError as e:
+                print(f"Could not save state of tenant '{tenant.id}': {e}")
+            finally:
+                with self._lock:
+                    self._evicting.pop(tenant.id, None)
+        return [tenant.id for tenant in victims]
+
+    def evict(self, tenant_id: str) -> bool:
+        """Save and drop one tenant now if it is resident and not in use"""
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is None or tenant.active:
+                return False
+            del self._tenants[tenant_id]
+            self._evicting[tenant_id] = tenant
+        try:
+            tenant.save_state()
+        finally:
+            with self._lock:
+                self._evicting.pop(tenant_id, None)
+        return True
+
+
+class TenantPathMiddleware:
+    """Routes /t/<tenant>/rest as /rest with the X-Tenant-ID header set (ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/t/"):
+            tenant_id, _, rest = scope["path"][len("/t/"):].partition("/")
+            header = TENANT_HEADER.lower().encode("latin-1")
+            scope = dict(scope)
+            scope["path"] = "/" + rest
+            scope["raw_path"] = scope["path"].encode("utf-8")
+            scope["headers"] = [(k, v) for k, v in scope["headers"] if k != header]
+            scope["headers"].append((header, tenant_id.encode("latin-1", "replace")))
+        await self.app(scope, receive, send)
+
+
+def tenant_from_request(path: str, headers) -> Tuple[str, str]:
+    """(tenant id, path without any /t/<tenant> prefix) as TenantPathMiddleware would route it"""
+    if path.startswith("/t/"):
+        tenant_id, _, rest = path[len("/t/"):].partition("/")
+        return tenant_id, "/" + rest
+    return headers.get(TENANT_HEADER) or DEFAULT_TENANT, path
+
+
+class HashRing:
+    """Consistent hashing of tenant ids onto nodes.
+
+    Each node owns many points on the ring, so adding or removing one node
+    only moves the tenants on its points (about 1/N of them).
+    """
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 64):
+        if not nodes:
+            raise ValueError("HashRing needs at least one node")
+        self.nodes = list(nodes)
+        points = sorted((self._hash(f"{node}#{replica}"), node) for node in self.nodes for replica in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def node(self, key: str) -> str:
+        position = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[position]
+
+
+def worker_ring() -> Optional[Tuple[HashRing, str]]:
+    """(ring over all workers, this worker's node) when started as one of WORKER_COUNT partitioned workers"""
+    count = int(os.getenv("WORKER_COUNT", "1"))
+    if count <= 1:
+        return None
+    return HashRing([str(index) for index in range(count)]), os.getenv("WORKER_INDEX", "0")
@@ -0,0 +1 @@
+# Benchmarks for the extraction/prioritization pipeline (run from backend/ with python -m)
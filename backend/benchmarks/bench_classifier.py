@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""Accuracy versus latency of the zero-shot priority classifier per backend.
+
+Classifies a labeled sample (benchmarks/priority_sample.json plus the
+bundled Loop tasks, or --sample) with each backend and thread count, the
+same way AIEngine._classify_priority does, and reports accuracy against the
+labels, agreement with the first backend (fp32 by default), load time and
+per-call latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_classifier [--backends fp32 int8] [--threads 1 4] [--repeat 3]
+    python -m benchmarks.bench_classifier --save-artifact models/bart-large-mnli-int8
+    python -m benchmarks.bench_classifier --backends fp32 artifact --artifact models/bart-large-mnli-int8
+
+Needs transformers and torch. Results are written to
+benchmarks/results/classifier-<commit>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.inference import configure_threads, load_classifier, save_quantized_classifier
+from benchmarks.bench_pipeline import RESULTS_DIR, _git_commit
+from benchmarks.loadtest import percentile
+
+SAMPLE_PATH = Path(__file__).parent / "priority_sample.json"
+DATA_DIR = Path(__file__).parent.parent / "data"
+LABELS = ["critical", "high", "medium", "low"]
+
+
+def load_sample(path: Optional[Path] = None) -> List[Tuple[str, str]]:
+    """(text, priority) pairs: the given JSON list, else the bundled sample plus Loop tasks"""
+    if path is not None:
+        records = json.loads(Path(path).read_text(encoding="utf-8"))
+        return [(record["text"], record["priority"]) for record in records]
+    sample = load_sample(SAMPLE_PATH)
+    with open(DATA_DIR / "loop_tasks.json", "r", encoding="utf-8") as f:
+        sample += [(f"{task['title']} {task['description']}", task["priority"]) for task in json.load(f)]
+    return sample
+
+
+def evaluate(classifier, sample: Sequence[Tuple[str, str]], repeat: int) -> dict:
+    """Predictions, accuracy and latency of classifier over the sample (repeat passes)"""
+    classifier(sample[0][0][:512], LABELS, multi_class=False)  # warm up
+    latencies = []
+    best_pass = float("inf")
+    predictions = []
+    for _ in range(repeat):
+        predictions = []
+        pass_start = time.perf_counter()
+        for text, _ in sample:
+            start = time.perf_counter()
+            result = classifier(text[:512], LABELS, multi_class=False)
+            latencies.append(time.perf_counter() - start)
+            predictions.append(result["labels"][0])
+        best_pass = min(best_pass, time.perf_counter() - pass_start)
+
+    latencies.sort()
+    correct = sum(1 for prediction, (_, label) in zip(predictions, sample) if prediction == label)
+    return {
+        "predictions": predictions,
+        "accuracy": round(correct / len(sample), 4),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+        },
+        "per_second": round(len(sample) / best_pass, 2),
+    }
+
+
+def run(loaders: Dict[str, Callable[[], object]], sample: Sequence[Tuple[str, str]], threads: Sequence[int], repeat: int) -> dict:
+    """Evaluate each backend at each thread count; agreement is against the first backend's first run"""
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sample": len(sample),
+            "repeat": repeat,
+        },
+        "backends": {},
+    }
+    reference = None
+    for name, load in loaders.items():
+        start = time.perf_counter()
+        classifier = load()
+        backend = {"load_seconds": round(time.perf_counter() - start, 2), "threads": {}}
+        for count in threads:
+            used = configure_threads(count)
+            result = evaluate(classifier, sample, repeat)
+            predictions = result.pop("predictions")
+            if reference is None:
+                reference = predictions
+            result["agreement"] = round(sum(a == b for a, b in zip(predictions, reference)) / len(sample), 4)
+            backend["threads"][str(used or count)] = result
+        results["backends"][name] = backend
+        del classifier
+    return results
+
+
+def summary(results: dict) -> str:
+    lines = [f"{'backend':<10} {'threads':>7} {'accuracy':>8} {'agree':>6} {'p50 ms':>8} {'p95 ms':>8} {'per s':>7} {'load s':>7}"]
+    for name, backend in results["backends"].items():
+        for threads, r in backend["threads"].items():
+            lines.append(
+                f"{name:<10} {threads:>7} {r['accuracy']:>8.1%} {r['agreement']:>6.1%} "
+                f"{r['latency_ms']['p50']:>8.1f} {r['latency_ms']['p95']:>8.1f} {r['per_second']:>7.1f} {backend['load_seconds']:>7.1f}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["fp32", "int8"], choices=["fp32", "int8", "artifact"])
+    parser.add_argument("--artifact", type=Path, help="directory written by --save-artifact")
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sample", type=Path, help='JSON list of {"text": ..., "priority": ...}')
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--save-artifact", type=Path, metavar="DIR", help="quantize the classifier to DIR and exit")
+    args = parser.parse_args()
+
+    if args.save_artifact:
+        print(f"Quantized classifier saved to {save_quantized_classifier(args.save_artifact)}")
+        sys.exit(0)
+    if "artifact" in args.backends and args.artifact is None:
+        parser.error("--backends artifact needs --artifact DIR")
+
+    loaders = {name: (lambda name=name: load_classifier(name, args.artifact)) for name in args.backends}
+    results = run(loaders, load_sample(args.sample), args.threads, args.repeat)
+    out = args.out or RESULTS_DIR / f"classifier-{results['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(summary(results))
+    print(f"Results written to {out}", file=sys.stderr)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Throughput benchmark for the deadline extractor.
+
+Usage (from backend/): python -m benchmarks.bench_deadlines [--lines 500000]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.deadlines import DeadlineExtractor, cache_info
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def sample_lines():
+    """Non-empty lines from the bundled emails and Teams messages"""
+    lines = []
+    with open(DATA_DIR / "outlook_emails.json", "r", encoding="utf-8") as f:
+        for email in json.load(f):
+            lines.append(email["subject"])
+            lines.extend(email["body"].split("\n"))
+    with open(DATA_DIR / "teams_messages.json", "r", encoding="utf-8") as f:
+        lines.extend(message["message"] for message in json.load(f))
+    return [line for line in lines if line.strip()]
+
+
+def run(total_lines: int) -> dict:
+    lines = sample_lines()
+    corpus = (lines * (total_lines // len(lines) + 1))[:total_lines]
+    extractor = DeadlineExtractor()
+    reference = datetime(2025, 11, 10, 9, 30, tzinfo=timezone.utc)
+
+    start = time.perf_counter()
+    found = sum(1 for line in corpus if extractor.extract(line, reference))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "lines": total_lines,
+        "deadlines_found": found,
+        "seconds": round(elapsed, 4),
+        "lines_per_second": round(total_lines / elapsed),
+        "cache": cache_info()._asdict(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.lines), indent=2))
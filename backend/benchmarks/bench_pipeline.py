@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""Micro-benchmarks for the extraction/prioritization pipeline over synthetic corpora.
+
+Times rule-based extraction, keyword and (stub) model priority
+classification, prioritization, insights and chat at each corpus size, and
+writes the results as JSON so runs on different commits can be compared.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline [--scales 1000 10000 100000] [--seed 0] [--out results.json]
+    python -m benchmarks.bench_pipeline --compare old.json new.json
+
+Extraction streams the corpus in chunks, so memory is bounded by the task
+table; 1,000,000 items needs roughly 3 GB. prioritize_tasks sorts a list of
+models and is skipped above --max-list-tasks tasks.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+os.environ.setdefault("INFERENCE_MODE", "rules")  # never load real models here
+
+from app.ai_engine import AIEngine
+from app.compact import CompactTaskTable
+from app.conversations import ConversationTracker
+from app.models import LoopTask, OutlookEmail, TeamsMessage
+from app.ranking import UrgencyIndex
+from benchmarks.corpus import generate
+
+RESULTS_DIR = Path(__file__).parent / "results"
+CHUNK = 10_000
+MODELS = {"email": OutlookEmail, "teams": TeamsMessage, "loop": LoopTask}
+CHAT_QUERIES = [
+    "What should I do next?",
+    "What are my critical tasks?",
+    "Show me tasks due today",
+    "What's overdue?",
+    "Summarize my email tasks",
+    "What's due this week?",
+    "How many tasks do I have?",
+]
+
+
+class StubClassifier:
+    """Stands in for the zero-shot pipeline: same call and result shape, near-zero cost.
+
+    Timing _classify_priority with it measures the model code path's own
+    overhead, independent of model speed.
+    """
+
+    def __call__(self, text, labels, multi_class=False):
+        top = zlib.crc32(text.encode("utf-8")) % len(labels)
+        ordered = labels[top:] + labels[:top]
+        return {"sequence": text, "labels": ordered, "scores": [1.0 / len(labels)] * len(labels)}
+
+
+def _stage(seconds: float, count: int) -> dict:
+    return {
+        "seconds": round(seconds, 6),
+        "count": count,
+        "per_second": round(count / seconds, 1) if seconds > 0 else None,
+    }
+
+
+def _best_of(repeat: int, setup, run) -> float:
+    """Fastest of repeat runs of run(setup()), timing only run"""
+    best = float("inf")
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def extract(engine: AIEngine, items: int, seed: int):
+    """Stream the corpus through extraction; returns (task table, stage results)"""
+    table = CompactTaskTable()
+    conversations = ConversationTracker()
+    rule_seconds = item_seconds = 0.0
+    texts_count = 0
+
+    for chunk in _chunks(generate(items, seed), CHUNK):
+        texts = []
+        for kind, record in chunk:
+            if kind == "email":
+                texts.append((f"{record['subject']}\n{record['body']}",
+                              {"source_type": "email", "reference_date": record["received_date"]}))
+            elif kind == "teams":
+                texts.append((record["message"], {"source_type": "teams", "reference_date": record["timestamp"]}))
+        models = [MODELS[kind](**record) for kind, record in chunk]
+
+        start = time.perf_counter()
+        for text, source_info in texts:
+            engine._extract_tasks_rule_based(text, source_info)
+        rule_seconds += time.perf_counter() - start
+        texts_count += len(texts)
+
+        tasks = []
+        start = time.perf_counter()
+        for item in models:
+            tasks.extend(engine.extract_tasks_from_item(item, conversations))
+        item_seconds += time.perf_counter() - start
+        table.extend(tasks)
+
+    return table, {
+        "extract_rule_based": _stage(rule_seconds, texts_count),
+        "extract_items": _stage(item_seconds, items),
+    }
+
+
+def classify(engine: AIEngine, table: CompactTaskTable, classifier) -> dict:
+    engine.classifier = classifier
+    seconds = 0.0
+    try:
+        for rows in _chunks(range(len(table)), CHUNK):
+            texts = [f"{task.title} {task.description}" for task in (table.task(row) for row in rows)]
+            start = time.perf_counter()
+            for text in texts:
+                engine._classify_priority(text)
+            seconds += time.perf_counter() - start
+    finally:
+        engine.classifier = None
+    return _stage(seconds, len(table))
+
+
+def prioritize_table(engine: AIEngine, table: CompactTaskTable) -> CompactTaskTable:
+    """What POST /api/tasks/prioritize does to the stored table"""
+    table = table.copy()
+    for row in table.open_rows():
+        table.update(row, engine.reprioritize_task(table.task(row)))
+    return table.sorted_by_urgency()
+
+
+def run_scale(engine: AIEngine, items: int, seed: int, repeat: int, max_list_tasks: int) -> dict:
+    table, stages = extract(engine, items, seed)
+    tasks = len(table)
+    print(f"  {items} items -> {tasks} tasks", file=sys.stderr)
+
+    stages["classify_keyword"] = classify(engine, table, None)
+    stages["classify_stub_model"] = classify(engine, table, StubClassifier())
+
+    if tasks <= max_list_tasks:
+        seconds = _best_of(repeat, lambda: list(table), engine.prioritize_tasks)
+        stages["prioritize_tasks"] = _stage(seconds, tasks)
+    else:
+        stages["prioritize_tasks"] = {"skipped": f"more than {max_list_tasks} tasks"}
+    seconds = _best_of(repeat, lambda: None, lambda _: prioritize_table(engine, table))
+    stages["prioritize_table"] = _stage(seconds, tasks)
+
+    seconds = _best_of(repeat, lambda: None, lambda _: engine.generate_task_insights(table))
+    stages["generate_task_insights"] = _stage(seconds, tasks)
+
+    index = UrgencyIndex(lookup=table.get)
+    index.rebuild_from_scores(table.urgency_entries())
+    chat = {}
+    for query in CHAT_QUERIES:
+        seconds = _best_of(repeat, lambda: None, lambda _: engine.chat_interface(query, table, index))
+        chat[query] = round(seconds, 6)
+    stages["chat_interface"] = {"seconds": round(sum(chat.values()), 6), "count": len(chat), "per_query": chat}
+
+    return {"items": items, "tasks": tasks, "stages": stages}
+
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(scales, seed: int, repeat: int, max_list_tasks: int) -> dict:
+    engine = AIEngine()
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "scales": {},
+    }
+    for items in scales:
+        print(f"Benchmarking {items} items...", file=sys.stderr)
+        results["scales"][str(items)] = run_scale(engine, items, seed, repeat, max_list_tasks)
+    return results
+
+
+def compare(old: dict, new: dict) -> str:
+    """Per-stage time ratios new/old (>1 means slower) for scales present in both"""
+    lines = [f"{old['meta']['commit']} -> {new['meta']['commit']}"]
+    for scale, new_scale in new["scales"].items():
+        old_scale = old["scales"].get(scale)
+        if old_scale is None:
+            continue
+        lines.append(f"{scale} items:")
+        for stage, result in new_scale["stages"].items():
+            before = old_scale["stages"].get(stage, {}).get("seconds")
+            after = result.get("seconds")
+            if before and after:
+                lines.append(f"  {stage:24} {before:10.4f}s -> {after:10.4f}s  x{after / before:.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-list-tasks", type=int, default=500_000)
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (json.loads(path.read_text(encoding="utf-8")) for path in args.compare)
+        print(compare(old, new))
+        sys.exit(0)
+
+    results = run(args.scales, args.seed, args.repeat, args.max_list_tasks)
+    out = args.out or RESULTS_DIR / f"pipeline-{results['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {out}", file=sys.stderr)
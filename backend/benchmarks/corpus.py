@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""Seeded synthetic corpus shaped like backend/data/*.json.
+
+Produces OutlookEmail, TeamsMessage and LoopTask records (as plain dicts)
+lazily, so corpora up to millions of items can be streamed without holding
+them in memory. The same seed always yields the same corpus.
+
+Usage (from backend/):
+    python -m benchmarks.corpus --items 100000 --out /tmp/corpus [--seed 7] [--format ndjson]
+
+The written files can be read through data/connectors.json (ndjson or json).
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+# Share of each source in a corpus (emails dominate, as in a real inbox)
+MIX = (("email", 0.6), ("teams", 0.25), ("loop", 0.15))
+START = datetime(2025, 11, 1, 8, 0, tzinfo=timezone.utc)
+
+_FIRST = ["Sarah", "Mike", "Alex", "Priya", "David", "Emma", "Carlos", "Lisa", "Tom", "Aisha",
+          "John", "Nina", "Omar", "Grace", "Wei", "Rachel", "Ivan", "Julia", "Ben", "Fatima"]
+_LAST = ["Johnson", "Chen", "Thompson", "Patel", "Kim", "Garcia", "Brown", "Rossi", "Nguyen", "Smith",
+         "Williams", "Khan", "Martin", "Lopez", "Wilson", "Anderson", "Okafor", "Schmidt", "Lee", "Davis"]
+_TEAMS = ["Marketing", "Engineering", "Finance", "Sales", "Product", "Operations", "Design", "HR"]
+_TOPICS = ["Q4 budget", "marketing campaign", "release pipeline", "client proposal", "hiring plan",
+           "security audit", "API migration", "board deck", "vendor contract", "roadmap review",
+           "customer onboarding", "sprint retro", "pricing update", "data warehouse", "launch checklist"]
+_SUBJECTS = ["{topic} - Action Required", "{topic} update", "Please review: {topic}",
+             "URGENT: {topic}", "Follow-up on {topic}", "{topic} next steps", "FYI: {topic}"]
+_ACTIONS = ["Review the {topic} document", "Send feedback on the {topic}", "Update the {topic} tracker",
+            "Prepare slides for the {topic}", "Approve the {topic} budget", "Schedule a call about the {topic}",
+            "Finalize the {topic} numbers", "Share the {topic} summary with the team",
+            "Fix the blocking issue in the {topic}", "Sign off on the {topic}"]
+_DEADLINES = ["", "", "", " by Friday", " by EOD today", " by next Monday", " before Nov 20th",
+              " by tomorrow", " in 3 days", " by end of the week", " due 11/28", " ASAP"]
+_URGENCY = ["", "", "", "", "Urgent: ", "Important: ", "Optional: ", "When possible, "]
+_FILLER = ["Hope you're doing well.", "Thanks for your help on this.", "Let me know if you have questions.",
+           "Looking forward to your inputs.", "Great work last week, everyone.",
+           "I've attached the latest version for reference.", "We discussed this in the standup."]
+_TAGS = ["marketing", "budget", "engineering", "client", "Q4", "hiring", "security", "release", "finance"]
+
+
+def _person(rng: random.Random) -> Tuple[str, str]:
+    first, last = rng.choice(_FIRST), rng.choice(_LAST)
+    return f"{first} {last}", f"{first.lower()}.{last.lower()}@company.com"
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _action(rng: random.Random, topic: str) -> str:
+    return rng.choice(_URGENCY) + rng.choice(_ACTIONS).format(topic=topic) + rng.choice(_DEADLINES)
+
+
+def _email(rng: random.Random, number: int, moment: datetime, recent: list) -> Dict:
+    name, address = _person(rng)
+    reply_to = rng.choice(recent) if recent and rng.random() < 0.3 else None
+    topic = reply_to["topic"] if reply_to else rng.choice(_TOPICS)
+    subject = f"RE: {reply_to['subject']}" if reply_to else rng.choice(_SUBJECTS).format(topic=topic)
+
+    lines = [f"Hi {rng.choice(['Team', 'all', rng.choice(_FIRST)])},", ""]
+    lines.append(rng.choice(_FILLER))
+    actions = [_action(rng, topic) for _ in range(rng.randint(1, 5))]
+    style = rng.random()
+    if style < 0.4:
+        lines += [""] + [f"{i}. {action}" for i, action in enumerate(actions, 1)]
+    elif style < 0.7:
+        lines += ["", "Action items:"] + [f"- {action}" for action in actions]
+    else:
+        lines += [action + "." for action in actions]
+    lines += ["", rng.choice(_FILLER), "", "Best,", name.split()[0]]
+    if reply_to:
+        lines += ["", f"On {reply_to['date']}, {reply_to['sender']} wrote:"]
+        lines += ["> " + line for line in reply_to["body"].split("\n")[:8]]
+    body = "\n".join(lines)
+    if rng.random() < 0.1:
+        body = "<html><body>" + "".join(f"<p>{line}</p>" for line in lines) + "</body></html>"
+
+    record = {
+        "id": f"email_{number:07d}",
+        "subject": subject,
+        "sender": address,
+        "sender_name": name,
+        "body": body,
+        "received_date": _iso(moment),
+        "has_attachments": rng.random() < 0.3,
+        "in_reply_to": reply_to["id"] if reply_to else None,
+        "references": [reply_to["id"]] if reply_to else [],
+    }
+    recent.append({"id": record["id"], "subject": subject, "topic": topic, "sender": name,
+                   "date": record["received_date"], "body": "\n".join(lines[:6])})
+    if len(recent) > 50:
+        recent.pop(0)
+    return record
+
+
+def _teams(rng: random.Random, number: int, moment: datetime) -> Dict:
+    name, address = _person(rng)
+    topic = rng.choice(_TOPICS)
+    mentions = rng.sample(["@channel", f"@{rng.choice(_FIRST)}", f"@{rng.choice(_FIRST)}"], rng.randint(0, 2))
+    text = rng.choice([
+        f"{' '.join(mentions)} Reminder: {_action(rng, topic)}.",
+        f"Quick update on the {topic}: {rng.choice(_FILLER)}",
+        f"Can you {rng.choice(_ACTIONS).format(topic=topic).lower()}{rng.choice(_DEADLINES)}?",
+        f"{_action(rng, topic)}. It's blocking the {rng.choice(_TOPICS)}.",
+    ]).strip()
+    return {
+        "id": f"teams_{number:07d}",
+        "channel": rng.choice(_TEAMS),
+        "sender_name": name,
+        "sender_email": address,
+        "message": text,
+        "timestamp": _iso(moment),
+        "mentions": mentions,
+        "reactions": rng.sample(["👍", "👀", "✅", "🔥"], rng.randint(0, 2)),
+    }
+
+
+def _loop(rng: random.Random, number: int, moment: datetime) -> Dict:
+    topic = rng.choice(_TOPICS)
+    action = rng.choice(_ACTIONS).format(topic=topic)
+    return {
+        "id": f"loop_{number:07d}",
+        "title": action,
+        "description": f"{action} for the {rng.choice(_TEAMS)} team",
+        "status": rng.choice(["pending", "pending", "in-progress", "completed"]),
+        "priority": rng.choice(["high", "medium", "medium", "low"]),
+        "due_date": _iso(moment + timedelta(days=rng.randint(-5, 30), hours=17 - moment.hour)),
+        "created_date": _iso(moment),
+        "assigned_to": rng.choice([rng.choice(_TEAMS) + " Team", _person(rng)[0]]),
+        "tags": rng.sample(_TAGS, rng.randint(1, 3)),
+    }
+
+
+def generate(items: int, seed: int = 0) -> Iterator[Tuple[str, Dict]]:
+    """Yield (kind, record) pairs in timestamp order; kind is email, teams or loop"""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    moment = START
+    recent_emails: list = []
+    for number in range(items):
+        moment += timedelta(seconds=rng.randint(1, 180))
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "email":
+            yield kind, _email(rng, number, moment, recent_emails)
+        elif kind == "teams":
+            yield kind, _teams(rng, number, moment)
+        else:
+            yield kind, _loop(rng, number, moment)
+
+
+FILE_NAMES = {"email": "outlook_emails", "teams": "teams_messages", "loop": "loop_tasks"}
+
+
+def write_corpus(out_dir: Path, items: int, seed: int = 0, fmt: str = "ndjson") -> Dict[str, int]:
+    """Write the corpus as one file per source; returns item counts per kind"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {kind: 0 for kind in FILE_NAMES}
+    files = {kind: open(out_dir / f"{name}.{fmt}", "w", encoding="utf-8") for kind, name in FILE_NAMES.items()}
+    try:
+        if fmt == "json":
+            for f in files.values():
+                f.write("[\n")
+        for kind, record in generate(items, seed):
+            line = json.dumps(record, ensure_ascii=False)
+            if fmt == "json":
+                line = ("" if counts[kind] == 0 else ",\n") + line
+            else:
+                line += "\n"
+            files[kind].write(line)
+            counts[kind] += 1
+        if fmt == "json":
+            for f in files.values():
+                f.write("\n]\n")
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--format", choices=["ndjson", "json"], default="ndjson")
+    args = parser.parse_args()
+    print(json.dumps(write_corpus(args.out, args.items, args.seed, args.format), indent=2))
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""HTTP load test for the API with per-endpoint latency percentiles.
+
+Drives the FastAPI app in-process through httpx's ASGI transport (default),
+a local uvicorn it starts (--serve), or any running instance (--url). A
+weighted mix of reads (tasks, filter, chat, insights) and writes (extract,
+prioritize, status) runs on concurrent clients; throughput, error counts and
+p50/p95/p99 latency are reported per endpoint.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest [--requests 2000] [--concurrency 16] [--mix mix.json]
+    python -m benchmarks.loadtest --serve --record requests.ndjson
+    python -m benchmarks.loadtest --replay requests.ndjson [--speed 1.0]
+    python -m benchmarks.loadtest --slo slo.json    # exit 1 if any endpoint misses its target
+
+mix.json maps operation names (see OPERATIONS) to weights. slo.json maps
+endpoint names, e.g. "GET /api/tasks", to {"p95": ms, "p99": ms}.
+A recorded or captured log has one JSON request per line:
+{"t": seconds_since_start, "method": "GET", "path": "/api/tasks?limit=20", "json": null}
+Task ids are regenerated by every extraction, so replayed status writes for
+ids that no longer exist show up as rejected_4xx rather than errors.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+os.environ.setdefault("INFERENCE_MODE", "rules")
+
+CHAT_QUERIES = [
+    "What should I do next?",
+    "What are my critical tasks?",
+    "Show me tasks due today",
+    "What's overdue?",
+    "Summarize my email tasks",
+]
+STATUSES = ["pending", "in-progress", "completed"]
+
+# Operation name -> (default weight, request factory(rng, task_ids) -> (method, path, json body))
+OPERATIONS = {
+    "list": (30, lambda rng, ids: ("GET", "/api/tasks", None)),
+    "page": (10, lambda rng, ids: ("GET", f"/api/tasks?sort=urgency&offset={rng.randrange(0, 40)}&limit=20", None)),
+    "top": (5, lambda rng, ids: ("GET", "/api/tasks/top?k=5", None)),
+    "filter": (15, lambda rng, ids: ("GET", f"/api/tasks/filter?priority={rng.choice(['critical', 'high', 'medium'])}", None)),
+    "chat": (10, lambda rng, ids: ("POST", "/api/chat", {"message": rng.choice(CHAT_QUERIES)})),
+    "insights": (10, lambda rng, ids: ("GET", "/api/insights", None)),
+    "status": (5, lambda rng, ids: ("PUT", f"/api/tasks/{rng.choice(ids)}/status?status={rng.choice(STATUSES)}", None)),
+    "prioritize": (2, lambda rng, ids: ("POST", "/api/tasks/prioritize", None)),
+    "extract": (1, lambda rng, ids: ("POST", "/api/tasks/extract", None)),
+}
+
+# Path segments that identify one resource are folded so they group by route
+_TASK_ID = re.compile(r"^/api/tasks/(?!extract$|sync$|prioritize$|top$|filter$)[^/]+")
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Route-level name, e.g. 'PUT /api/tasks/{task_id}/status'"""
+    path = path.split("?", 1)[0]
+    return f"{method} {_TASK_ID.sub('/api/tasks/{task_id}', path)}"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    # Rounded first so float noise (0.07 * 100 == 7.000000000000001) doesn't bump the rank
+    rank = max(1, math.ceil(round(fraction * len(sorted_values), 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyStats:
+    """Latencies and outcomes per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def add(self, name: str, seconds: float, status: Optional[int]):
+        """Record one request; status None means it failed before a response"""
+        self.latencies.setdefault(name, []).append(seconds)
+        if status is None or status >= 500:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        elif status >= 400:
+            self.rejected[name] = self.rejected.get(name, 0) + 1
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "rejected_4xx": self.rejected.get(name, 0),
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+                "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "seconds": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+            "endpoints": endpoints,
+        }
+
+
+class Recorder:
+    """Appends every issued request to an NDJSON log that --replay can run again"""
+
+    def __init__(self, path: Path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.started = time.perf_counter()
+
+    def write(self, method: str, path: str, body):
+        entry = {"t": round(time.perf_counter() - self.started, 6), "method": method, "path": path, "json": body}
+        self.file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+async def send(client: httpx.AsyncClient, stats: LatencyStats, method: str, path: str, body=None,
+               recorder: Optional[Recorder] = None):
+    if recorder is not None:
+        recorder.write(method, path, body)
+    start = time.perf_counter()
+    try:
+        status = (await client.request(method, path, json=body)).status_code
+    except httpx.HTTPError:
+        status = None
+    stats.add(endpoint_name(method, path), time.perf_counter() - start, status)
+
+
+async def prepare(client: httpx.AsyncClient, recorder: Optional[Recorder] = None) -> List[str]:
+    """Extract once so reads have data; returns task ids for status writes"""
+    if recorder is not None:
+        recorder.write("POST", "/api/tasks/extract", None)
+    response = await client.post("/api/tasks/extract")
+    response.raise_for_status()
+    tasks = (await client.get("/api/tasks/top?k=100")).json()
+    return [task["id"] for task in tasks] or ["missing"]
+
+
+async def run_mix(client: httpx.AsyncClient, requests: int, concurrency: int, weights: Dict[str, float],
+                  seed: int = 0, recorder: Optional[Recorder] = None) -> dict:
+    """Issue requests from the weighted mix on concurrent clients"""
+    task_ids = await prepare(client, recorder)
+    rng = random.Random(seed)
+    names = [name for name in weights if weights[name] > 0]
+    plan = rng.choices(names, [weights[name] for name in names], k=requests)
+    queue = iter(plan)
+    stats = LatencyStats()
+
+    async def worker():
+        for name in queue:
+            method, path, body = OPERATIONS[name][1](rng, task_ids)
+            await send(client, stats, method, path, body, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.finished = time.perf_counter()
+    return stats.report()
+
+
+async def replay(client: httpx.AsyncClient, entries: List[dict], concurrency: int, speed: float) -> dict:
+    """Re-issue logged requests; speed 1.0 keeps the recorded pacing, 0 sends as fast as possible"""
+    stats = LatencyStats()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def issue(entry):
+        if speed > 0:
+            delay = entry.get("t", 0) / speed - (time.perf_counter() - stats.started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        async with limit:
+            await send(client, stats, entry["method"], entry["path"], entry.get("json"))
+
+    await asyncio.gather(*(issue(entry) for entry in entries))
+    stats.finished = time.perf_counter()
+    return stats.report()
+
+
+def check_slo(report: dict, slo: Dict[str, Dict[str, float]]) -> List[str]:
+    """Violations of per-endpoint targets like {"GET /api/tasks": {"p95": 50}}"""
+    violations = []
+    for name, targets in slo.items():
+        result = report["endpoints"].get(name)
+        if result is None:
+            continue
+        for key, limit in targets.items():
+            measured = result.get(f"{key}_ms")
+            if measured is not None and measured > limit:
+                violations.append(f"{name} {key} {measured}ms > {limit}ms")
+    return violations
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn() -> Tuple[subprocess.Popen, str]:
+    """Run the app under a local uvicorn and wait until it answers"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=Path(__file__).parent.parent,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        try:
+            httpx.get(url + "/", timeout=1.0)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def make_client(url: Optional[str]) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=120.0)
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=120.0)
+
+
+def print_report(report: dict):
+    print(f"{report['requests']} requests in {report['seconds']}s "
+          f"({report['throughput_rps']} req/s, {report['errors']} errors)", file=sys.stderr)
+    print(f"{'endpoint':40} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", file=sys.stderr)
+    for name, result in report["endpoints"].items():
+        print(f"{name:40} {result['requests']:>6} {result['errors']:>4} "
+              f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}", file=sys.stderr)
+
+
+async def main(args) -> int:
+    server = None
+    url = args.url
+    if args.serve:
+        server, url = start_uvicorn()
+    recorder = Recorder(args.record) if args.record else None
+    try:
+        async with make_client(url) as client:
+            if args.replay:
+                with open(args.replay, "r", encoding="utf-8") as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+                report = await replay(client, entries, args.concurrency, args.speed)
+            else:
+                weights = {name: weight for name, (weight, _) in OPERATIONS.items()}
+                if args.mix:
+                    weights.update(json.loads(args.mix.read_text(encoding="utf-8")))
+                report = await run_mix(client, args.requests, args.concurrency, weights, args.seed, recorder)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report["target"] = url or "asgi"
+    print_report(report)
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.slo:
+        violations = check_slo(report, json.loads(args.slo.read_text(encoding="utf-8")))
+        for violation in violations:
+            print(f"SLO violated: {violation}", file=sys.stderr)
+        return 1 if violations else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running instance (default: in-process ASGI)")
+    target.add_argument("--serve", action="store_true", help="start a local uvicorn for the run")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", type=Path, help="JSON file of operation weights")
+    parser.add_argument("--record", type=Path, help="write issued requests to this NDJSON log")
+    parser.add_argument("--replay", type=Path, help="replay an NDJSON request log instead of the mix")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay pacing multiplier (0 = no pacing)")
+    parser.add_argument("--slo", type=Path, help="JSON file of per-endpoint latency targets")
+    parser.add_argument("--out", type=Path, help="write the JSON report here instead of stdout")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""Tests for the retention policy and the cold task archive"""
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.archive import RetentionPolicy, TaskArchive
+from app.compact import CompactTaskTable
+from app.models import ExtractedTask, PriorityLevel, SourceType, TaskStatus
+from app.tenants import DEFAULT_TENANT
+
+NOW = datetime(2025, 11, 14, 12, 0)
+
+
+def _task(title, status=TaskStatus.PENDING, due_days=None, completed_days=None):
+    return ExtractedTask(
+        title=title,
+        description=title,
+        source_type=SourceType.LOOP,
+        source_id=f"loop_{title}",
+        priority=PriorityLevel.MEDIUM,
+        status=status,
+        due_date=NOW + timedelta(days=due_days) if due_days is not None else None,
+        extracted_date=NOW - timedelta(days=30),
+        completed_date=NOW - timedelta(days=completed_days) if completed_days is not None else None,
+    )
+
+
+def test_retention_policy_rows():
+    table = CompactTaskTable.from_tasks([
+        _task("open", due_days=1),
+        _task("done long ago", TaskStatus.COMPLETED, completed_days=10),
+        _task("done recently", TaskStatus.COMPLETED, completed_days=1),
+        _task("done at source", TaskStatus.COMPLETED),  # counts from extracted_date
+        _task("long overdue", due_days=-60),
+    ])
+    assert table.expired(completed_before=NOW - timedelta(days=7)) == [1, 3]
+    assert RetentionPolicy(7, 30).expired_rows(table, now=NOW) == [1, 3, 4]
+    assert RetentionPolicy(None, None).expired_rows(table, now=NOW) == []
+
+    table.set_status(0, TaskStatus.COMPLETED, at=NOW)
+    assert table.task(0).completed_date == NOW
+    table.set_status(0, TaskStatus.PENDING)
+    assert table.task(0).completed_date is None
+
+
+def test_archive_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.ndjson.gz"
+        archive = TaskArchive(path)
+        first = _task("a", TaskStatus.COMPLETED, due_days=-2, completed_days=10)
+        archive.append([first])
+        archive.append([_task("b", TaskStatus.COMPLETED, due_days=5, completed_days=9)])
+
+        reopened = TaskArchive(path)
+        assert len(reopened) == 2
+        assert _task("a") in reopened and _task("c") not in reopened
+        assert [t.model_dump() for t in reopened][0] == first.model_dump()
+        due_soon = list(reopened.select(due_from=NOW, status=TaskStatus.COMPLETED))
+        assert [t.title for t in due_soon] == ["b"]
+
+
+def test_archive_counts_and_lookups_stay_cold():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.ndjson.gz"
+        archive = TaskArchive(path)
+        archive.append(_task(f"t{i}", TaskStatus.COMPLETED, completed_days=10) for i in range(500))
+        archive.append([_task("last", TaskStatus.COMPLETED, completed_days=10)])
+
+        reopened = TaskArchive(path)
+
+        def no_decompression():
+            raise AssertionError("archive decompressed")
+
+        reopened._lines = no_decompression
+        assert len(reopened) == 501
+        assert _task("t42") in reopened and _task("last") in reopened and _task("nope") not in reopened
+        # 8 bytes per archived task in memory, nothing else
+        assert reopened._hashes.itemsize * len(reopened._hashes) == 8 * 501
+
+        # An archive written without the sidecar files (or cut short mid-append) is reindexed once
+        path.with_name(path.name + ".keys").unlink()
+        rebuilt = TaskArchive(path)
+        assert len(rebuilt) == 501 and _task("t7") in rebuilt
+        assert path.with_name(path.name + ".keys").stat().st_size == 8 * 501
+
+        empty = TaskArchive(Path(tmp) / "none" / "tasks.ndjson.gz")
+        assert len(empty) == 0 and _task("a") not in empty
+        assert not (Path(tmp) / "none").exists()
+
+
+def test_archive_endpoint_and_include_archived():
+    client = TestClient(main.app)
+    tenant = main.tenants.get(DEFAULT_TENANT)
+    saved = tenant.archive, tenant.retention
+    with tempfile.TemporaryDirectory() as tmp:
+        tenant.archive = TaskArchive(Path(tmp) / "tasks.ndjson.gz")
+        tenant.retention = RetentionPolicy(completed_days=0)
+        try:
+            client.post("/api/tasks/extract")
+            tasks = client.get("/api/tasks").json()
+            assert all(t["status"] != "completed" for t in tasks)
+
+            task_id = tasks[0]["id"]
+            completed = client.put(f"/api/tasks/{task_id}/status?status=completed").json()["task"]
+            assert completed["completed_date"] is not None
+
+            result = client.post("/api/tasks/archive").json()
+            assert result["archived"] == 1
+            assert task_id not in {t["id"] for t in client.get("/api/tasks").json()}
+            assert task_id in {t["id"] for t in client.get("/api/tasks?include_archived=true").json()}
+            archived = client.get("/api/tasks/filter?status=completed&include_archived=true").json()
+            assert task_id in {t["id"] for t in archived}
+
+            # Re-extracting doesn't bring archived tasks back
+            total = client.post("/api/tasks/extract").json()["total_tasks"]
+            assert total == len(tasks) - 1
+        finally:
+            tenant.archive, tenant.retention = saved
+            client.post("/api/tasks/extract")
+
+
+if __name__ == "__main__":
+    test_retention_policy_rows()
+    test_archive_round_trip()
+    test_archive_counts_and_lookups_stay_cold()
+    test_archive_endpoint_and_include_archived()
+    print("[SUCCESS] Archive tests passed")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Tests for the synthetic corpus and pipeline benchmark"""
+
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("INFERENCE_MODE", "rules")
+
+from app.models import LoopTask, OutlookEmail, TeamsMessage
+from benchmarks.bench_classifier import load_sample, run as run_classifier, summary
+from benchmarks.bench_pipeline import StubClassifier, run
+from benchmarks.corpus import generate
+from benchmarks.loadtest import Recorder, endpoint_name, make_client, percentile, replay, run_mix
+
+MODELS = {"email": OutlookEmail, "teams": TeamsMessage, "loop": LoopTask}
+
+
+def test_corpus_is_seeded_and_valid():
+    first = list(generate(300, seed=3))
+    assert first == list(generate(300, seed=3))
+    assert first != list(generate(300, seed=4))
+
+    kinds = {kind for kind, _ in first}
+    assert kinds == {"email", "teams", "loop"}
+    for kind, record in first:
+        MODELS[kind](**record)  # shaped like data/*.json
+    assert any(record.get("in_reply_to") for kind, record in first if kind == "email")
+
+
+def test_benchmark_reports_every_stage():
+    results = run([200], seed=0, repeat=1, max_list_tasks=10_000)
+    stages = results["scales"]["200"]["stages"]
+    for stage in ("extract_rule_based", "extract_items", "classify_keyword", "classify_stub_model",
+                  "prioritize_tasks", "prioritize_table", "generate_task_insights", "chat_interface"):
+        assert stages[stage]["seconds"] >= 0, stage
+    assert results["scales"]["200"]["tasks"] > 0
+
+
+def test_load_test_mix_and_replay(tmp_path=None):
+    log = Path(tmp_path or tempfile.mkdtemp()) / "requests.ndjson"
+    assert endpoint_name("PUT", "/api/tasks/task_1.5_3/status?status=completed") == "PUT /api/tasks/{task_id}/status"
+    assert endpoint_name("GET", "/api/tasks/top?k=5") == "GET /api/tasks/top"
+    assert percentile([1, 2, 3, 4], 0.5) == 2 and percentile([1, 2, 3, 4], 0.99) == 4
+    hundred = list(range(1, 101))
+    assert [percentile(hundred, f) for f in (0.07, 0.50, 0.95, 0.99, 1.0)] == [7, 50, 95, 99, 100]
+    assert percentile([5], 0.0) == 5
+
+    async def scenario():
+        recorder = Recorder(log)
+        async with make_client(None) as client:
+            report = await run_mix(client, 60, 4, {"list": 3, "chat": 1, "status": 1, "prioritize": 1}, recorder=recorder)
+            recorder.close()
+            entries = [json.loads(line) for line in log.read_text().splitlines()]
+            replayed = await replay(client, entries, 4, speed=0)
+        return report, replayed, entries
+
+    report, replayed, entries = asyncio.run(scenario())
+    assert report["requests"] == 60 and report["errors"] == 0
+    assert {"GET /api/tasks", "POST /api/chat", "PUT /api/tasks/{task_id}/status"} <= set(report["endpoints"])
+    assert len(entries) == 61  # the mix plus the initial extract
+    assert replayed["requests"] == 61 and replayed["errors"] == 0
+
+
+def test_classifier_report():
+    sample = load_sample()
+    assert len(sample) >= 40 and {label for _, label in sample} == {"critical", "high", "medium", "low"}
+
+    def keyword(text, labels, multi_class=False):
+        top = "critical" if "urgent" in text.lower() or "immediately" in text.lower() else "medium"
+        return {"labels": [top] + [label for label in labels if label != top]}
+
+    results = run_classifier({"fp32": lambda: keyword, "int8": StubClassifier}, sample, threads=[1], repeat=1)
+    fp32, int8 = (results["backends"][name]["threads"]["1"] for name in ("fp32", "int8"))
+    assert fp32["agreement"] == 1.0 and 0 < fp32["accuracy"] < 1
+    assert int8["agreement"] < 1.0
+    assert fp32["latency_ms"]["p95"] >= fp32["latency_ms"]["p50"] >= 0
+    assert "int8" in summary(results)
+
+
+if __name__ == "__main__":
+    test_corpus_is_seeded_and_valid()
+    test_benchmark_reports_every_stage()
+    test_load_test_mix_and_replay()
+    test_classifier_report()
+    print("[SUCCESS] Benchmark tests passed")
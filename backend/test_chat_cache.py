@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Tests for chat intent parsing and the chat answer cache"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.ai_engine import AIEngine
+from app.chat_cache import KIND_COUNT, KIND_NEXT, WINDOW_OVERDUE, ChatCache, parse_intent
+from app.metrics import CHAT_CACHE
+from app.models import ExtractedTask, PriorityLevel, SourceType
+
+NOW = datetime(2025, 11, 14, 12, 0)
+
+
+def test_parse_intent():
+    assert parse_intent("What should I do next?") == parse_intent("  what SHOULD i do   next?")
+    intent = parse_intent("How many critical email tasks are overdue?")
+    assert (intent.window, intent.source, intent.priority, intent.kind) == (
+        WINDOW_OVERDUE, SourceType.EMAIL, PriorityLevel.CRITICAL, KIND_COUNT)
+    assert parse_intent("recommend something").kind == KIND_NEXT
+
+
+def test_lru_and_expiry():
+    cache = ChatCache(maxsize=2)
+    cache.put("a", "A")
+    cache.put("b", "B", expires_at=NOW)
+    assert cache.get("a") == "A"
+    cache.put("c", "C")  # evicts b, the least recently used
+    assert cache.get("b") is None and len(cache) == 2
+    cache.put("d", "D", expires_at=NOW)
+    assert cache.get("d", now=NOW - timedelta(seconds=1)) == "D"
+    assert cache.get("d", now=NOW) is None
+
+
+def test_cache_edges():
+    disabled = ChatCache(maxsize=0)
+    disabled.put("a", "A")
+    assert disabled.get("a") is None and len(disabled) == 0
+
+    cache = ChatCache(maxsize=2)
+    cache.put("a", "old", expires_at=NOW)
+    cache.put("a", "new")  # replacing an entry drops its old expiry
+    assert cache.get("a", now=NOW + timedelta(days=1)) == "new" and len(cache) == 1
+    cache.put("b", "B")
+    cache.get("a")  # a read makes a the most recently used, so b goes first
+    cache.put("c", "C")
+    assert cache.get("b") is None and cache.get("a") == "new"
+
+
+def test_time_relative_answers_expire():
+    engine = AIEngine()
+    tasks = [
+        ExtractedTask(title=title, description=title, source_type=SourceType.LOOP, source_id=title,
+                      priority=PriorityLevel.HIGH, due_date=NOW + timedelta(hours=hours))
+        for title, hours in [("late", -5), ("soon", 3), ("later", 30)]
+    ]
+    _, expires = engine.chat_answer(parse_intent("what's overdue?"), tasks, now=NOW)
+    assert expires == NOW + timedelta(hours=3)
+    _, expires = engine.chat_answer(parse_intent("show tasks due today"), tasks, now=NOW)
+    assert expires == datetime(2025, 11, 15)
+    _, expires = engine.chat_answer(parse_intent("what should I do next?"), tasks, now=NOW)
+    assert expires is None
+
+
+def test_endpoint_caches_per_version():
+    client = TestClient(main.app)
+    client.post("/api/tasks/extract")
+    hits = CHAT_CACHE.value("hit")
+    first = client.post("/api/chat", json={"message": "Summary"}).json()["response"]
+    assert client.post("/api/chat", json={"message": "summary"}).json()["response"] == first
+    assert CHAT_CACHE.value("hit") == hits + 1
+
+    # A status change publishes a new version, so the summary is rendered again
+    task_id = client.get("/api/tasks").json()[0]["id"]
+    client.put(f"/api/tasks/{task_id}/status?status=completed")
+    second = client.post("/api/chat", json={"message": "summary"}).json()["response"]
+    assert CHAT_CACHE.value("hit") == hits + 1
+    assert second != first
+
+    # "me" is resolved before the lookup, so changing the owner never serves their predecessor's answer
+    tenant = main.tenants.get(main.DEFAULT_TENANT)
+    saved = tenant.owner
+    try:
+        tenant.owner = "sarah"
+        sarah = client.post("/api/chat", json={"message": "show my @mentions"}).json()["response"]
+        tenant.owner = "devops"
+        devops = client.post("/api/chat", json={"message": "show my @mentions"}).json()["response"]
+        tenant.owner = None
+        assert client.post("/api/chat", json={"message": "show my @mentions"}).json()["response"] == main.NO_OWNER_REPLY
+    finally:
+        tenant.owner = saved
+    assert sarah != devops
+
+
+if __name__ == "__main__":
+    test_parse_intent()
+    test_lru_and_expiry()
+    test_cache_edges()
+    test_time_relative_answers_expire()
+    test_endpoint_caches_per_version()
+    print("[SUCCESS] Chat cache tests passed")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Tests for the streaming chat endpoint"""
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.chat_stream import (
+    STOPPED_BUDGET, STOPPED_CANCELLED, STOPPED_COMPLETE, STOPPED_ERROR, STOPPED_UNAVAILABLE, GenerationStream,
+)
+from app.tenants import DEFAULT_TENANT
+
+
+class SlowGenerator:
+    """Stands in for a (sidecar) text-generation pipeline"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, prompt, **kwargs):
+        time.sleep(self.delay)
+        return [{"generated_text": " Start with the budget review."}]
+
+
+def _events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_answer_then_tokens():
+    client = TestClient(main.app)
+    client.post("/api/tasks/extract")
+    saved = main.ai_engine.generator
+    main.ai_engine.generator = SlowGenerator(0.01)
+    try:
+        response = client.post("/api/chat/stream", json={"message": "What should I do next?"})
+    finally:
+        main.ai_engine.generator = saved
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    snapshot = main.tenants.get(DEFAULT_TENANT).task_store.current()
+    assert [name for name, _ in events] == ["answer", "token", "done"]
+    assert events[0][1]["text"] == main.ai_engine.chat_interface(
+        "What should I do next?", snapshot.tasks, snapshot.index)
+    assert events[1][1]["text"] == " Start with the budget review."
+    assert events[2][1]["stopped"] == STOPPED_COMPLETE
+
+
+def test_budget_and_cancel():
+    stream = GenerationStream(SlowGenerator(1.0), "prompt", budget=0.05, cancel=threading.Event())
+    started = time.perf_counter()
+    assert list(stream) == []
+    assert stream.stopped == STOPPED_BUDGET
+    assert time.perf_counter() - started < 0.5
+
+    cancel = threading.Event()
+    stream = GenerationStream(SlowGenerator(1.0), "prompt", budget=10, cancel=cancel)
+    threading.Timer(0.05, cancel.set).start()
+    assert list(stream) == []
+    assert stream.stopped == STOPPED_CANCELLED
+    assert time.perf_counter() - started < 1.0
+
+
+def _failing_generator(prompt, **kwargs):
+    raise RuntimeError("model crashed")
+
+
+def test_generation_edges():
+    cancel = threading.Event()
+    stream = GenerationStream(None, "prompt", budget=1, cancel=cancel)
+    assert list(stream) == [] and stream.stopped == STOPPED_UNAVAILABLE
+    stream = GenerationStream(_failing_generator, "prompt", budget=1, cancel=cancel)
+    assert list(stream) == [] and stream.stopped == STOPPED_ERROR
+    # A blank completion is not sent as a token, but generation still completed
+    stream = GenerationStream(lambda prompt, **kwargs: [{"generated_text": "  "}], "prompt", budget=1, cancel=cancel)
+    assert list(stream) == [] and stream.stopped == STOPPED_COMPLETE and stream.pieces == 0
+
+    client = TestClient(main.app)
+    client.post("/api/tasks/extract")
+    assert client.post("/api/chat/stream", params={"budget": 0}, json={"message": "hi"}).status_code == 422
+    saved = main.ai_engine.generator
+    main.ai_engine.generator = _failing_generator
+    try:
+        events = _events(client.post("/api/chat/stream", json={"message": "What should I do next?"}).text)
+    finally:
+        main.ai_engine.generator = saved
+    # The answer still arrives when generation fails
+    assert [name for name, _ in events] == ["answer", "done"]
+    assert events[1][1]["stopped"] == STOPPED_ERROR and events[1][1]["pieces"] == 0
+
+
+if __name__ == "__main__":
+    test_answer_then_tokens()
+    test_budget_and_cancel()
+    test_generation_edges()
+    print("[SUCCESS] Chat streaming tests passed")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""Tests for the column-packed task table"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.compact import CompactTaskTable
+from app.models import ExtractedTask, PriorityLevel, SourceType, TaskStatus
+from app.ranking import score_task
+
+NOW = datetime(2025, 11, 14, 12, 0, tzinfo=timezone.utc)
+
+
+def _tasks():
+    return [
+        score_task(ExtractedTask(
+            title="Send the Q4 budget",
+            description="Send the Q4 budget to finance by Friday",
+            source_type=SourceType.EMAIL,
+            source_id="email_1",
+            priority=PriorityLevel.HIGH,
+            due_date=NOW + timedelta(days=1),
+            metadata={"sender": "Sarah", "thread_position": 0},
+        )),
+        score_task(ExtractedTask(
+            title="Update roadmap",
+            description="Roadmap doc for the planning review",
+            source_type=SourceType.LOOP,
+            source_id="loop_1",
+            priority=PriorityLevel.CRITICAL,
+            due_date=datetime(2025, 11, 15, 17, 0),  # naive, as in the Loop data
+            assigned_to="Alex",
+        )),
+        ExtractedTask(
+            title="Reply to Mike",
+            description="Reply to Mike",
+            source_type=SourceType.TEAMS,
+            source_id="teams_1",
+            priority=PriorityLevel.LOW,
+            status=TaskStatus.COMPLETED,
+        ),
+    ]
+
+
+def test_round_trip_and_select():
+    tasks = _tasks()
+    table = CompactTaskTable.from_tasks(tasks)
+
+    assert [t.model_dump() for t in table] == [t.model_dump() for t in tasks]
+    assert table.task(1).due_date.tzinfo is None
+    assert table.task(0).due_date.tzinfo is not None
+
+    assert table.select(source_type=SourceType.LOOP) == [1]
+    assert table.select(status=TaskStatus.PENDING, priority=PriorityLevel.HIGH) == [0]
+    assert table.select(due_from=datetime(2025, 11, 15), due_to=datetime(2025, 11, 15, 23, 59)) == [0, 1]
+
+
+def test_reorder_update_and_delete():
+    table = CompactTaskTable.from_tasks(_tasks())
+
+    ordered = table.sorted_by_urgency()
+    assert [t.title for t in ordered] == ["Update roadmap", "Send the Q4 budget", "Reply to Mike"]
+
+    task = ordered.task(2)
+    task.priority = PriorityLevel.CRITICAL
+    ordered.update(2, score_task(task))
+    assert ordered.task(2).priority == PriorityLevel.CRITICAL
+
+    task_id = ordered.task_id(0)
+    ordered.delete(ordered.row_of(task_id))
+    assert ordered.get(task_id) is None
+    assert len(ordered) == 2
+    assert ordered.row_of(ordered.task_id(1)) == 1
+
+
+def test_smaller_than_models():
+    tasks = []
+    for i in range(2000):
+        tasks.extend(_tasks())
+    table = CompactTaskTable.from_tasks(tasks)
+    # Far below the ~2 KB a pydantic task with its strings and dicts takes
+    assert table.nbytes() / len(table) < 400
+
+
+def _thread_task(i):
+    return ExtractedTask(
+        title=f"Follow up {i}", description="", source_type=SourceType.EMAIL, source_id=f"email_{i}",
+        priority=PriorityLevel.MEDIUM,
+        metadata={"sender": "Sarah Johnson", "channel": "General", "tags": ["budget", "q4"],
+                  "thread_id": f"thread-{i}", "thread_position": i},
+    )
+
+
+def test_metadata_fields_interned_one_by_one():
+    table = CompactTaskTable.from_tasks(_thread_task(i) for i in range(1000))
+    # Per-task fields make every metadata dict unique; the repeated ones are still stored once
+    assert len(table.strings) == 1000 + 3
+    assert table.task(7).metadata == {"channel": "General", "sender": "Sarah Johnson", "tags": ["budget", "q4"],
+                                      "thread_id": "thread-7", "thread_position": 7}
+    table.task(7).metadata["tags"].append("changed")
+    assert table.task(7).metadata["tags"] == ["budget", "q4"]
+
+
+def test_compaction_reclaims_memory():
+    table = CompactTaskTable.from_tasks(_thread_task(i) for i in range(1000))
+    before = table.nbytes()
+    strings_before = len(table.strings)
+    expected = [task.model_dump() for task in table][::2]
+
+    # Rewriting per-task metadata moves the row's text; deleting drops it
+    for row in range(0, len(table), 2):
+        task = table.task(row)
+        task.metadata["thread_position"] = -row
+        table.update(row, task)
+        task.metadata["thread_position"] = row
+        table.update(row, task)
+    for row in range(len(table) - 1, 0, -2):
+        table.delete(row)
+    assert [task.model_dump() for task in table] == expected
+    grown = table.nbytes()
+    assert grown > before and table.garbage_bytes() > grown - before
+    # Under the default threshold small tables are left alone
+    assert table.maybe_compact() is table
+
+    compacted = table.maybe_compact(min_bytes=0)
+    assert compacted is not table
+    assert [task.model_dump() for task in compacted] == expected
+    assert compacted.garbage_bytes() == 0
+    assert compacted.nbytes() < grown / 2
+    assert len(compacted.strings) == 500 + 3 < strings_before
+    assert compacted.row_of(expected[-1]["id"]) == len(compacted) - 1
+
+
+def test_facets_in_one_pass():
+    table = CompactTaskTable.from_tasks(_tasks())
+    now = datetime(2025, 11, 14, 13, 0)
+
+    facets = table.facets(status=TaskStatus.PENDING, now=now)
+    assert facets.rows == table.select(status=TaskStatus.PENDING) == [0, 1]
+    assert facets.counts["source_type"] == {"email": 1, "teams": 0, "loop": 1}
+    # A dimension's own filter doesn't narrow its counts
+    assert facets.counts["status"] == {"pending": 2, "in-progress": 0, "completed": 1}
+    assert facets.counts["due"] == {"overdue": 0, "today": 0, "this_week": 2, "later": 0, "none": 0}
+
+    dated = table.facets(due_from=datetime(2025, 11, 15), due_to=datetime(2025, 11, 15, 23, 59), now=now)
+    assert dated.rows == [0, 1]
+    assert dated.counts["status"]["completed"] == 0
+    assert dated.counts["due"]["none"] == 1
+
+    later = table.facets(now=datetime(2025, 11, 15, 18, 0))
+    assert later.counts["due"]["overdue"] == 2
+    assert table.most_urgent_rows(range(3), 2) == [1, 0]
+
+
+if __name__ == "__main__":
+    test_round_trip_and_select()
+    test_reorder_update_and_delete()
+    test_smaller_than_models()
+    test_metadata_fields_interned_one_by_one()
+    test_compaction_reclaims_memory()
+    test_facets_in_one_pass()
+    print("[SUCCESS] Compact table tests passed")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""Tests for source connectors and watermark checkpointing"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from app.connectors import (
+    EmlDirectoryConnector,
+    JsonFileConnector,
+    MboxConnector,
+    NdjsonConnector,
+    WatermarkStore,
+    build_connectors,
+)
+from app.models import OutlookEmail, TeamsMessage
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def _email(n: int, day: int) -> dict:
+    return {
+        "id": f"email_{n}",
+        "subject": f"Subject {n}",
+        "sender": "sarah.johnson@company.com",
+        "sender_name": "Sarah Johnson",
+        "body": "- Review the deck",
+        "received_date": f"2025-11-{day:02d}T09:30:00Z",
+        "has_attachments": False,
+    }
+
+
+def _eml(message_id: str, date: str) -> str:
+    return (
+        f"From: Mike Chen <mike.chen@company.com>\n"
+        f"Subject: Homepage mockups\n"
+        f"Message-ID: <{message_id}>\n"
+        f"Date: {date}\n"
+        f"\n"
+        f"Please approve the mockups by Wednesday.\n"
+    )
+
+
+def test_default_connectors_read_bundled_data():
+    connectors = build_connectors(DATA_DIR)
+    assert [c.name for c in connectors] == ["outlook", "loop", "teams"]
+
+    items = list(connectors[0].read())
+    assert items and all(isinstance(i, OutlookEmail) for i in items)
+    assert connectors[0].checkpoint["watermark"]
+
+
+def test_json_watermark_skips_seen_items():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "emails.json"
+        path.write_text(json.dumps([_email(1, 10), _email(2, 11)]))
+        connector = JsonFileConnector("mail", "email", path)
+
+        assert len(list(connector.read())) == 2
+        checkpoint = connector.checkpoint
+
+        path.write_text(json.dumps([_email(1, 10), _email(2, 11), _email(3, 12)]))
+        assert [i.id for i in connector.read(checkpoint)] == ["email_3"]
+
+
+def test_items_at_the_watermark_are_read_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "emails.json"
+        path.write_text(json.dumps([_email(1, 10), _email(2, 11)]))
+        connector = JsonFileConnector("mail", "email", path)
+        list(connector.read())
+        checkpoint = connector.checkpoint
+        assert checkpoint["watermark_ids"] == ["email_2"]
+
+        # Arrived later with the same timestamp as the watermark
+        path.write_text(json.dumps([_email(1, 10), _email(2, 11), _email(3, 11)]))
+        assert [i.id for i in connector.read(checkpoint)] == ["email_3"]
+        checkpoint = connector.checkpoint
+        assert checkpoint["watermark_ids"] == ["email_2", "email_3"]
+        assert list(connector.read(checkpoint)) == []
+
+        path.write_text(json.dumps([_email(2, 11), _email(3, 11), _email(4, 12)]))
+        assert [i.id for i in connector.read(checkpoint)] == ["email_4"]
+        assert connector.checkpoint["watermark_ids"] == ["email_4"]
+
+
+def test_ndjson_resumes_from_offset():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "emails.ndjson"
+        path.write_text(json.dumps(_email(1, 10)) + "\n")
+        connector = NdjsonConnector("mail", "email", path)
+
+        assert len(list(connector.read())) == 1
+        checkpoint = connector.checkpoint
+        assert checkpoint["offset"] == path.stat().st_size
+
+        with open(path, "a") as f:
+            f.write(json.dumps(_email(2, 11)) + "\n")
+            f.write(json.dumps(_email(3, 12)))  # not yet newline-terminated
+        assert [i.id for i in connector.read(checkpoint)] == ["email_2"]
+
+
+def test_bad_input_is_skipped_not_fatal():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "emails.ndjson"
+        invalid = dict(_email(2, 11), received_date=None)
+        path.write_text("{not json\n\n" + json.dumps(invalid) + "\n" + json.dumps(_email(3, 12)) + "\n")
+        connector = NdjsonConnector("mail", "email", path)
+        assert [i.id for i in connector.read()] == ["email_3"]
+        # Skipped lines are not read again
+        checkpoint = connector.checkpoint
+        assert checkpoint["offset"] == path.stat().st_size
+        assert list(connector.read(checkpoint)) == []
+
+        # A truncated or rotated file is read from the start; the watermark still filters old items
+        path.write_text(json.dumps(_email(4, 13)) + "\n")
+        assert [i.id for i in connector.read(checkpoint)] == ["email_4"]
+
+        assert list(JsonFileConnector("missing", "email", Path(tmp) / "missing.json").read()) == []
+        try:
+            JsonFileConnector("odd", "fax", path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("unknown kind accepted")
+
+
+def test_eml_directory_and_mbox():
+    with tempfile.TemporaryDirectory() as tmp:
+        eml_dir = Path(tmp) / "inbox"
+        eml_dir.mkdir()
+        (eml_dir / "a.eml").write_text(_eml("a@company.com", "Mon, 10 Nov 2025 09:30:00 +0000"))
+        connector = EmlDirectoryConnector("inbox", "email", eml_dir)
+
+        items = list(connector.read())
+        assert [i.id for i in items] == ["a@company.com"]
+        assert items[0].sender_name == "Mike Chen"
+        assert items[0].received_date.startswith("2025-11-10T09:30:00")
+        checkpoint = connector.checkpoint
+
+        new_file = eml_dir / "b.eml"
+        new_file.write_text(_eml("b@company.com", "Tue, 11 Nov 2025 09:30:00 +0000"))
+        os.utime(new_file, (checkpoint["mtime"] + 10, checkpoint["mtime"] + 10))
+        assert [i.id for i in connector.read(checkpoint)] == ["b@company.com"]
+
+        mbox_path = Path(tmp) / "archive.mbox"
+        mbox_path.write_text(
+            "From mike@company.com Mon Nov 10 09:30:00 2025\n" + _eml("m1@company.com", "Mon, 10 Nov 2025 09:30:00 +0000") + "\n"
+            "From mike@company.com Tue Nov 11 09:30:00 2025\n" + _eml("m2@company.com", "Tue, 11 Nov 2025 09:30:00 +0000") + "\n"
+        )
+        connector = MboxConnector("archive", "email", mbox_path)
+        assert [i.id for i in connector.read()] == ["m1@company.com", "m2@company.com"]
+        checkpoint = connector.checkpoint
+
+        with open(mbox_path, "a") as f:
+            f.write("From mike@company.com Wed Nov 12 09:30:00 2025\n" + _eml("m3@company.com", "Wed, 12 Nov 2025 09:30:00 +0000"))
+        assert [i.id for i in connector.read(checkpoint)] == ["m3@company.com"]
+
+
+def test_eml_files_sharing_the_checkpoint_mtime():
+    with tempfile.TemporaryDirectory() as tmp:
+        eml_dir = Path(tmp) / "inbox"
+        eml_dir.mkdir()
+        first = eml_dir / "a.eml"
+        first.write_text(_eml("a@company.com", "Mon, 10 Nov 2025 09:30:00 +0000"))
+        mtime = first.stat().st_mtime
+        connector = EmlDirectoryConnector("inbox", "email", eml_dir)
+        assert [i.id for i in connector.read()] == ["a@company.com"]
+        checkpoint = connector.checkpoint
+        assert checkpoint["mtime"] == mtime and checkpoint["mtime_names"] == ["a.eml"]
+
+        # Written in the same clock tick, after the first sync
+        second = eml_dir / "b.eml"
+        second.write_text(_eml("b@company.com", "Tue, 11 Nov 2025 09:30:00 +0000"))
+        os.utime(second, (mtime, mtime))
+        assert [i.id for i in connector.read(checkpoint)] == ["b@company.com"]
+        checkpoint = connector.checkpoint
+        assert checkpoint["mtime_names"] == ["a.eml", "b.eml"]
+        assert list(connector.read(checkpoint)) == []
+
+
+def test_config_file_and_watermark_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "chat.ndjson").write_text(json.dumps({
+            "id": "teams_1",
+            "channel": "Engineering",
+            "sender_name": "Alex Thompson",
+            "sender_email": "alex.thompson@company.com",
+            "message": "Please review PR #234",
+            "timestamp": "2025-11-14T10:30:00Z",
+            "mentions": [],
+            "reactions": [],
+        }) + "\n")
+        (tmp / "connectors.json").write_text(json.dumps([
+            {"name": "chat", "type": "ndjson", "kind": "teams", "path": "chat.ndjson"},
+        ]))
+
+        connector, = build_connectors(tmp)
+        assert isinstance(next(connector.read()), TeamsMessage)
+
+        store = WatermarkStore(tmp / ".watermarks.json")
+        store.set("chat", {"watermark": "2025-11-14T10:30:00+00:00"})
+        store.save()
+        assert WatermarkStore(tmp / ".watermarks.json").get("chat")["watermark"] == "2025-11-14T10:30:00+00:00"
+
+
+if __name__ == "__main__":
+    test_default_connectors_read_bundled_data()
+    test_json_watermark_skips_seen_items()
+    test_items_at_the_watermark_are_read_once()
+    test_ndjson_resumes_from_offset()
+    test_bad_input_is_skipped_not_fatal()
+    test_eml_directory_and_mbox()
+    test_eml_files_sharing_the_checkpoint_mtime()
+    test_config_file_and_watermark_store()
+    print("[SUCCESS] Connector tests passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Tests for email/Teams thread grouping"""
+
+from datetime import timedelta
+
+from app.ai_engine import AIEngine
+from app.conversations import ConversationTracker, normalize_subject
+from app.models import OutlookEmail, TeamsMessage
+
+
+def _email(id: str, subject: str, body: str, day: int, in_reply_to=None) -> OutlookEmail:
+    return OutlookEmail(
+        id=id,
+        subject=subject,
+        sender="mike.chen@company.com",
+        sender_name="Mike Chen",
+        body=body,
+        received_date=f"2025-11-{day:02d}T09:00:00Z",
+        has_attachments=False,
+        in_reply_to=in_reply_to,
+    )
+
+
+def _teams(id: str, channel: str, message: str, time: str, sender: str = "Alex Thompson", reply_to=None) -> TeamsMessage:
+    return TeamsMessage(
+        id=id,
+        channel=channel,
+        sender_name=sender,
+        sender_email=sender.lower().replace(" ", ".") + "@company.com",
+        message=message,
+        timestamp=f"2025-11-14T{time}:00Z",
+        mentions=[],
+        reactions=[],
+        reply_to=reply_to,
+    )
+
+
+def test_normalize_subject():
+    assert normalize_subject("RE: Fw:  Budget   Report") == "budget report"
+    assert normalize_subject("AW[2]: Budget report") == "budget report"
+
+
+def test_reply_chain_is_extracted_once():
+    engine = AIEngine()
+    tracker = ConversationTracker()
+
+    first = _email("m1", "Launch plan", "- Book the venue by Friday\n- Send invites", 10)
+    reply = _email("m2", "RE: Launch plan", "- Book the venue by Friday\n- Order catering", 11, in_reply_to="m1")
+    ack = _email("m3", "RE: Launch plan", "Sounds good", 12)
+
+    first_tasks = engine.extract_tasks_from_email(first, tracker)
+    reply_tasks = engine.extract_tasks_from_email(reply, tracker)
+    ack_tasks = engine.extract_tasks_from_email(ack, tracker)
+
+    assert [t.title for t in reply_tasks] == ["Order catering"]
+    assert ack_tasks == []
+    assert len(tracker) == 1
+    thread_ids = {t.metadata["thread_id"] for t in first_tasks + reply_tasks}
+    assert thread_ids == {"thread_m1"}
+    assert reply_tasks[0].metadata["thread_position"] == 2
+
+
+def test_teams_threads_by_channel_and_window():
+    tracker = ConversationTracker()
+    a = tracker.assign_teams(_teams("t1", "Engineering", "PR #234 needs review", "10:00"))
+    b = tracker.assign_teams(_teams("t2", "Engineering", "I'll take it", "10:20"))
+    c = tracker.assign_teams(_teams("t3", "Design", "Logo feedback?", "10:21"))
+    d = tracker.assign_teams(_teams("t4", "Engineering", "Release notes", "13:00"))
+
+    assert a is b
+    assert c is not a and d is not a
+    assert a.message_ids == ["t1", "t2"]
+
+
+def test_same_subject_without_reply_stays_separate():
+    engine = AIEngine()
+    tracker = ConversationTracker()
+    monday = _email("w1", "Submit timesheet", "- Submit your timesheet by Friday", 10)
+    next_week = _email("w2", "Submit timesheet", "- Submit your timesheet by Friday", 17)
+    assert [t.title for t in engine.extract_tasks_from_email(monday, tracker)] == ["Submit your timesheet by Friday"]
+    assert [t.title for t in engine.extract_tasks_from_email(next_week, tracker)] == ["Submit your timesheet by Friday"]
+    assert len(tracker) == 2
+
+    # A reply without headers joins by subject, but not once the thread is long quiet
+    assert tracker.assign_email(_email("w3", "RE: Submit timesheet", "ok", 18)).thread_id == "thread_w2"
+    late = _email("w4", "RE: Submit timesheet", "ok", 28)
+    late.received_date = "2025-12-28T09:00:00Z"
+    assert tracker.assign_email(late).thread_id == "thread_w4"
+
+
+def test_seen_lines_and_idle_threads_age_out():
+    engine = AIEngine()
+    tracker = ConversationTracker(line_ttl=timedelta(days=3), idle_ttl=timedelta(days=10))
+    first = _email("r1", "Status", "- Send the weekly numbers", 1)
+    again = _email("r2", "RE: Status", "- Send the weekly numbers", 5, in_reply_to="r1")
+    engine.extract_tasks_from_email(first, tracker)
+    # Over line_ttl later, the same request in the same thread is a task again
+    assert [t.title for t in engine.extract_tasks_from_email(again, tracker)] == ["Send the weekly numbers"]
+
+    tracker.assign_email(_email("x1", "Other", "hi", 20))
+    assert tracker.expire() == 1  # the Status thread, idle since the 5th
+    assert len(tracker) == 1 and tracker.assign_email(_email("r3", "Hi", "", 21, in_reply_to="r2")).thread_id == "thread_r3"
+
+    restored = ConversationTracker()
+    restored.load_dict(tracker.to_dict())
+    assert len(restored) == len(tracker)
+
+
+def test_teams_threads_by_sender_and_reply():
+    engine = AIEngine()
+    tracker = ConversationTracker()
+    a = tracker.assign_teams(_teams("t1", "Engineering", "Please review PR #1", "10:00", sender="Alex Thompson"))
+    b = tracker.assign_teams(_teams("t2", "Engineering", "Please review PR #1", "10:05", sender="Rachel Green"))
+    c = tracker.assign_teams(_teams("t3", "Engineering", "done", "11:30", sender="Rachel Green", reply_to="t1"))
+    assert a is not b and c is a
+
+    # A later message without task-like lines still gets a task when it asks for something
+    tracker = ConversationTracker()
+    engine.extract_tasks_from_teams(_teams("u1", "Ops", "Deploy window tonight", "09:00"), tracker)
+    follow_up = engine.extract_tasks_from_teams(_teams("u2", "Ops", "Can you check the backups first?", "09:10"), tracker)
+    assert len(follow_up) == 1 and follow_up[0].metadata["thread_position"] == 2
+    assert engine.extract_tasks_from_teams(_teams("u3", "Ops", "thanks all", "09:15"), tracker) == []
+
+
+if __name__ == "__main__":
+    test_normalize_subject()
+    test_reply_chain_is_extracted_once()
+    test_teams_threads_by_channel_and_window()
+    test_same_subject_without_reply_stays_separate()
+    test_seen_lines_and_idle_threads_age_out()
+    test_teams_threads_by_sender_and_reply()
+    print("[SUCCESS] Conversation tests passed")
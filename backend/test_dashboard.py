@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Tests for the single-request dashboard endpoint"""
+from fastapi.testclient import TestClient
+
+import app.main as main
+
+
+def test_dashboard_matches_separate_endpoints():
+    with TestClient(main.app) as client:
+        client.post("/api/tasks/extract")
+        tasks = client.get("/api/tasks").json()
+
+        dashboard = client.get("/api/dashboard").json()
+        assert dashboard["total"] == len(tasks)
+        assert [t["id"] for t in dashboard["tasks"]] == [t["id"] for t in tasks]
+        insights = client.get("/api/insights").json()
+        assert dashboard["insights"] == insights
+        assert sum(dashboard["facets"]["source_type"].values()) == len(tasks)
+        assert sum(dashboard["facets"]["due"].values()) == len(tasks)
+
+        # Filtered: the page matches /api/tasks/filter, facets keep the other options' counts
+        params = {"source_type": "email", "priority": "high"}
+        filtered = client.get("/api/tasks/filter", params=params).json()
+        dashboard = client.get("/api/dashboard", params={**params, "limit": 2}).json()
+        assert dashboard["total"] == len(filtered)
+        assert [t["id"] for t in dashboard["tasks"]] == [t["id"] for t in filtered[:2]]
+        for source, count in dashboard["facets"]["source_type"].items():
+            assert count == len(client.get("/api/tasks/filter", params={**params, "source_type": source}).json())
+        for priority, count in dashboard["facets"]["priority"].items():
+            assert count == len(client.get("/api/tasks/filter", params={**params, "priority": priority}).json())
+        assert dashboard["insights"] == insights  # always over all tasks
+
+        # Urgency order matches /api/tasks?sort=urgency
+        ranked = client.get("/api/tasks", params={"sort": "urgency"}).json()
+        page = client.get("/api/dashboard", params={"sort": "urgency", "offset": 1, "limit": 3}).json()
+        assert [t["id"] for t in page["tasks"]] == [t["id"] for t in ranked[1:4]]
+
+
+def test_dashboard_edges():
+    with TestClient(main.app) as client:
+        client.post("/api/tasks/extract")
+        total = client.get("/api/dashboard").json()["total"]
+
+        # Paging past the end and filters nothing matches give empty pages, not errors
+        assert client.get("/api/dashboard", params={"offset": total + 5}).json()["tasks"] == []
+        none = client.get("/api/dashboard", params={"start_date": "2099-01-01", "sort": "urgency"}).json()
+        assert none["total"] == 0 and none["tasks"] == []
+        assert sum(none["facets"]["priority"].values()) == 0
+        assert sum(none["facets"]["due"].values()) == total  # the date range doesn't narrow its own facet
+        assert client.get("/api/dashboard", params={"limit": 0}).status_code == 422
+
+        # Unfiltered counts come from the incrementally kept schedule; after a
+        # status change and a delete they still match a full scan
+        ids = [t["id"] for t in client.get("/api/dashboard", params={"limit": 2}).json()["tasks"]]
+        client.put(f"/api/tasks/{ids[0]}/status", params={"status": "completed"})
+        client.delete(f"/api/tasks/{ids[1]}")
+        dashboard = client.get("/api/dashboard").json()
+        assert dashboard["total"] == total - 1
+        tasks = main.tenants.get(main.DEFAULT_TENANT).task_store.current().tasks
+        assert dashboard["facets"] == tasks.facets().counts
+
+
+if __name__ == "__main__":
+    test_dashboard_matches_separate_endpoints()
+    test_dashboard_edges()
+    print("[SUCCESS] Dashboard tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Tests for deadline extraction"""
+
+from datetime import datetime, timezone
+
+from app.ai_engine import AIEngine
+from app.deadlines import DeadlineExtractor
+from app.models import TeamsMessage
+
+# Monday 2025-11-10, like the bundled data
+REFERENCE = datetime(2025, 11, 10, 9, 30, tzinfo=timezone.utc)
+
+
+def _day(text: str):
+    due = DeadlineExtractor().extract(text, REFERENCE)
+    return due.date().isoformat() if due else None
+
+
+def test_phrases_from_sample_data():
+    assert _day("finalize the strategy by next Friday") == "2025-11-21"
+    assert _day("design approval by Wednesday") == "2025-11-12"
+    assert _day("content updated by Nov 20th") == "2025-11-20"
+    assert _day("Please review by EOD today") == "2025-11-10"
+    assert _day("published by Nov 18th") == "2025-11-18"
+    assert _day("due on November 22nd") == "2025-11-22"
+
+
+def test_relative_and_numeric_forms():
+    assert _day("feedback by tomorrow") == "2025-11-11"
+    assert _day("wrap up by end of week") == "2025-11-14"
+    assert _day("in 3 days") == "2025-11-13"
+    assert _day("in 2 business days") == "2025-11-12"
+    assert _day("due 12/01") == "2025-12-01"
+    assert _day("by 2026-01-15") == "2026-01-15"
+    assert _day("submitted by Jan 5th") == "2026-01-05"  # rolls into next year
+    assert _day("nothing to see here") is None
+    assert DeadlineExtractor().extract("in two hours", REFERENCE) == datetime(2025, 11, 10, 11, 30, tzinfo=timezone.utc)
+
+
+def test_cue_word_wins_over_bare_mention():
+    assert _day("Sync on Monday, send the deck by Thursday") == "2025-11-13"
+
+
+def test_invalid_and_ambiguous_input():
+    # Impossible calendar dates are not guessed at
+    assert _day("by Feb 30th") is None
+    assert _day("by Nov 31st") is None
+    assert _day("due 13/45") is None
+    assert _day("by 2025-02-30") is None
+    assert _day("updated 2 days ago") is None
+    # Case and trailing punctuation don't matter; a fraction before the cue isn't a date
+    assert _day("BY FRIDAY.") == "2025-11-14"
+    assert _day("version 1/2 by tomorrow") == "2025-11-11"
+    assert DeadlineExtractor().extract("by tomorrow", None) is None
+
+
+def test_teams_task_gets_due_date():
+    message = TeamsMessage(
+        id="teams_001",
+        channel="Engineering",
+        sender_name="Alex Thompson",
+        sender_email="alex.thompson@company.com",
+        message="Reminder: Code review for PR #234 is needed. Please review by EOD today.",
+        timestamp="2025-11-14T10:30:00Z",
+        mentions=["@channel"],
+        reactions=[],
+    )
+    task, = AIEngine().extract_tasks_from_teams(message)
+    assert task.due_date == datetime(2025, 11, 14, 17, 0, tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    test_phrases_from_sample_data()
+    test_relative_and_numeric_forms()
+    test_cue_word_wins_over_bare_mention()
+    test_invalid_and_ambiguous_input()
+    test_teams_task_gets_due_date()
+    print("[SUCCESS] Deadline tests passed")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""Tests for the time-driven due-date schedule"""
+import threading
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.compact import CompactTaskTable
+from app.due_schedule import DueEventLog, DueSchedule, DueScheduler
+from app.models import ExtractedTask, PriorityLevel, SourceType, TaskStatus
+from app.tenants import DEFAULT_TENANT
+
+START = datetime(2025, 11, 10, 9, 30)
+
+
+def _table():
+    tasks = []
+    for hours in range(-30, 24 * 12, 7):
+        due = START + timedelta(hours=hours)
+        tasks.append(ExtractedTask(
+            title=f"Task due {due:%d %H:%M}",
+            description="",
+            source_type=SourceType.EMAIL if hours % 2 else SourceType.TEAMS,
+            source_id=f"src_{hours}",
+            priority=PriorityLevel.HIGH,
+            # Some due dates are timezone-aware, as in the Teams and email data
+            due_date=due.replace(tzinfo=timezone.utc) if hours % 3 == 0 else due,
+        ))
+    tasks.append(ExtractedTask(title="Undated", description="", source_type=SourceType.LOOP,
+                               source_id="loop_1", priority=PriorityLevel.LOW))
+    return CompactTaskTable.from_tasks(tasks)
+
+
+def _upcoming(table, now):
+    """Rows due within three days, as generate_task_insights counts them"""
+    return [row for row, task in enumerate(table)
+            if task.due_date and now <= task.due_date.replace(tzinfo=None) <= now + timedelta(days=3)]
+
+
+def test_advance_matches_full_scan():
+    table = _table()
+    schedule = DueSchedule(table, now=START)
+    assert schedule.counts() == table.facets(now=START).counts
+
+    events = []
+    now = START
+    while now < START + timedelta(days=13):
+        now += timedelta(minutes=95)
+        events += schedule.advance(now)
+        assert schedule.counts()["due"] == table.facets(now=now).counts["due"], now
+        _, _, overdue, upcoming = schedule.totals()
+        assert overdue == table.facets(now=now).counts["due"]["overdue"]
+        assert upcoming == _upcoming(table, now)
+
+    assert schedule.next_at() is None  # everything is overdue now
+    dated = len(table) - 1
+    overdue_at_start = table.facets(now=START).counts["due"]["overdue"]
+    assert sum(1 for e in events if e.stage == "overdue") == dated - overdue_at_start
+    assert all(e.at <= now for e in events)
+    # The last row due passed through every stage in order
+    last = [e for e in events if e.stage == "overdue"][-1]
+    assert [e.stage for e in events if e.task_id == last.task_id] == ["this_week", "due_in_3_days", "today", "overdue"]
+
+
+def test_copy_extend_and_status():
+    table = _table()
+    schedule = DueSchedule(table, now=START)
+    grown = table.copy()
+    grown.append(ExtractedTask(title="New", description="", source_type=SourceType.LOOP, source_id="loop_2",
+                               priority=PriorityLevel.CRITICAL, due_date=START + timedelta(hours=2)))
+    grown.set_status(0, TaskStatus.COMPLETED)
+
+    copied = schedule.copy(grown)
+    copied.extend(START)
+    copied.set_status(0, TaskStatus.PENDING)
+    assert copied.counts() == grown.facets(now=START).counts
+    # The original is untouched
+    assert schedule.counts() == table.facets(now=START).counts
+
+    later = START + timedelta(hours=3)
+    assert [e.task_id for e in copied.advance(later) if e.stage == "overdue"][-1] == grown.task_id(len(grown) - 1)
+    assert copied.counts()["due"] == grown.facets(now=later).counts["due"]
+
+
+def test_remove_shifts_rows():
+    table = _table()
+    now = START + timedelta(days=2)
+    schedule = DueSchedule(table, now=START)
+    schedule.advance(now)
+    for row in (len(table) - 1, 0, 5, 5):  # undated, overdue, then rows with pending thresholds
+        smaller = table.copy()
+        smaller.delete(row)
+        removed = schedule.copy(smaller)
+        removed.remove(table, row)
+        assert removed.counts() == smaller.facets(now=now).counts
+        assert removed.totals()[3] == _upcoming(smaller, now)
+        table, schedule = smaller, removed
+
+    # Thresholds of the shifted rows still fire for the right tasks
+    later = START + timedelta(days=6)
+    events = schedule.advance(later)
+    assert schedule.counts() == table.facets(now=later).counts
+    assert schedule.totals()[3] == _upcoming(table, later)
+    fresh = DueSchedule(table, now=START)
+    fresh.advance(now)
+    assert sorted(events) == sorted(fresh.advance(later))
+
+
+def test_event_log_and_scheduler():
+    log = DueEventLog(maxlen=3)
+    schedule = DueSchedule(_table(), now=START)
+    log.extend(schedule.advance(START + timedelta(days=1)))
+    last, events = log.since(0)
+    assert len(events) == 3 and events[-1]["seq"] == last
+    assert log.since(last) == (last, [])
+
+    calls = []
+    called = threading.Event()
+
+    def advance():
+        calls.append(1)
+        if len(calls) >= 3:
+            called.set()
+        return 0.01
+
+    scheduler = DueScheduler(advance, max_sleep=5)
+    scheduler.start()
+    try:
+        assert called.wait(5)
+    finally:
+        scheduler.stop()
+
+
+def test_endpoints_use_the_schedule():
+    with TestClient(main.app) as client:
+        client.post("/api/tasks/extract")
+        tenant = main.tenants.get(DEFAULT_TENANT)
+        task_id = client.get("/api/tasks").json()[0]["id"]
+        client.put(f"/api/tasks/{task_id}/status", params={"status": "completed"})
+
+        snapshot = tenant.task_store.current()
+        assert client.get("/api/insights").json() == main.ai_engine.generate_task_insights(snapshot.tasks)
+        dashboard = client.get("/api/dashboard").json()
+        assert dashboard["facets"] == snapshot.tasks.facets().counts
+
+        # Deleting a task updates the schedule instead of rebuilding it
+        client.delete(f"/api/tasks/{task_id}")
+        after_delete = tenant.task_store.current()
+        assert after_delete.due.counts() == after_delete.tasks.facets().counts
+
+        # Events already logged are not returned again
+        response = client.get("/api/tasks/due-events").json()
+        assert client.get("/api/tasks/due-events", params={"after": response["last"]}).json()["events"] == []
+
+
+if __name__ == "__main__":
+    test_advance_matches_full_scan()
+    test_copy_extend_and_status()
+    test_remove_shifts_rows()
+    test_event_log_and_scheduler()
+    test_endpoints_use_the_schedule()
+    print("[SUCCESS] Due schedule tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Tests for the streaming task export"""
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app import export
+from app.models import ExtractedTask, PriorityLevel, SourceType
+
+
+def test_ndjson_and_csv_match_filter():
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    query = "start_date=2025-11-01&end_date=2025-11-30&source_type=email"
+    expected = client.get(f"/api/tasks/filter?{query}").json()
+
+    response = client.get(f"/api/tasks/export?format=ndjson&{query}")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+    response = client.get(f"/api/tasks/export?format=csv&{query}")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [task["id"] for task in expected]
+    assert list(rows[0]) == export.FIELDS
+
+
+def test_chunks_are_bounded():
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    tasks = client.get("/api/tasks").json()
+    saved = export.CHUNK_ROWS
+    export.CHUNK_ROWS = 4
+    try:
+        models = [ExtractedTask(**task) for task in tasks]
+        chunks = list(export.ndjson_chunks(models))
+        assert len(chunks) == -(-len(models) // 4)
+        assert len(list(export.csv_chunks([]))) == 1  # header only
+    finally:
+        export.CHUNK_ROWS = saved
+
+
+def test_awkward_text_and_empty_exports():
+    task = ExtractedTask(
+        title='Reply to "Q4", then\nrevise', description="a, b; c\r\nd — ünïcode",
+        source_type=SourceType.EMAIL, source_id="email_1", priority=PriorityLevel.LOW,
+        metadata={"sender": "Ann, PhD", "tags": ["x"]},
+    )
+    row, = csv.DictReader(io.StringIO(b"".join(export.csv_chunks([task])).decode("utf-8"), newline=""))
+    assert row["title"] == task.title and row["description"] == task.description
+    assert json.loads(row["metadata"]) == task.metadata
+    assert row["due_date"] == "" and row["assigned_to"] == ""
+    assert json.loads(b"".join(export.ndjson_chunks([task]))) == json.loads(task.model_dump_json())
+
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    assert client.get("/api/tasks/export?format=ndjson&start_date=2099-01-01").text == ""
+    assert client.get("/api/tasks/export?format=csv&start_date=2099-01-01").text.strip() == ",".join(export.FIELDS)
+    assert client.get("/api/tasks/export?format=xml").status_code == 422
+
+
+def test_parquet():
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    response = client.get("/api/tasks/export?format=parquet")
+    try:
+        _, pq = export.require_parquet()
+    except ImportError:
+        assert response.status_code == 501
+        return
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names == export.FIELDS
+    assert table.num_rows == len(client.get("/api/tasks").json())
+
+
+if __name__ == "__main__":
+    test_ndjson_and_csv_match_filter()
+    test_chunks_are_bounded()
+    test_awkward_text_and_empty_exports()
+    test_parquet()
+    print("[SUCCESS] Export tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""Tests for the shared inference sidecar"""
+
+import os
+import tempfile
+import threading
+
+from app.inference import InferenceServer, classifier_backend, connect_models, key_path
+
+
+def _fake_classifier(text, labels, multi_class=False):
+    """Stands in for the zero-shot pipeline: 'deploy' is critical, anything else low"""
+    top = "critical" if "deploy" in text else "low"
+    return {"labels": [top] + [label for label in labels if label != top]}
+
+
+def _start_server(address):
+    server = InferenceServer(classifier=_fake_classifier, address=address)
+    ready = threading.Event()
+    threading.Thread(target=server.serve_forever, args=(ready,), daemon=True).start()
+    ready.wait(5)
+    return server
+
+
+def test_models_served_over_socket():
+    address = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    server = _start_server(address)
+    try:
+        generator, classifier = connect_models(address)
+        assert generator is None  # not loaded in the sidecar, so no proxy
+        labels = ["critical", "high", "medium", "low"]
+        assert classifier("deploy the fix", labels, multi_class=False)["labels"][0] == "critical"
+
+        # Each thread gets its own connection
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(classifier("notes", labels)["labels"][0]))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == ["low"] * 4
+    finally:
+        server.close()
+
+    assert connect_models(address) == (None, None)
+
+
+def test_connections_always_authenticated():
+    saved = os.environ.pop("INFERENCE_AUTHKEY", None)
+    address = os.path.join(tempfile.mkdtemp(), "inference.sock")
+    server = _start_server(address)
+    try:
+        # Without INFERENCE_AUTHKEY the sidecar generates a key only its user can read
+        key = key_path(address)
+        assert key.stat().st_mode & 0o777 == 0o600
+        assert connect_models(address)[1] is not None
+
+        os.environ["INFERENCE_AUTHKEY"] = "not-the-sidecar-key"
+        assert connect_models(address) == (None, None)
+        del os.environ["INFERENCE_AUTHKEY"]
+
+        key.chmod(0o644)
+        assert connect_models(address) == (None, None)
+    finally:
+        server.close()
+        if saved is not None:
+            os.environ["INFERENCE_AUTHKEY"] = saved
+    assert not key.exists()
+
+
+def test_classifier_backend_from_env():
+    saved = {name: os.environ.pop(name, None) for name in ("CLASSIFIER_BACKEND", "CLASSIFIER_ARTIFACT")}
+    try:
+        assert classifier_backend() == ("fp32", None)
+        os.environ["CLASSIFIER_BACKEND"] = "INT8"
+        assert classifier_backend() == ("int8", None)
+        os.environ["CLASSIFIER_BACKEND"] = "fp16"
+        assert classifier_backend() == ("fp32", None)
+        os.environ["CLASSIFIER_ARTIFACT"] = "models/bart-int8"
+        backend, artifact = classifier_backend()
+        assert backend == "artifact" and artifact.name == "bart-int8"
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+
+
+if __name__ == "__main__":
+    test_models_served_over_socket()
+    test_connections_always_authenticated()
+    test_classifier_backend_from_env()
+    print("[SUCCESS] Inference sidecar tests passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Tests for the metrics registry and /metrics endpoint"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import CLASSIFICATIONS, Counter, Gauge, Histogram, Registry
+
+
+def test_text_exposition():
+    registry = Registry()
+    hits = registry.register(Counter("hits_total", "Hits", ("source",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    hits.inc("email")
+    hits.inc("email", amount=2)
+    latency.observe(0.05, "/a")
+    latency.observe(0.5, "/a")
+    latency.observe(5, "/a")
+
+    text = registry.render()
+    assert "# TYPE hits_total counter\nhits_total{source=\"email\"} 3\n" in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_exposition_edges():
+    registry = Registry()
+    hits = registry.register(Counter("hits_total", "Hits", ("source",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(1.0, 0.1)))
+    broken = registry.register(Gauge("broken", "Callback that fails"))
+    broken.set_function(lambda: 1 / 0)
+
+    # Wrong label counts are refused instead of producing malformed series
+    for record in (lambda: hits.inc(), lambda: hits.inc("a", "b"), lambda: latency.observe(1.0, "x"),
+                   lambda: broken.set(1.0, "x")):
+        try:
+            record()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("label count not checked")
+
+    hits.inc('say "hi"\\n')
+    latency.observe(0.1)  # a value on a bound falls in that bucket (le is inclusive)
+    text = registry.render()
+    assert 'hits_total{source="say \\"hi\\"\\\\n"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    # A failing gauge callback leaves its header and the other metrics intact
+    assert "# TYPE broken gauge\n" in text and text.endswith("\n")
+
+
+def test_metrics_endpoint():
+    client = TestClient(app)
+    keyword_before = CLASSIFICATIONS.value("keyword")
+    client.post("/api/tasks/extract")
+    task_id = client.get("/api/tasks").json()[0]["id"]
+    client.put(f"/api/tasks/{task_id}/status?status=completed")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    # Routes are labelled by template, not by the concrete path
+    assert 'http_requests_total{method="PUT",route="/api/tasks/{task_id}/status",status="200"}' in text
+    assert task_id not in text
+    assert 'pipeline_stage_seconds_count{stage="rule_extraction"}' in text
+    assert 'tasks_extracted_total{source="loop"}' in text
+    assert "\ntasks " in text and 'model_loaded{model="classifier"}' in text
+    assert CLASSIFICATIONS.value("keyword") > keyword_before
+
+    # Unknown paths share one label, so they can't grow the series without bound
+    client.get("/no/such/path/12345")
+    text = client.get("/metrics").text
+    assert 'route="unmatched",status="404"' in text and "12345" not in text
+
+
+if __name__ == "__main__":
+    test_text_exposition()
+    test_exposition_edges()
+    test_metrics_endpoint()
+    print("[SUCCESS] Metrics tests passed")
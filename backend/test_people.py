@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Tests for person references, the people index and person-scoped queries"""
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.ai_engine import AIEngine
+from app.chat_cache import KIND_LIST, parse_intent
+from app.compact import CompactTaskTable
+from app.models import ExtractedTask, PriorityLevel, SourceType, TeamsMessage
+from app.people import ME, PeopleIndex, addressed, mentions, person_id
+from app.tenants import DEFAULT_TENANT
+
+
+def _task(title, assigned_to=None, sender=None, mentioned=()):
+    return ExtractedTask(title=title, description="", source_type=SourceType.TEAMS, source_id=title,
+                         priority=PriorityLevel.MEDIUM, assigned_to=assigned_to,
+                         metadata={"sender": sender, "mentions": list(mentioned)})
+
+
+def test_person_ids_and_references():
+    assert person_id("Sarah Johnson") == person_id("sarah.johnson@company.com") == person_id("@sarah_johnson") == "sarah-johnson"
+    assert person_id("@DevOps") == person_id("DevOps Team") == "devops"
+    text = "Hey team, @Mike can you share the wireframes? @Sarah please review. cc @channel, ops@company.com"
+    assert mentions(text) == ["Mike", "Sarah", "channel"]
+    assert addressed(text) == ["Mike", "Sarah"]
+    assert addressed("Thanks! Lisa, could you send the deck?\nAssigned to: John Park") == ["Lisa", "John Park"]
+    assert addressed("Also, can you check? Who can take this?") == []
+
+
+def test_extraction_sets_assignee():
+    engine = AIEngine()
+    message = TeamsMessage(
+        id="teams_x", channel="Docs", sender_name="Kevin Zhang", sender_email="kevin.zhang@company.com",
+        message="Release prep:\n- @Sarah can you write the auth section\n- Update the changelog\n@Lisa FYI",
+        timestamp="2025-11-14T10:00:00Z", mentions=["@Sarah", "@Lisa"], reactions=[],
+    )
+    tasks = {task.title: task for task in engine.extract_tasks_from_teams(message)}
+    auth = tasks["@Sarah can you write the auth section"]
+    assert auth.assigned_to == "Sarah"
+    assert auth.metadata["people"] == {"assignee": ["sarah"], "requester": ["kevin-zhang"], "mentioned": ["sarah", "lisa"]}
+    # Only one person is asked in the whole message, so unaddressed lines go to them too
+    assert tasks["Update the changelog"].assigned_to == "Sarah"
+
+
+def test_index_is_incremental():
+    tasks = [
+        _task("a", sender="Sarah Johnson"),
+        _task("b", assigned_to="Mike", sender="Rachel Green", mentioned=["@Mike", "@Sarah"]),
+        _task("c", assigned_to="Marketing Team"),
+        _task("d", sender="rachel.green@company.com", mentioned=["@channel"]),
+    ]
+    table = CompactTaskTable.from_tasks(tasks[:2])
+    index = PeopleIndex(table)
+
+    grown = table.copy()
+    grown.extend(tasks[2:])
+    extended = index.copy()
+    extended.extend(grown)
+    extended.remove(grown, grown.row_of(tasks[0].id))
+    grown.delete(grown.row_of(tasks[0].id))
+    rebuilt = PeopleIndex(grown)
+
+    assert extended.people() == rebuilt.people()
+    # Copies share untouched persons' task dicts and never write through to the original
+    assert extended._tasks["rachel-green"] is not index._tasks["rachel-green"]
+    assert extended._tasks["mike"] is index._tasks["mike"]
+    assert index.people() == {"sarah-johnson": 1, "rachel-green": 1, "mike": 1, "sarah": 1}
+    assert "channel" not in rebuilt.people() and "sarah-johnson" not in rebuilt.people()
+    assert rebuilt.tasks_for("Rachel Green", "requester") == [tasks[1].id, tasks[3].id]
+    assert rebuilt.tasks_for("marketing") == [tasks[2].id]
+    # The original is untouched; there "sarah" also stands for the only full name starting with it
+    assert index.resolve("Sarah") == ["sarah", "sarah-johnson"]
+    assert index.tasks_for("sarah", "requester") == [tasks[0].id]
+    assert index.tasks_for("sarah", "mentioned") == [tasks[1].id]
+
+
+def test_chat_person_parsing():
+    assert parse_intent("What do I owe Sarah?")[-2:] == ("sarah", "requester")
+    assert parse_intent("show my @mentions")[-2:] == (ME, "mentioned")
+    # Prepositions and channel-wide mentions are not people; the old intent applies
+    intent = parse_intent("show tasks mentioned in teams")
+    assert intent.person is None and intent.source == SourceType.TEAMS and intent.kind == KIND_LIST
+    assert parse_intent("tasks for @channel").person is None
+    assert parse_intent("anything from @here today?").person is None
+    assert parse_intent("mentions of devops")[-2:] == ("devops", "mentioned")
+
+
+def test_person_endpoints_and_chat():
+    with TestClient(main.app) as client:
+        client.post("/api/tasks/extract")
+        tenant = main.tenants.get(DEFAULT_TENANT)
+        snapshot = tenant.task_store.current()
+
+        people = client.get("/api/people").json()
+        assert people == PeopleIndex(snapshot.tasks).people()
+        owed = client.get("/api/people/sarah.johnson@company.com/tasks", params={"role": "requester"}).json()
+        assert owed and all(t["metadata"]["sender"] == "Sarah Johnson" for t in owed)
+        assert [t["urgency_score"] for t in owed] == sorted((t["urgency_score"] for t in owed), reverse=True)
+        assert len(client.get("/api/people/sarah/tasks").json()) > len(owed)
+        assert client.get("/api/people/nobody/tasks").status_code == 404
+        client.put(f"/api/tasks/{owed[-1]['id']}/status", params={"status": "completed"})
+        done = client.get("/api/people/sarah/tasks", params={"status": "completed", "limit": 2}).json()
+        assert [t["id"] for t in done] == [owed[-1]["id"]]
+        answer = client.post("/api/chat", json={"message": "show tasks mentioned in teams"}).json()["response"]
+        assert "No tasks match" not in answer
+
+        answer = client.post("/api/chat", json={"message": "What do I owe Sarah Johnson?"}).json()["response"]
+        assert owed[0]["title"] in answer
+
+        saved = tenant.owner
+        tenant.owner = "devops"
+        try:
+            mine = client.get("/api/people/me/tasks").json()
+            assert mine == client.get("/api/people/devops/tasks").json()
+        finally:
+            tenant.owner = saved
+
+        # Deleting a task keeps the index in step with the table
+        client.delete(f"/api/tasks/{owed[0]['id']}")
+        current = tenant.task_store.current()
+        assert current.people.people() == PeopleIndex(current.tasks).people()
+
+
+if __name__ == "__main__":
+    test_person_ids_and_references()
+    test_extraction_sets_assignee()
+    test_index_is_incremental()
+    test_chat_person_parsing()
+    test_person_endpoints_and_chat()
+    print("[SUCCESS] People tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Tests for email body normalization"""
+
+from app.preprocess import clean_email_body, html_to_text
+
+
+def test_strips_quoted_reply_and_signature():
+    body = (
+        "Hi team,\n"
+        "\n"
+        "- Send the budget by Friday\n"
+        "\n"
+        "Thanks,\n"
+        "Mike Chen\n"
+        "Senior PM | Company\n"
+        "\n"
+        "On Mon, Nov 10, 2025 at 9:30 AM Sarah Johnson <sarah.johnson@company.com> wrote:\n"
+        "> - Review the old deck\n"
+        "> Best, Sarah\n"
+    )
+    cleaned, report = clean_email_body(body)
+
+    assert cleaned == "Hi team,\n\n- Send the budget by Friday"
+    assert report["lines_removed"] == 9
+    assert report["bytes_removed"] == len(body.encode("utf-8")) - len(cleaned.encode("utf-8"))
+
+
+def test_keeps_sign_off_words_inside_message():
+    body = "Thanks,\nplease make sure the vendor contract is countersigned and uploaded to the portal\n- Book the venue"
+    cleaned, _ = clean_email_body(body)
+    assert "vendor contract" in cleaned and "- Book the venue" in cleaned
+
+
+def test_tasks_after_sign_off_are_kept():
+    cleaned, report = clean_email_body("Hi,\nThanks!\n- Send the report by Friday\n- Book the venue")
+    assert cleaned == "Hi,\nThanks!\n- Send the report by Friday\n- Book the venue"
+    assert report["lines_removed"] == 0
+    # Imperative lines are not a signature either, even short ones at the end
+    cleaned, _ = clean_email_body("Hi,\nThanks,\nPlease send the deck")
+    assert cleaned.endswith("Please send the deck")
+    # A real signature at the end still goes
+    assert clean_email_body("- Do X\nBest,\nMike Chen\nSenior PM")[0] == "- Do X"
+
+
+def test_sign_off_needs_a_signature_after_it():
+    cleaned, report = clean_email_body("Thanks,\nAlso need the slides by Monday")
+    assert cleaned == "Thanks,\nAlso need the slides by Monday"
+    assert report["lines_removed"] == 0
+    assert clean_email_body("Hi\nCheers\nsee you at the offsite")[0] == "Hi\nCheers\nsee you at the offsite"
+
+    body = "- Do X\n\nRegards,\nMike Chen\nHead of Marketing | Contoso\n+1 (555) 123-4567\nmike.chen@contoso.com"
+    cleaned, report = clean_email_body(body)
+    assert cleaned == "- Do X"
+    assert report["lines_removed"] == 6
+
+
+def test_from_line_alone_is_not_history():
+    body = "Hi\nFrom: the desk of Tom, please send the deck\n- Do X"
+    assert clean_email_body(body)[0] == body
+    body = "- Do X\n\nFrom: Sarah <s@x.com>\nSent: Monday\nTo: me\nSubject: y\n- old task"
+    assert clean_email_body(body)[0] == "- Do X"
+
+
+def test_forwarded_headers_and_disclaimer():
+    body = (
+        "- Approve the invoice\n"
+        "CONFIDENTIALITY NOTICE: this message is intended only for the recipient.\n"
+        "- not a task\n"
+    )
+    assert clean_email_body(body)[0] == "- Approve the invoice"
+    assert clean_email_body("- Approve the invoice\n\nDisclaimer\nText nobody reads")[0] == "- Approve the invoice"
+
+    body = "FYI below\n---------- Forwarded message ---------\nFrom: Tom\n- old task\n"
+    assert clean_email_body(body)[0] == "FYI below"
+
+
+def test_disclaimer_words_in_a_task_are_kept():
+    body = "Hi,\nDisclaimer text for the Q4 deck needs review by Friday\nLegal notice template: please update it"
+    cleaned, report = clean_email_body(body)
+    assert cleaned == body
+    assert report["lines_removed"] == 0
+
+
+def test_html_and_max_size():
+    markup = (
+        "<html><head><style>p {color: red}</style></head><body>"
+        "<p>Hi &amp; welcome</p><ul><li>Update the roadmap</li></ul>"
+        "<div id=\"divRplyFwdMsg\"><b>From:</b> Sarah</div><p>- old task</p></body></html>"
+    )
+    text = html_to_text(markup)
+    assert "Hi & welcome" in text and "- Update the roadmap" in text
+    assert "old task" not in text and "color" not in text
+
+    cleaned, report = clean_email_body("- Do the thing\n" * 1000, max_bytes=150)
+    assert report["truncated"] == 1
+    assert len(cleaned.encode("utf-8")) <= 150
+
+
+if __name__ == "__main__":
+    test_strips_quoted_reply_and_signature()
+    test_keeps_sign_off_words_inside_message()
+    test_tasks_after_sign_off_are_kept()
+    test_sign_off_needs_a_signature_after_it()
+    test_from_line_alone_is_not_history()
+    test_forwarded_headers_and_disclaimer()
+    test_disclaimer_words_in_a_task_are_kept()
+    test_html_and_max_size()
+    print("[SUCCESS] Preprocessing tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""Tests for the admin profiling endpoints"""
+import os
+import tracemalloc
+
+os.environ["ADMIN_TOKEN"] = "test-admin-token"
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.profiling import ProfilerBusy, RequestProfile
+
+ADMIN = {"X-Admin-Token": "test-admin-token"}
+
+
+def test_admin_token_required():
+    client = TestClient(app)
+    assert client.get("/admin/profile/cpu").status_code == 403
+    assert client.get("/admin/profile/cpu", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.post("/api/tasks/prioritize?profile=true").status_code == 403
+    assert client.get("/admin/profile/cpu", headers=ADMIN).status_code == 200
+
+
+def test_cpu_profile_collapsed_stacks():
+    client = TestClient(app)
+    assert client.post("/admin/profile/cpu/start?interval_ms=1", headers=ADMIN).json()["started"]
+    client.post("/api/tasks/extract")
+    client.post("/api/tasks/prioritize")
+    stacks = client.post("/admin/profile/cpu/stop", headers=ADMIN).text
+    lines = stacks.splitlines()
+    assert lines
+    stack, samples = lines[0].rsplit(" ", 1)
+    assert int(samples) >= 1 and ";" in stack
+    assert not client.get("/admin/profile/cpu", headers=ADMIN).json()["running"]
+
+
+def test_profiler_misuse_is_harmless():
+    client = TestClient(app)
+    # Stopping again returns the same profile instead of failing
+    last = client.post("/admin/profile/cpu/stop", headers=ADMIN).text
+    assert client.post("/admin/profile/cpu/stop", headers=ADMIN).text == last
+    # A second start doesn't replace the running profiler or its interval
+    assert client.post("/admin/profile/cpu/start?interval_ms=10", headers=ADMIN).json()["started"]
+    again = client.post("/admin/profile/cpu/start?interval_ms=50", headers=ADMIN).json()
+    assert again == {"started": False, "running": True, "interval_ms": 10.0}
+    client.post("/admin/profile/cpu/stop", headers=ADMIN)
+    assert client.post("/admin/profile/cpu/start?interval_ms=0.5", headers=ADMIN).status_code == 422
+
+    assert client.get("/admin/profile/requests/unknown", headers=ADMIN).status_code == 404
+    # Stopping memory tracing twice is fine
+    client.post("/admin/profile/memory/snapshot", headers=ADMIN)
+    for _ in range(2):
+        assert client.delete("/admin/profile/memory", headers=ADMIN).status_code == 200
+
+
+def test_memory_snapshot_diff():
+    client = TestClient(app)
+    first = client.post("/admin/profile/memory/snapshot", headers=ADMIN).json()["id"]
+    client.post("/api/tasks/extract")
+    second = client.post("/admin/profile/memory/snapshot", headers=ADMIN).json()["id"]
+    diff = client.get(f"/admin/profile/memory/diff?old={first}&new={second}&limit=5", headers=ADMIN)
+    assert diff.status_code == 200
+    assert len(diff.json()) <= 5
+    assert client.get(f"/admin/profile/memory/diff?old=missing&new={second}", headers=ADMIN).status_code == 404
+    client.delete("/admin/profile/memory", headers=ADMIN)
+
+
+def test_request_profile():
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    response = client.post("/api/tasks/prioritize?profile=true", headers=ADMIN).json()
+    profile = response["profile"]
+    assert profile["status"] == "done"
+    assert "AIEngine.reprioritize_task" in profile["cpu"]["engine_methods"]
+    assert "profiling.py" not in profile["memory"]["net_bytes_by_file"]
+    stored = client.get(f"/admin/profile/requests/{response['profile_id']}", headers=ADMIN).json()
+    assert stored["seconds"] == profile["seconds"]
+
+
+def test_request_profile_leaves_memory_session_alone():
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    first = client.post("/admin/profile/memory/snapshot", headers=ADMIN).json()["id"]
+    assert client.post("/api/tasks/prioritize?profile=true", headers=ADMIN).json()["profile"]["status"] == "done"
+    assert tracemalloc.is_tracing()
+    second = client.post("/admin/profile/memory/snapshot", headers=ADMIN).json()["id"]
+    assert client.get(f"/admin/profile/memory/diff?old={first}&new={second}", headers=ADMIN).status_code == 200
+
+    # And ending the session mid-request doesn't pull tracing from under the profile
+    with RequestProfile("test").measure():
+        client.delete("/admin/profile/memory", headers=ADMIN)
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_one_request_profile_at_a_time():
+    client = TestClient(app)
+    client.post("/api/tasks/extract")
+    running = RequestProfile("/api/tasks/extract")
+    with running.measure():
+        try:
+            with RequestProfile("nested").measure():
+                assert False, "second profile ran"
+        except ProfilerBusy:
+            pass
+        response = client.post("/api/tasks/prioritize?profile=true", headers=ADMIN)
+        assert response.status_code == 409
+        # Unprofiled requests go ahead
+        assert client.post("/api/tasks/prioritize").status_code == 200
+    assert running.result["status"] == "done"
+    assert client.post("/api/tasks/prioritize?profile=true", headers=ADMIN).status_code == 200
+
+
+if __name__ == "__main__":
+    test_admin_token_required()
+    test_cpu_profile_collapsed_stacks()
+    test_profiler_misuse_is_harmless()
+    test_memory_snapshot_diff()
+    test_request_profile()
+    test_request_profile_leaves_memory_session_alone()
+    test_one_request_profile_at_a_time()
+    print("[SUCCESS] Profiling tests passed")
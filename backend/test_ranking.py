@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Tests for urgency scores and the urgency index"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.models import ExtractedTask, PriorityLevel, SourceType
+from app.ranking import UrgencyIndex, most_urgent, score_task, urgency_key
+
+NOW = datetime(2025, 11, 14, 12, 0, tzinfo=timezone.utc)
+
+
+def _task(title: str, priority: PriorityLevel, due_in_days=None) -> ExtractedTask:
+    return score_task(ExtractedTask(
+        title=title,
+        description=title,
+        source_type=SourceType.LOOP,
+        source_id=title,
+        priority=priority,
+        due_date=NOW + timedelta(days=due_in_days) if due_in_days is not None else None,
+    ))
+
+
+def _legacy_key(task):
+    """The (priority, naive due date) sort prioritize_tasks used before urgency scores"""
+    order = {PriorityLevel.CRITICAL: 0, PriorityLevel.HIGH: 1, PriorityLevel.MEDIUM: 2, PriorityLevel.LOW: 3}
+    due = task.due_date.replace(tzinfo=None) if task.due_date else datetime.max
+    return (order[task.priority], due)
+
+
+def test_score_matches_legacy_order():
+    tasks = [
+        _task("low soon", PriorityLevel.LOW, 0),
+        _task("high undated", PriorityLevel.HIGH),
+        _task("high later", PriorityLevel.HIGH, 5),
+        _task("critical overdue", PriorityLevel.CRITICAL, -2),
+        _task("medium", PriorityLevel.MEDIUM, 1),
+        _task("high sooner", PriorityLevel.HIGH, 1),
+    ]
+    assert sorted(tasks, key=urgency_key) == sorted(tasks, key=_legacy_key)
+    assert [t.title for t in most_urgent(tasks, 2)] == ["critical overdue", "high sooner"]
+
+
+def test_index_next_top_and_pages():
+    tasks = [_task(f"medium {i}", PriorityLevel.MEDIUM, i) for i in range(10)]
+    index = UrgencyIndex(tasks)
+    assert index.first().title == "medium 0"
+    assert [t.title for t in index.page(3, 2)] == ["medium 3", "medium 4"]
+
+    urgent = _task("critical", PriorityLevel.CRITICAL, 30)
+    index.add(urgent)
+    assert index.first() is urgent
+
+    index.remove(urgent.id)
+    index.remove(tasks[0].id)
+    assert [t.title for t in index.top(2)] == ["medium 1", "medium 2"]
+    assert len(index) == 9
+
+
+def test_copy_and_extend():
+    tasks = [_task(f"medium {i}", PriorityLevel.MEDIUM, i % 3) for i in range(9)]
+    index = UrgencyIndex(tasks[:6])
+    sequence = index._next_sequence
+
+    copied = index.copy()
+    assert index._next_sequence == sequence
+    # A batch, with an existing task re-positioned and one task given twice, merges like adding one by one
+    moved = _task("moved", PriorityLevel.CRITICAL)
+    moved.id = tasks[4].id
+    batch = tasks[6:] + [moved, tasks[7]]
+    one_by_one = index.copy()
+    for task in batch:
+        one_by_one.add(task)
+    copied.extend(batch)
+    assert [t.title for t in copied] == [t.title for t in one_by_one]
+    assert copied.first().title == "moved" and len(copied) == 9
+    # Equal scores stay in insertion order
+    assert [t.title for t in copied.page(1, 3)] == ["medium 0", "medium 3", "medium 6"]
+    assert [t.title for t in index] == [t.title for t in UrgencyIndex(tasks[:6])]
+
+
+if __name__ == "__main__":
+    test_score_matches_legacy_order()
+    test_index_next_top_and_pages()
+    test_copy_and_extend()
+    print("[SUCCESS] Ranking tests passed")
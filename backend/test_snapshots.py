@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Tests for copy-on-write task snapshots"""
+
+import gc
+import threading
+
+from app.models import ExtractedTask, PriorityLevel, SourceType, TaskStatus
+from app.ranking import score_task
+from app.snapshots import SnapshotStore
+
+
+def _task(i: int) -> ExtractedTask:
+    return score_task(ExtractedTask(
+        title=f"Task {i}",
+        description=f"Task {i}",
+        source_type=SourceType.LOOP,
+        source_id=f"loop_{i}",
+        priority=PriorityLevel.HIGH if i % 2 else PriorityLevel.LOW,
+    ))
+
+
+def test_readers_keep_their_snapshot():
+    store = SnapshotStore()
+    with store.writer() as current:
+        table = current.tasks.copy()
+        table.extend(_task(i) for i in range(4))
+        store.publish(table)
+
+    held = store.current()
+    with store.writer() as current:
+        table = current.tasks.copy()
+        table.set_status(0, TaskStatus.COMPLETED)
+        table.append(_task(4))
+        store.publish(table, current.index.copy(lookup=table.get))
+
+    # The held snapshot is untouched; the new one sees both changes
+    assert len(held) == 4 and held.tasks.task(0).status == TaskStatus.PENDING
+    latest = store.current()
+    assert latest.version == held.version + 1
+    assert len(latest) == 5 and latest.tasks.task(0).status == TaskStatus.COMPLETED
+    assert latest.index.first().status == TaskStatus.PENDING  # index reads the new table
+
+    # Once nothing references it, the old snapshot is reclaimed
+    assert held.version in store.live_versions()
+    del held, current
+    gc.collect()
+    assert store.live_versions() == [latest.version]
+
+
+def test_concurrent_reads_during_publish():
+    store = SnapshotStore()
+    store.publish(store.current().tasks.copy())
+    errors = []
+
+    def writer():
+        for i in range(200):
+            with store.writer() as current:
+                table = current.tasks.copy()
+                table.append(_task(i))
+                store.publish(table)
+
+    def reader():
+        for _ in range(500):
+            snapshot = store.current()
+            if len(list(snapshot.tasks)) != len(snapshot) or len(snapshot.index) != len(snapshot):
+                errors.append(snapshot.version)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(store.current()) == 200
+
+
+def test_rewrites_and_failed_writers_leave_snapshots_alone():
+    store = SnapshotStore()
+    with store.writer() as current:
+        table = current.tasks.copy()
+        table.extend(_task(i) for i in range(6))
+        store.publish(table)
+    held = store.current()
+    expected = [task.model_dump() for task in held.tasks]
+
+    # Rewriting metadata moves rows within the shared text buffer; deleting and
+    # compacting build new buffers. Neither may change what the held snapshot reads.
+    with store.writer() as current:
+        table = current.tasks.copy()
+        task = table.task(1)
+        task.metadata["thread_id"] = "a much longer per-task value than before"
+        table.update(1, task)
+        table.delete(0)
+        store.publish(table.maybe_compact(min_bytes=0))
+    assert [task.model_dump() for task in held.tasks] == expected
+    assert store.current().tasks.task(0).metadata["thread_id"].startswith("a much longer")
+
+    # A writer that fails half way publishes nothing
+    latest = store.current()
+    try:
+        with store.writer() as current:
+            table = current.tasks.copy()
+            table.delete(0)
+            raise RuntimeError("extraction failed")
+    except RuntimeError:
+        pass
+    assert store.current() is latest and len(latest) == 5
+
+
+if __name__ == "__main__":
+    test_readers_keep_their_snapshot()
+    test_concurrent_reads_during_publish()
+    test_rewrites_and_failed_writers_leave_snapshots_alone()
+    print("[SUCCESS] Snapshot tests passed")
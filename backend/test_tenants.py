@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""Tests for per-tenant partitions, eviction and worker assignment"""
+import shutil
+import tempfile
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.archive import RetentionPolicy
+from app.models import TaskStatus
+from app.router import build_router
+from app.tenants import HashRing, TenantRegistry, valid_tenant_id
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def _tenants_root(tmp: str, *tenant_ids: str) -> Path:
+    """A TENANTS_DIR whose tenants are copies of backend/data, minus one source each for the second and later"""
+    root = Path(tmp) / "tenants"
+    for position, tenant_id in enumerate(tenant_ids):
+        shutil.copytree(DATA_DIR, root / tenant_id, ignore=shutil.ignore_patterns(".*", "archive"))
+        if position:
+            (root / tenant_id / "loop_tasks.json").unlink()
+    return root
+
+
+def _registry(root: Path, **kwargs) -> TenantRegistry:
+    return TenantRegistry(root=root, default_dir=DATA_DIR, retention=RetentionPolicy(completed_days=None), **kwargs)
+
+
+def test_tenant_ids():
+    assert valid_tenant_id("alice@example.com")
+    assert valid_tenant_id("team-42")
+    assert not valid_tenant_id("../etc")
+    assert not valid_tenant_id(".hidden")
+    assert not valid_tenant_id("a/b")
+    assert not valid_tenant_id("")
+
+
+def test_hash_ring_moves_few_keys():
+    keys = [f"tenant-{i}" for i in range(2000)]
+    four = HashRing(["0", "1", "2", "3"])
+    five = HashRing(["0", "1", "2", "3", "4"])
+    owners = {node: 0 for node in four.nodes}
+    for key in keys:
+        owners[four.node(key)] += 1
+    # Every worker gets a reasonable share
+    assert min(owners.values()) > len(keys) / 4 / 2
+
+    moved = [key for key in keys if four.node(key) != five.node(key)]
+    # Only keys taken over by the new node move, about 1/5 of them
+    assert all(five.node(key) == "4" for key in moved)
+    assert len(moved) < len(keys) / 3
+
+
+def test_eviction_saves_and_reloads_state():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = _tenants_root(tmp, "alice")
+        registry = _registry(root, idle_seconds=3600)
+        with TestClient(main.app) as client:
+            saved = main.tenants
+            main.tenants = registry
+            try:
+                headers = {"X-Tenant-ID": "alice"}
+                total = client.post("/api/tasks/extract", headers=headers).json()["total_tasks"]
+                task_id = client.get("/api/tasks", headers=headers).json()[0]["id"]
+                client.put(f"/api/tasks/{task_id}/status", params={"status": "completed"}, headers=headers)
+            finally:
+                main.tenants = saved
+
+        assert registry.evict("alice")
+        assert [tenant.id for tenant in registry.resident()] == []
+        assert (root / "alice" / ".state" / "tasks.ndjson.gz").exists()
+
+        tenant = registry.get("alice")
+        tasks = tenant.task_store.current().tasks
+        assert len(tasks) == total
+        assert next(t for t in tasks if t.id == task_id).status == TaskStatus.COMPLETED
+        assert len(tenant.conversations) > 0
+
+
+def test_idle_and_resident_limits():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = _tenants_root(tmp, "a", "b", "c")
+        registry = _registry(root, idle_seconds=3600, max_resident=2)
+        for tenant_id in ("a", "b"):
+            registry.get(tenant_id)
+        with registry.use("c"):
+            # Over the limit: the least recently used idle tenant goes, never one in use
+            assert sorted(t.id for t in registry.resident()) == ["b", "c"]
+            registry.idle_seconds = 0
+            assert registry.evict_idle(force=True) == ["b"]
+            assert [t.id for t in registry.resident()] == ["c"]
+        try:
+            registry.get("nobody")
+            assert False, "unknown tenant loaded"
+        except KeyError:
+            pass
+
+
+def test_unknown_tenants_leave_no_loading_locks():
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = _registry(_tenants_root(tmp, "a"))
+        for tenant_id in ("nobody", "nobody-else", "nobody"):
+            try:
+                registry.acquire(tenant_id)
+                assert False, "unknown tenant loaded"
+            except KeyError:
+                pass
+        assert registry._loading == {}
+        with registry.use("a"):
+            assert registry._loading == {}
+
+
+def test_tenants_are_isolated():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = _tenants_root(tmp, "alice", "bob")
+        saved = main.tenants
+        main.tenants = _registry(root)
+        try:
+            with TestClient(main.app) as client:
+                alice = client.post("/api/tasks/extract", headers={"X-Tenant-ID": "alice"}).json()
+                bob = client.post("/t/bob/api/tasks/extract").json()
+                assert alice["by_source"]["loop"] > 0
+                assert "loop" not in bob["by_source"] or bob["by_source"]["loop"] == 0
+                assert alice["total_tasks"] > bob["total_tasks"]
+
+                # Header and path prefix reach the same tenant
+                via_header = client.get("/api/tasks", headers={"X-Tenant-ID": "bob"}).json()
+                via_path = client.get("/t/bob/api/tasks").json()
+                assert [t["id"] for t in via_header] == [t["id"] for t in via_path]
+                assert len(via_path) == bob["total_tasks"]
+
+                assert client.get("/api/tasks", headers={"X-Tenant-ID": "carol"}).status_code == 404
+                assert client.get("/t/..%2F/api/tasks").status_code in (400, 404)
+                assert client.get("/api/tasks", headers={"X-Tenant-ID": "a/b"}).status_code == 400
+        finally:
+            main.tenants = saved
+
+
+def test_worker_ownership():
+    ring = HashRing(["0", "1"])
+    tenant_id = next(f"t{i}" for i in range(100) if ring.node(f"t{i}") == "1")
+    saved = main.worker_assignment
+    main.worker_assignment = (ring, "0")
+    try:
+        with TestClient(main.app) as client:
+            response = client.get("/api/tasks", headers={"X-Tenant-ID": tenant_id})
+            assert response.status_code == 421
+            assert response.headers["X-Tenant-Worker"] == "1"
+    finally:
+        main.worker_assignment = saved
+
+
+def test_router_proxies_to_owner():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = _tenants_root(tmp, "alice")
+        saved = main.tenants, main.worker_assignment
+        main.tenants = _registry(root)
+        try:
+            ring = HashRing(["0", "1"])
+            owner = ring.node("alice")
+            main.worker_assignment = (ring, owner)
+            # Both "workers" are the in-process app; only the owner accepts alice
+            router = build_router(["http://worker0", "http://worker1"], transport=httpx.ASGITransport(app=main.app))
+            with TestClient(router) as client:
+                response = client.post("/t/alice/api/tasks/extract")
+                assert response.status_code == 200
+                assert response.json()["total_tasks"] > 0
+                response = client.get("/api/tasks", headers={"X-Tenant-ID": "alice"})
+                assert response.status_code == 200 and len(response.json()) > 0
+        finally:
+            main.tenants, main.worker_assignment = saved
+
+
+if __name__ == "__main__":
+    test_tenant_ids()
+    test_hash_ring_moves_few_keys()
+    test_eviction_saves_and_reloads_state()
+    test_idle_and_resident_limits()
+    test_unknown_tenants_leave_no_loading_locks()
+    test_tenants_are_isolated()
+    test_worker_ownership()
+    test_router_proxies_to_owner()
+    print("[SUCCESS] Tenant tests passed")
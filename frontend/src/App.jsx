@@ -10,11 +10,13 @@ import TaskCard from './components/TaskCard';
 import TaskFilters from './components/TaskFilters';
 import ChatInterface from './components/ChatInterface';
 import InsightsPanel from './components/InsightsPanel';
-import { taskService, insightsService } from './services/api';
+import { taskService, dashboardService } from './services/api';
 
 function App() {
-  const [tasks, setTasks] = useState([]);
+  const [totalTasks, setTotalTasks] = useState(0);
   const [filteredTasks, setFilteredTasks] = useState([]);
+  const [filters, setFilters] = useState({});
+  const [facets, setFacets] = useState(null);
   const [insights, setInsights] = useState(null);
   const [loading, setLoading] = useState(false);
   const [activeTab, setActiveTab] = useState('tasks'); // tasks, chat, insights
@@ -24,11 +26,15 @@ function App() {
     loadTasks();
   }, []);
 
-  const loadTasks = async () => {
+  // Tasks, filter counts and insights come from one request over one snapshot
+  const loadTasks = async (activeFilters = filters) => {
     try {
-      const data = await taskService.getAllTasks();
-      setTasks(data);
-      setFilteredTasks(data);
+      const data = await dashboardService.getDashboard(activeFilters);
+      setFilteredTasks(data.tasks);
+      setFacets(data.facets);
+      const total = data.insights.total_tasks ?? 0;
+      setTotalTasks(total);
+      setInsights(total > 0 || data.insights.error ? data.insights : null);
     } catch (error) {
       console.error('Error loading tasks:', error);
     }
@@ -52,7 +58,7 @@ function App() {
   };
 
   const handlePrioritizeTasks = async () => {
-    if (tasks.length === 0) {
+    if (totalTasks === 0) {
       alert('Please extract tasks first!');
       return;
     }
@@ -70,23 +76,13 @@ function App() {
     }
   };
 
-  const handleFilterChange = async (filters) => {
-    try {
-      // Remove empty filters
-      const activeFilters = Object.fromEntries(
-        Object.entries(filters).filter(([_, v]) => v !== '')
-      );
-
-      if (Object.keys(activeFilters).length === 0) {
-        setFilteredTasks(tasks);
-        return;
-      }
-
-      const data = await taskService.filterTasks(activeFilters);
-      setFilteredTasks(data);
-    } catch (error) {
-      console.error('Error filtering tasks:', error);
-    }
+  const handleFilterChange = async (newFilters) => {
+    // Remove empty filters
+    const activeFilters = Object.fromEntries(
+      Object.entries(newFilters).filter(([_, v]) => v !== '')
+    );
+    setFilters(activeFilters);
+    await loadTasks(activeFilters);
   };
 
   const handleStatusChange = async (taskId, newStatus) => {
@@ -98,21 +94,6 @@ function App() {
     }
   };
 
-  const loadInsights = async () => {
-    try {
-      const data = await insightsService.getInsights();
-      setInsights(data);
-    } catch (error) {
-      console.error('Error loading insights:', error);
-    }
-  };
-
-  useEffect(() => {
-    if (activeTab === 'insights' && tasks.length > 0) {
-      loadInsights();
-    }
-  }, [activeTab, tasks.length]);
-
   return (
     <div className="min-h-screen bg-gradient-to-br from-blue-50 via-white to-purple-50">
       {/* Header */}
@@ -141,7 +122,7 @@ function App() {
               </button>
               <button
                 onClick={handlePrioritizeTasks}
-                disabled={loading || tasks.length === 0}
+                disabled={loading || totalTasks === 0}
                 className="btn-secondary flex items-center gap-2 disabled:opacity-50"
               >
                 <BarChart3 className="w-5 h-5" />
@@ -202,7 +183,7 @@ function App() {
       <main className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
         {activeTab === 'tasks' && (
           <>
-            <TaskFilters onFilterChange={handleFilterChange} />
+            <TaskFilters onFilterChange={handleFilterChange} facets={facets} />
 
             {filteredTasks.length === 0 ? (
               <div className="text-center py-12">
@@ -211,7 +192,7 @@ function App() {
                   No Tasks Found
                 </h3>
                 <p className="text-gray-600 mb-4">
-                  {tasks.length === 0
+                  {totalTasks === 0
                     ? 'Click "Extract Tasks" to start analyzing your data sources.'
                     : 'Try adjusting your filters to see more tasks.'}
                 </p>
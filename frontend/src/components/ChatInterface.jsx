@@ -11,7 +11,12 @@ export default function ChatInterface() {
   ]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const messagesEndRef = useRef(null);
+  const abortRef = useRef(new AbortController());
+
+  // Leaving the chat stops any answer still being generated
+  useEffect(() => () => abortRef.current.abort(), []);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -28,14 +33,26 @@ export default function ChatInterface() {
     setInput('');
     setMessages((prev) => [...prev, { role: 'user', content: userMessage }]);
     setLoading(true);
+    setStreaming(true);
+
+    const appendToReply = (text) =>
+      setMessages((prev) => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+      });
 
     try {
-      const response = await chatService.sendMessage(userMessage);
-      setMessages((prev) => [
-        ...prev,
-        { role: 'assistant', content: response.response },
-      ]);
+      // The structured answer arrives first; generated text is appended as it streams
+      await chatService.streamMessage(userMessage, {
+        signal: abortRef.current.signal,
+        onAnswer: (text) => {
+          setMessages((prev) => [...prev, { role: 'assistant', content: text }]);
+          setLoading(false);
+        },
+        onToken: appendToReply,
+      });
     } catch (error) {
+      if (error.name === 'AbortError') return;
       setMessages((prev) => [
         ...prev,
         {
@@ -45,6 +62,7 @@ export default function ChatInterface() {
       ]);
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -122,11 +140,11 @@ export default function ChatInterface() {
             onKeyPress={handleKeyPress}
             placeholder="Ask about your tasks..."
             className="flex-1 px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500"
-            disabled={loading}
+            disabled={loading || streaming}
           />
           <button
             onClick={handleSend}
-            disabled={loading || !input.trim()}
+            disabled={loading || streaming || !input.trim()}
             className="bg-primary-600 hover:bg-primary-700 text-white p-2 rounded-lg disabled:opacity-50 disabled:cursor-not-allowed transition"
           >
             <Send className="w-5 h-5" />
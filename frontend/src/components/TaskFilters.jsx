@@ -1,7 +1,22 @@
 import React, { useState } from 'react';
 import { Filter, X } from 'lucide-react';
 
-export default function TaskFilters({ onFilterChange }) {
+const DUE_BUCKETS = [
+  ['overdue', 'Overdue'],
+  ['today', 'Today'],
+  ['this_week', 'This week'],
+  ['later', 'Later'],
+  ['none', 'No date'],
+];
+
+// facets: { dimension: { value: count } } from /api/dashboard, counted
+// under the other active filters
+export default function TaskFilters({ onFilterChange, facets }) {
+  const withCount = (text, dimension, value) => {
+    const count = facets?.[dimension]?.[value];
+    return count === undefined ? text : `${text} (${count})`;
+  };
+
   const [showFilters, setShowFilters] = useState(false);
   const [filters, setFilters] = useState({
     start_date: '',
@@ -88,9 +103,9 @@ export default function TaskFilters({ onFilterChange }) {
               className="w-full px-3 py-2 border border-gray-300 rounded-md text-sm focus:outline-none focus:ring-2 focus:ring-primary-500"
             >
               <option value="">All Sources</option>
-              <option value="email">Email</option>
-              <option value="teams">Teams</option>
-              <option value="loop">Loop/To-Do</option>
+              <option value="email">{withCount('Email', 'source_type', 'email')}</option>
+              <option value="teams">{withCount('Teams', 'source_type', 'teams')}</option>
+              <option value="loop">{withCount('Loop/To-Do', 'source_type', 'loop')}</option>
             </select>
           </div>
 
@@ -105,10 +120,10 @@ export default function TaskFilters({ onFilterChange }) {
               className="w-full px-3 py-2 border border-gray-300 rounded-md text-sm focus:outline-none focus:ring-2 focus:ring-primary-500"
             >
               <option value="">All Priorities</option>
-              <option value="critical">Critical</option>
-              <option value="high">High</option>
-              <option value="medium">Medium</option>
-              <option value="low">Low</option>
+              <option value="critical">{withCount('Critical', 'priority', 'critical')}</option>
+              <option value="high">{withCount('High', 'priority', 'high')}</option>
+              <option value="medium">{withCount('Medium', 'priority', 'medium')}</option>
+              <option value="low">{withCount('Low', 'priority', 'low')}</option>
             </select>
           </div>
 
@@ -123,11 +138,19 @@ export default function TaskFilters({ onFilterChange }) {
               className="w-full px-3 py-2 border border-gray-300 rounded-md text-sm focus:outline-none focus:ring-2 focus:ring-primary-500"
             >
               <option value="">All Statuses</option>
-              <option value="pending">Pending</option>
-              <option value="in-progress">In Progress</option>
-              <option value="completed">Completed</option>
+              <option value="pending">{withCount('Pending', 'status', 'pending')}</option>
+              <option value="in-progress">{withCount('In Progress', 'status', 'in-progress')}</option>
+              <option value="completed">{withCount('Completed', 'status', 'completed')}</option>
             </select>
           </div>
+
+          {/* Due-date counts */}
+          {facets?.due && (
+            <p className="md:col-span-2 lg:col-span-5 text-xs text-gray-500">
+              Due:{' '}
+              {DUE_BUCKETS.map(([key, text]) => `${text} ${facets.due[key] ?? 0}`).join(' · ')}
+            </p>
+          )}
         </div>
       )}
     </div>
@@ -57,6 +57,53 @@ export const chatService = {
     const response = await api.post('/api/chat', { message });
     return response.data;
   },
+
+  // Server-sent events from /api/chat/stream: onAnswer(text) once, then
+  // onToken(text) per generated piece. Aborting the signal cancels generation.
+  streamMessage: async (message, { onAnswer, onToken, signal } = {}) => {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message }),
+      signal,
+    });
+    if (!response.ok) {
+      throw new Error(`Chat stream failed: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let done = null;
+    for (;;) {
+      const { value, done: finished } = await reader.read();
+      if (finished) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const event = block.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? '{}');
+        if (event === 'answer') onAnswer?.(data.text);
+        else if (event === 'token') onToken?.(data.text);
+        else if (event === 'done') done = data;
+      }
+    }
+    return done;
+  },
+};
+
+// Dashboard API: a page of filtered tasks, facet counts and insights in one request
+export const dashboardService = {
+  getDashboard: async (filters = {}) => {
+    const params = new URLSearchParams();
+    for (const key of ['start_date', 'end_date', 'source_type', 'priority', 'status']) {
+      if (filters[key]) params.append(key, filters[key]);
+    }
+    const response = await api.get(`/api/dashboard?${params.toString()}`);
+    return response.data;
+  },
 };
 
 // Insights API